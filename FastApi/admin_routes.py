@@ -1,10 +1,27 @@
-from fastapi import APIRouter, HTTPException, Depends, Body
-from database import supabase_admin
-from auth_utils import get_current_user_profile
+from fastapi import APIRouter, HTTPException, Depends, Body, Query, Response
+from database import supabase_admin, iter_keyset_chunks
+from auth_utils import get_current_user_profile, invalidate_cached_profile
+from catalog import catalog
+from scholarships import parse_list_param, sanitize_search_term
+from export_utils import export_response, prefetch_chunks
+from serialization import RawJSONResponse, dumps
+from logging_utils import get_logger
+from provisioning import (
+    PROVISION_MAX_USERS, create_auth_user, rollback_auth_user, profile_row,
+    new_provisioning_job, run_provisioning, start_provisioning, job_store
+)
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Optional, List, Literal
+import uuid
 
 router = APIRouter()
+logger = get_logger("admin")
+
+PROFILE_FIELDS = (
+    'id', 'email', 'full_name', 'student_code', 'role', 'campus',
+    'university_center_id', 'gpa', 'updated_at'
+)
+USERS_EXPORT_CHUNK_SIZE = 1000
 
 # --- MODELOS DE DATOS ---
 
@@ -16,7 +33,11 @@ class AdminUserCreate(BaseModel):
     role: str
     campus: str = None 
     full_name: str = "Administrador"
-    student_code: str = "ADMIN" # Valor dummy
+    student_code: Optional[str] = None # Único en profiles: un valor fijo choca desde el segundo admin
+
+class AdminUserBulkCreate(BaseModel):
+    users: List[AdminUserCreate]
+    atomic: bool = False # True: si un usuario falla, no se crea ninguno
 
 class AdminUserUpdate(BaseModel):
     role: Optional[str] = None
@@ -43,49 +64,133 @@ async def create_user_with_role(
     if not supabase_admin: raise HTTPException(status_code=503, detail="BD no disponible")
 
     try:
-        auth_response = supabase_admin.auth.admin.create_user({
-            "email": user_data.email,
-            "password": user_data.password,
-            "email_confirm": True
-        })
-        new_user_id = auth_response.user.id
-
-        profile_data = {
-            "id": new_user_id,
-            "email": user_data.email,
-            "full_name": user_data.full_name,
-            "student_code": user_data.student_code,
-            "role": user_data.role,
-            "campus": user_data.campus if user_data.role == 'campus_admin' else None
-        }
-        supabase_admin.table('profiles').upsert(profile_data).execute()
-
-        return {"status": "success", "message": f"Usuario creado: {user_data.email}", "user_id": new_user_id}
-
-    except Exception as e:
-        print(f"User creation error: {str(e)}")  # Log internally
+        new_user_id = await create_auth_user(user_data)
+    except Exception:
+        logger.exception("User creation error")
         raise HTTPException(status_code=400, detail="Error al crear usuario")
 
+    try:
+        await supabase_admin.table('profiles').upsert(profile_row(new_user_id, user_data)).execute()
+    except Exception:
+        # Sin perfil la cuenta de Auth queda huérfana (y bloquea el email): se revierte
+        logger.exception("Profile creation error")
+        await rollback_auth_user(new_user_id)
+        raise HTTPException(status_code=400, detail="Error al crear el perfil del usuario")
+
+    await invalidate_cached_profile(new_user_id)
+    return {"status": "success", "message": f"Usuario creado: {user_data.email}", "user_id": new_user_id}
+
+@router.post(path= "/admin/users/bulk", status_code=202)
+async def bulk_create_users(
+    payload: AdminUserBulkCreate,
+    response: Response,
+    wait: bool = Query(False, description="Esperar a que termine y devolver el reporte (p. ej. en serverless)"),
+    profile: dict = Depends(get_current_user_profile)
+):
+    """
+    Alta masiva: crea las cuentas de Auth en paralelo acotado y todos los perfiles con un
+    solo upsert. Devuelve un job_id; el progreso y el resultado por usuario se consultan en
+    GET /admin/users/bulk/{job_id}. Los usuarios cuyo perfil falla se revierten en Auth.
+    """
+    verify_super_admin(profile)
+    if not supabase_admin: raise HTTPException(status_code=503, detail="BD no disponible")
+    if not payload.users: raise HTTPException(status_code=400, detail="Sin usuarios")
+    if len(payload.users) > PROVISION_MAX_USERS:
+        raise HTTPException(status_code=413, detail=f"Máximo {PROVISION_MAX_USERS} usuarios por lote")
+
+    job = new_provisioning_job(payload.users, payload.atomic)
+    await job_store.save(job)
+
+    if wait:
+        response.status_code = 200
+        return {"status": "success", "data": await run_provisioning(job, payload.users)}
+
+    start_provisioning(job, payload.users)
+    return {
+        "status": "accepted",
+        "job_id": job["id"],
+        "total": job["total"],
+        "poll_url": f"/admin/users/bulk/{job['id']}"
+    }
+
+@router.get(path= "/admin/users/bulk/{job_id}")
+async def get_bulk_create_job(job_id: str, profile: dict = Depends(get_current_user_profile)):
+    verify_super_admin(profile)
+    job = await job_store.get(job_id)
+    if job is None: raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return {"status": "success", "data": job}
     
 @router.get(path="/admin/users")
-async def list_users(profile: dict = Depends(get_current_user_profile)):
+async def list_users(
+    role: Optional[str] = Query(None, description="Filtrar por rol (admin, campus_admin, student...)"),
+    campus: Optional[str] = Query(None, description="Filtrar por campus"),
+    q: Optional[str] = Query(None, description="Buscar en nombre, email y código de estudiante"),
+    fields: Optional[str] = Query(None, description="Columnas a devolver separadas por coma"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    format: Literal['json', 'ndjson', 'csv'] = Query('json', description="'ndjson'/'csv' exporta la lista completa en streaming"),
+    profile: dict = Depends(get_current_user_profile)
+):
+    """
+    Lista perfiles con filtros, proyección de columnas y paginación por keyset (id).
+    Con format=ndjson|csv exporta todos los perfiles que coinciden, escritos por bloques.
+    """
     verify_super_admin(profile)
+
+    columns = parse_list_param(fields, PROFILE_FIELDS, 'fields') or list(PROFILE_FIELDS)
+    if 'id' not in columns:
+        columns.append('id') # Necesario para avanzar el cursor
+    search = sanitize_search_term(q) if q else ""
+
+    def build_query():
+        query = supabase_admin.table('profiles').select(', '.join(columns))
+        if role:
+            query = query.eq('role', role)
+        if campus:
+            query = query.eq('campus', campus)
+        if search:
+            query = query.or_(f'full_name.ilike.%{search}%,email.ilike.%{search}%,student_code.ilike.%{search}%')
+        return query
+
     try:
-        response = supabase_admin.table('profiles').select('*').execute()
-        return {"status": "success", "data": response.data}
-    except Exception as e:
-        print(f"Error listing users: {str(e)}")
+        if format != 'json':
+            # El primer bloque se lee aquí: un error de la consulta no llega a iniciar el stream
+            chunks = await prefetch_chunks(iter_keyset_chunks(build_query, chunk_size=USERS_EXPORT_CHUNK_SIZE))
+            return export_response(chunks, format, columns, "usuarios")
+
+        query = build_query()
+        if cursor:
+            try:
+                query = query.gt('id', str(uuid.UUID(cursor)))
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+        response = await query.order('id').limit(limit).execute()
+        has_more = len(response.data) == limit
+        # Ya codificado: evita jsonable_encoder sobre cada fila
+        return RawJSONResponse(dumps({
+            "status": "success",
+            "data": response.data,
+            "count": len(response.data),
+            "limit": limit,
+            "next_cursor": response.data[-1]['id'] if has_more else None
+        }))
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error listing users")
         raise HTTPException(status_code=400, detail="Error al listar usuarios")
 
 @router.delete(path= "/admin/users/{user_id}")
 async def delete_user(user_id: str, profile: dict = Depends(get_current_user_profile)):
     verify_super_admin(profile)
     try:
-        supabase_admin.auth.admin.delete_user(user_id)
-        supabase_admin.table('profiles').delete().eq('id', user_id).execute()
+        await supabase_admin.auth.admin.delete_user(user_id)
+        await supabase_admin.table('profiles').delete().eq('id', user_id).execute()
+        await invalidate_cached_profile(user_id)
         return {"status": "success", "message": "Usuario eliminado"}
-    except Exception as e:
-        print(f"Error deleting user: {str(e)}")
+    except Exception:
+        logger.exception("Error deleting user")
         raise HTTPException(status_code=400, detail="Error al eliminar usuario")
 
 @router.put(path= "/admin/users/{user_id}")
@@ -99,9 +204,19 @@ async def update_user_role(
     if not data_to_update: raise HTTPException(status_code=400, detail="Sin datos")
 
     try:
-        response = supabase_admin.table('profiles').update(data_to_update).eq('id', user_id).execute()
+        response = await supabase_admin.table('profiles').update(data_to_update).eq('id', user_id).execute()
+        await invalidate_cached_profile(user_id)
         if not response.data: raise HTTPException(status_code=404, detail="Usuario no encontrado")
         return {"status": "success", "message": "Actualizado", "data": response.data}
-    except Exception as e:
-        print(f"Error updating user: {str(e)}")
-        raise HTTPException(status_code=400, detail="Error al actualizar usuario")
\ No newline at end of file
+    except Exception:
+        logger.exception("Error updating user")
+        raise HTTPException(status_code=400, detail="Error al actualizar usuario")
+
+@router.post(path= "/admin/catalog/refresh")
+async def refresh_catalog(profile: dict = Depends(get_current_user_profile)):
+    """Invalida y recarga los catálogos (tipos de beca, centros) tras editarlos en Supabase."""
+    verify_super_admin(profile)
+    catalog.invalidate()
+    if not await catalog.preload():
+        raise HTTPException(status_code=503, detail="No se pudo recargar el catálogo")
+    return {"status": "success", "message": "Catálogo actualizado"}
@@ -0,0 +1,120 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from pydantic import BaseModel
+from typing import Optional
+from database import supabase_admin
+from auth_utils import get_current_user_profile
+from scholarships_crud import verify_admin_or_campus_admin, verify_campus_ownership
+from serialization import RawJSONResponse, dumps
+from logging_utils import get_logger
+
+router = APIRouter()
+logger = get_logger("applications")
+
+# --- MODELOS DE DATOS ---
+
+class ApplicationCreate(BaseModel):
+    scholarship_id: str # UUID
+
+# --- RUTAS ---
+
+@router.post(path= "/applications")
+async def submit_application(
+    application: ApplicationCreate,
+    response: Response,
+    profile: dict = Depends(get_current_user_profile)
+):
+    """
+    Envía la solicitud del usuario autenticado a una beca.
+
+    Es idempotente: repetir el envío devuelve la solicitud existente (200) en vez de fallar.
+    Todo ocurre en una sola sentencia (función submit_application): valida las fechas
+    de la convocatoria e inserta apoyándose en la llave única (student_id, scholarship_id).
+    """
+    if not supabase_admin:
+        raise HTTPException(status_code=503, detail="BD no disponible")
+
+    try:
+        result = await supabase_admin.rpc('submit_application', {
+            'p_student_id': profile['id'],
+            'p_scholarship_id': application.scholarship_id
+        }).execute()
+    except Exception:
+        logger.exception("Error submitting application")
+        raise HTTPException(status_code=400, detail="Error al enviar solicitud")
+
+    row = result.data[0] if result.data else {}
+    outcome = row.pop('result', None)
+
+    if outcome == 'not_found':
+        raise HTTPException(status_code=404, detail="Beca no encontrada")
+    if outcome == 'closed':
+        raise HTTPException(status_code=409, detail="La convocatoria de esta beca no está abierta")
+    if outcome == 'exists':
+        return {"status": "success", "message": "Ya habías aplicado a esta beca", "data": row}
+    if outcome == 'created':
+        response.status_code = 201
+        return {"status": "success", "message": "Solicitud enviada", "data": row}
+
+    raise HTTPException(status_code=400, detail="Error al enviar solicitud")
+
+@router.get(path= "/applications/me")
+async def list_my_applications(profile: dict = Depends(get_current_user_profile)):
+    """Lista las solicitudes del usuario autenticado con los datos básicos de cada beca."""
+    if not supabase_admin:
+        raise HTTPException(status_code=503, detail="BD no disponible")
+
+    try:
+        response = await supabase_admin.table('applications')\
+            .select('id, scholarship_id, status, submitted_at, scholarships(title, status, application_end_date)')\
+            .eq('student_id', profile['id'])\
+            .order('submitted_at', desc=True)\
+            .execute()
+        return RawJSONResponse(dumps({"status": "success", "data": response.data, "count": len(response.data)}))
+    except Exception:
+        logger.exception("Error listing applications")
+        raise HTTPException(status_code=400, detail="Error al listar solicitudes")
+
+@router.get(path= "/admin/scholarships/{scholarship_id}/applications")
+async def list_scholarship_applications(
+    scholarship_id: str,
+    status: Optional[str] = Query(None, description="Filtrar por estado de la solicitud"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    profile: dict = Depends(get_current_user_profile)
+):
+    """Lista las solicitudes de una beca. Un campus_admin solo ve las becas de su campus."""
+    verify_admin_or_campus_admin(profile)
+
+    if not supabase_admin:
+        raise HTTPException(status_code=503, detail="BD no disponible")
+
+    try:
+        scholarship = await supabase_admin.table('scholarships')\
+            .select('university_center_id')\
+            .eq('id', scholarship_id)\
+            .limit(1)\
+            .execute()
+        if not scholarship.data:
+            raise HTTPException(status_code=404, detail="Beca no encontrada")
+        verify_campus_ownership(profile, scholarship.data[0]['university_center_id'])
+
+        query = supabase_admin.table('applications')\
+            .select('id, student_id, status, submitted_at, profiles(full_name, email, student_code)', count='exact')\
+            .eq('scholarship_id', scholarship_id)
+        if status:
+            query = query.eq('status', status)
+
+        response = await query.order('submitted_at', desc=True).range(offset, offset + limit - 1).execute()
+        return RawJSONResponse(dumps({
+            "status": "success",
+            "data": response.data,
+            "count": len(response.data),
+            "total": response.count,
+            "limit": limit,
+            "offset": offset
+        }))
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error listing scholarship applications")
+        raise HTTPException(status_code=400, detail="Error al listar solicitudes")
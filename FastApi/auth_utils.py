@@ -1,27 +1,172 @@
+import asyncio
+import os
+import time
+import jwt
 from fastapi import HTTPException, Header
-from database import supabase_admin
+from database import supabase_admin, run_sync, SUPABASE_URL, SUPABASE_ANON_KEY
+from cache import TTLCache
+from response_cache import create_cache
+from metrics import record_timing
+from logging_utils import get_logger
+
+logger = get_logger("auth")
+
+# Verificación local de JWT: secreto HS256 del proyecto (legacy) o llaves públicas JWKS
+SUPABASE_JWT_SECRET = os.environ.get("SUPABASE_JWT_SECRET")
+JWT_AUDIENCE = os.environ.get("SUPABASE_JWT_AUDIENCE", "authenticated")
+JWT_LEEWAY = int(os.environ.get("SUPABASE_JWT_LEEWAY", "10"))
+JWKS_CACHE_TTL = int(os.environ.get("SUPABASE_JWKS_CACHE_TTL", "600"))
+# Un kid desconocido vuelve a descargar el JWKS como mucho una vez en este intervalo (segundos)
+JWKS_REFRESH_INTERVAL = float(os.environ.get("SUPABASE_JWKS_REFRESH_INTERVAL", "30"))
+ASYMMETRIC_ALGORITHMS = ["RS256", "ES256", "EdDSA"]
+
+PROFILE_CACHE_TTL = float(os.environ.get("PROFILE_CACHE_TTL", "60"))
+PROFILE_CACHE_SIZE = int(os.environ.get("PROFILE_CACHE_SIZE", "2048"))
+
+_jwks_client = None
+if SUPABASE_URL:
+    _jwks_client = jwt.PyJWKClient(
+        f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json",
+        cache_keys=True,
+        lifespan=JWKS_CACHE_TTL,
+        headers={"apikey": SUPABASE_ANON_KEY or ""},
+    )
+
+# kid -> llave pública, para no salir del event loop con usuarios "calientes"
+_signing_keys = TTLCache(maxsize=16, ttl=JWKS_CACHE_TTL)
+_jwks_refreshed_at = float("-inf")
+_jwks_refresh = None  # descarga en curso, compartida por las peticiones concurrentes
+
+# user_id -> fila de profiles (role, campus, ...). Usa RESPONSE_CACHE_BACKEND: en memoria cada
+# worker tiene la suya; con Redis un cambio de rol o un borrado se ve en todos los workers al instante.
+profile_cache = create_cache(PROFILE_CACHE_SIZE, "becas:profile:", ttl=PROFILE_CACHE_TTL, stale_ttl=0)
+
+
+class LocalVerificationUnavailable(Exception):
+    """No hay secreto ni JWKS para validar el token sin llamar a Supabase Auth."""
+
+
+async def invalidate_cached_profile(*user_ids: str):
+    """
+    Elimina el perfil cacheado de los usuarios dados (llamar tras modificarlos o borrarlos).
+    Con la caché en memoria solo alcanza a este worker; los demás lo ven al vencer PROFILE_CACHE_TTL.
+    """
+    if not user_ids:
+        return
+    try:
+        await profile_cache.delete([str(user_id) for user_id in user_ids])
+    except Exception as e:
+        logger.error("Error al invalidar perfiles en caché", extra={"error": str(e)})
+
+
+def _fetch_signing_keys() -> dict:
+    # PyJWKClient usa urllib (bloqueante): se llama en el pool de hilos
+    return {jwk.key_id: jwk.key for jwk in _jwks_client.get_signing_keys(refresh=True)}
+
+
+async def _refresh_signing_keys():
+    """
+    Descarga el JWKS y guarda todas sus llaves, a lo más una vez por JWKS_REFRESH_INTERVAL.
+
+    El kid se lee del header sin verificar: sin este límite, tokens con kids inventados
+    dispararían una descarga bloqueante por petición.
+    """
+    global _jwks_refreshed_at, _jwks_refresh
+    if _jwks_refresh is None or _jwks_refresh.done():
+        if time.monotonic() - _jwks_refreshed_at < JWKS_REFRESH_INTERVAL:
+            return
+        _jwks_refreshed_at = time.monotonic()
+        _jwks_refresh = asyncio.ensure_future(run_sync(_fetch_signing_keys))
+
+    for kid, key in (await asyncio.shield(_jwks_refresh)).items():
+        _signing_keys.set(kid, key)
+
+
+async def _get_signing_key(kid: str):
+    key = _signing_keys.get(kid)
+    if key is None:
+        # Solo ocurre al rotar llaves, al expirar la caché o con un kid falso
+        await _refresh_signing_keys()
+        key = _signing_keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError("Llave de firma desconocida")
+    return key
+
+
+async def verify_access_token(token: str) -> dict:
+    """
+    Valida localmente firma, expiración y audiencia del access token de Supabase.
+
+    Returns:
+        Los claims del token.
+
+    Raises:
+        jwt.InvalidTokenError: Si el token no es válido.
+        LocalVerificationUnavailable: Si no hay forma de validarlo localmente.
+    """
+    header = jwt.get_unverified_header(token)
+    algorithm = header.get("alg")
+    options = {"require": ["exp", "sub", "aud"]}
+
+    if algorithm == "HS256":
+        if not SUPABASE_JWT_SECRET:
+            raise LocalVerificationUnavailable()
+        key = SUPABASE_JWT_SECRET
+        algorithms = ["HS256"]
+    elif algorithm in ASYMMETRIC_ALGORITHMS and header.get("kid") and _jwks_client:
+        key = await _get_signing_key(header["kid"])
+        algorithms = [algorithm]
+    else:
+        raise LocalVerificationUnavailable()
+
+    return jwt.decode(
+        token,
+        key,
+        algorithms=algorithms,
+        audience=JWT_AUDIENCE,
+        leeway=JWT_LEEWAY,
+        options=options,
+    )
+
+
+async def _resolve_user_id(token: str) -> str:
+    try:
+        claims = await verify_access_token(token)
+        return claims["sub"]
+    except LocalVerificationUnavailable:
+        # Sin secreto/JWKS configurado: validación remota contra Supabase Auth
+        user_response = await supabase_admin.auth.get_user(token)
+        return user_response.user.id
+
 
 async def get_current_user_profile(authorization: str = Header(None)):
     """
     Recibe el Token del usuario (Bearer token), valida quién es
     y devuelve su PERFIL (incluyendo rol y campus).
+
+    El token se valida localmente y el perfil se sirve desde una caché TTL,
+    así que un usuario "caliente" no genera llamadas a Supabase.
     """
     if not authorization:
         raise HTTPException(status_code=401, detail="Falta el token de autenticación")
 
+    start = time.perf_counter()
     try:
         token = authorization.replace("Bearer ", "")
 
-        user_response = supabase_admin.auth.get_user(token)
-        user_id = user_response.user.id
+        user_id = await _resolve_user_id(token)
+
+        async def fetch_profile():
+            profile_response = await supabase_admin.table('profiles').select('*').eq('id', user_id).single().execute()
 
-        profile_response = supabase_admin.table('profiles').select('*').eq('id', user_id).single().execute()
-        
-        if not profile_response.data:
-             raise HTTPException(status_code=404, detail="Perfil de usuario no encontrado")
+            if not profile_response.data:
+                 raise HTTPException(status_code=404, detail="Perfil de usuario no encontrado")
+            return profile_response.data
 
-        return profile_response.data
+        return await profile_cache.get_or_fetch(user_id, fetch_profile, tags=[])
 
     except Exception as e:
-        print(f"Authentication error: {str(e)}")
-        raise HTTPException(status_code=401, detail="Token inválido o expirado")
\ No newline at end of file
+        logger.warning("Authentication error", extra={"error": str(e)})
+        raise HTTPException(status_code=401, detail="Token inválido o expirado")
+    finally:
+        record_timing("auth", time.perf_counter() - start)
@@ -0,0 +1,83 @@
+"""
+Simula la ráfaga de solicitudes que llega justo antes del cierre de una convocatoria.
+
+Cada token (un estudiante) envía POST /applications a la misma beca, todos casi
+al mismo tiempo. Opcionalmente cada estudiante reintenta (doble clic, red móvil)
+para comprobar que el envío es idempotente: los reintentos deben responder 200,
+nunca 5xx ni duplicados.
+
+Uso:
+    # tokens.txt: un access token por línea (p. ej. generado con el stand-in local)
+    python benchmarks/application_burst.py --base-url http://localhost:8000 \
+        --tokens tokens.txt --scholarship-id <uuid> --concurrency 200 --retries 1
+"""
+import argparse
+import asyncio
+import collections
+import time
+
+import httpx
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def submit(client: httpx.AsyncClient, token: str, scholarship_id: str, semaphore: asyncio.Semaphore,
+                 statuses: collections.Counter, latencies: list):
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            response = await client.post(
+                "/applications",
+                json={"scholarship_id": scholarship_id},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            statuses[response.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+        latencies.append(time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--tokens", required=True, help="Archivo con un access token por línea")
+    parser.add_argument("--scholarship-id", required=True)
+    parser.add_argument("--concurrency", type=int, default=200, help="Peticiones simultáneas en vuelo")
+    parser.add_argument("--retries", type=int, default=1, help="Reenvíos por estudiante (prueba de idempotencia)")
+    args = parser.parse_args()
+
+    with open(args.tokens, encoding="utf-8") as f:
+        tokens = [line.strip() for line in f if line.strip()]
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        for attempt in range(1 + args.retries):
+            statuses, latencies = collections.Counter(), []
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                submit(client, token, args.scholarship_id, semaphore, statuses, latencies)
+                for token in tokens
+            ))
+            elapsed = time.perf_counter() - start
+            latencies.sort()
+
+            label = "envío inicial" if attempt == 0 else f"reintento {attempt}"
+            print(f"--- {label}: {len(tokens)} estudiantes en {elapsed:.2f}s "
+                  f"({len(tokens) / elapsed:.1f} req/s)")
+            print(f"    p50 {percentile(latencies, 50) * 1000:.1f} ms | "
+                  f"p95 {percentile(latencies, 95) * 1000:.1f} ms | "
+                  f"p99 {percentile(latencies, 99) * 1000:.1f} ms")
+            print(f"    códigos: {dict(statuses)}")
+            if attempt > 0 and set(statuses) - {200}:
+                print("    ⚠️  los reintentos deberían responder solo 200 (solicitud existente)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
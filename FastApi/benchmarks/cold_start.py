@@ -0,0 +1,90 @@
+"""
+Mide el arranque en frío de la API: tiempo de `import main` y tiempo hasta la
+primera respuesta de un proceso uvicorn recién lanzado (como en Vercel, donde
+cada instancia nueva paga ambos).
+
+Compara los modos de cliente de Supabase (SUPABASE_CLIENT=sdk|lean). Conviene
+correrlo antes y después de cambios en imports para detectar regresiones.
+
+Uso (desde FastApi/, con las variables de .env):
+    python benchmarks/cold_start.py --runs 10 --modes sdk,lean
+    python benchmarks/cold_start.py --path /scholarship-types   # incluye crear el cliente
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env: dict) -> float:
+    """Segundos de `import main` en un intérprete nuevo."""
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=APP_DIR, env=env, stderr=subprocess.DEVNULL
+    )
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def measure_first_response(env: dict, path: str, timeout: float) -> float:
+    """Segundos desde lanzar uvicorn hasta recibir la primera respuesta en `path`."""
+    port = _free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=timeout) as client:
+            while time.perf_counter() - start < timeout:
+                try:
+                    client.get(path)
+                    return time.perf_counter() - start
+                except httpx.TransportError:
+                    time.sleep(0.005)
+        raise RuntimeError(f"uvicorn no respondió en {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _summary(values: list) -> str:
+    ms = [v * 1000 for v in values]
+    return f"{statistics.median(ms):>10.1f} {min(ms):>9.1f} {max(ms):>9.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", default="sdk,lean")
+    parser.add_argument("--path", default="/", help="Ruta de la primera petición")
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    print(f"{'modo':>6} {'medición':>18} {'mediana ms':>10} {'min ms':>9} {'max ms':>9}")
+    for mode in args.modes.split(","):
+        env = {**os.environ, "SUPABASE_CLIENT": mode}
+        imports = [measure_import(env) for _ in range(args.runs)]
+        first = [measure_first_response(env, args.path, args.timeout) for _ in range(args.runs)]
+        print(f"{mode:>6} {'import main':>18} {_summary(imports)}")
+        print(f"{mode:>6} {'primera respuesta':>18} {_summary(first)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Benchmark de endpoints contra el Supabase falso (benchmarks/fake_supabase.py).
+
+Levanta el Supabase falso con datos de prueba y la API apuntando a él (cada uno en
+su propio proceso), obtiene tokens reales de admin, campus_admin y estudiantes, y
+para cada endpoint y nivel de concurrencia reporta p50/p95/p99, throughput y
+errores. La columna "auth" es la mediana del tiempo de la dependencia de
+autenticación según el header Server-Timing (validación del token + perfil).
+
+La API hereda las variables de entorno (p. ej. SUPABASE_CLIENT, RESPONSE_CACHE_TTL);
+los límites de /login se relajan para que la prueba de login mida la API y no
+el limitador.
+
+Uso:
+    python benchmarks/endpoints.py --scholarships 10000 --students 5000 --latency-ms 20 \
+        --levels 1,8,32 --requests 300
+    python benchmarks/endpoints.py --endpoints scholarships,stats --output antes.json
+    python benchmarks/endpoints.py --base-url http://localhost:8000 \
+        --supabase-url http://localhost:54321   # instancias ya en ejecución
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+from fake_supabase import DEFAULT_JWT_SECRET, PASSWORD
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS_DIR = os.path.join(APP_DIR, "benchmarks")
+
+STUDENT_TOKENS = 50
+BULK_USERS = 25
+SEARCH_TERMS = ["movilidad", "transporte", "idiomas", "titulación", "manutención", "investigación"]
+
+
+class Scenario:
+    """Una petición a medir: `build(i)` devuelve (params, json) para la i-ésima repetición."""
+
+    def __init__(self, name: str, method: str, path: str, role: str = None, build=None, default: bool = True):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.role = role
+        self.build = build or (lambda i, ctx: ({}, None))
+        self.default = default
+
+
+def bulk_users() -> list:
+    """Lote de alta masiva con emails y códigos únicos (cada petición crea usuarios nuevos)."""
+    batch = uuid.uuid4().hex[:8]
+    return [{"email": f"bulk-{batch}-{n}@example.com", "password": PASSWORD, "role": "student",
+             "student_code": f"BULK-{batch}-{n}"} for n in range(BULK_USERS)]
+
+
+SCENARIOS = [
+    Scenario("scholarship_types", "GET", "/scholarship-types"),
+    Scenario("scholarships", "GET", "/scholarships",
+             build=lambda i, ctx: ({"limit": 20, "offset": 20 * (i % 50)}, None)),
+    Scenario("scholarships_open", "GET", "/scholarships",
+             build=lambda i, ctx: ({"limit": 20, "status": "Abierta", "offset": 20 * (i % 20)}, None)),
+    Scenario("scholarships_cursor", "GET", "/scholarships",
+             build=lambda i, ctx: ({"limit": 20, "pagination": "cursor", "count": "none"}, None)),
+    Scenario("scholarships_search", "GET", "/scholarships",
+             build=lambda i, ctx: ({"limit": 20, "search": SEARCH_TERMS[i % len(SEARCH_TERMS)]}, None)),
+    Scenario("scholarships_ranked", "GET", "/scholarships",
+             build=lambda i, ctx: ({"limit": 20, "search_mode": "ranked",
+                                    "search": SEARCH_TERMS[i % len(SEARCH_TERMS)]}, None)),
+    Scenario("scholarships_batch", "POST", "/scholarships/batch",
+             build=lambda i, ctx: ({}, {"ids": ctx["open_ids"]})),
+    Scenario("login", "POST", "/login",
+             build=lambda i, ctx: ({}, {"email": f"student{i % ctx['students']}@example.com", "password": PASSWORD})),
+    Scenario("applications_me", "GET", "/applications/me", role="student"),
+    Scenario("submit_application", "POST", "/applications", role="student",
+             build=lambda i, ctx: ({}, {"scholarship_id": ctx["open_ids"][i % len(ctx["open_ids"])]})),
+    Scenario("stats", "GET", "/stats", role="admin"),
+    Scenario("stats_campus", "GET", "/stats", role="campus_admin"),
+    Scenario("admin_users", "GET", "/admin/users", role="admin",
+             build=lambda i, ctx: ({"limit": 50, "q": ["garc", "lópez", "student1"][i % 3]}, None)),
+    Scenario("scholarship_applications", "GET", "/admin/scholarships/{scholarship_id}/applications", role="admin"),
+    Scenario("bulk_users", "POST", "/admin/users/bulk", role="admin", default=False,
+             build=lambda i, ctx: ({"wait": "true"}, {"users": bulk_users()})),
+    Scenario("export_applications", "GET", "/export/applications", role="campus_admin",
+             build=lambda i, ctx: ({"format": "ndjson"}, None), default=False),
+    Scenario("export_scholarships", "GET", "/export/scholarships", role="admin",
+             build=lambda i, ctx: ({"format": "csv"}, None), default=False),
+]
+
+
+# --- PROCESOS ---
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, process: subprocess.Popen, timeout: float):
+    start = time.perf_counter()
+    with httpx.Client(timeout=5) as client:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"El proceso terminó antes de responder en {url}")
+            try:
+                client.get(url)
+                return
+            except httpx.TransportError:
+                time.sleep(0.05)
+    raise RuntimeError(f"{url} no respondió en {timeout}s")
+
+
+def start_fake_supabase(args) -> tuple:
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BENCHMARKS_DIR, "fake_supabase.py"), "--port", str(port),
+         "--scholarships", str(args.scholarships), "--students", str(args.students),
+         "--latency-ms", str(args.latency_ms), "--jwt-secret", DEFAULT_JWT_SECRET],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    _wait_ready(f"{url}/auth/v1/.well-known/jwks.json", process, timeout=300)
+    return process, url
+
+
+def start_api(args, supabase_url: str) -> tuple:
+    """uvicorn --workers N o, con --server gunicorn, el perfil de producción (gunicorn.conf.py)."""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "SUPABASE_URL": supabase_url,
+        "SUPABASE_ANON_KEY": "anon",
+        "SUPABASE_SERVICE_KEY": "service",
+        "SUPABASE_JWT_SECRET": DEFAULT_JWT_SECRET,
+        "LOGIN_RATE_PER_IP": "1000000/1",
+        "LOGIN_RATE_PER_EMAIL": "1000000/1",
+        "GUNICORN_LOG_LEVEL": "warning",
+    }
+    if args.server == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "main:app", "-c", "gunicorn.conf.py",
+                   "--bind", f"127.0.0.1:{port}", "--workers", str(args.workers)]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning",
+                   "--workers", str(args.workers)]
+    process = subprocess.Popen(command, cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    _wait_ready(f"{url}/", process, timeout=60)
+    return process, url
+
+
+# --- MEDICIÓN ---
+
+def percentile(sorted_values: list, p: float) -> float:
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def auth_ms(response: httpx.Response):
+    for part in response.headers.get("server-timing", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name == "auth" and params.startswith("dur="):
+            return float(params[4:].split(";")[0])
+    return None
+
+
+async def get_tokens(supabase_url: str, base_url: str, students: int) -> dict:
+    """Tokens de Auth por rol; se piden directo al Supabase falso cuando se conoce su URL."""
+    async with httpx.AsyncClient(timeout=30) as client:
+        async def login(email: str) -> str:
+            if supabase_url:
+                response = await client.post(f"{supabase_url}/auth/v1/token", params={"grant_type": "password"},
+                                             json={"email": email, "password": PASSWORD})
+            else:
+                response = await client.post(f"{base_url}/login", json={"email": email, "password": PASSWORD})
+            response.raise_for_status()
+            return response.json()["access_token"]
+
+        student_emails = [f"student{i}@example.com" for i in range(min(STUDENT_TOKENS, students))]
+        tokens = await asyncio.gather(login("admin@example.com"), login("campus0@example.com"),
+                                      *(login(email) for email in student_emails))
+    return {"admin": [tokens[0]], "campus_admin": [tokens[1]], "student": list(tokens[2:])}
+
+
+def request_kwargs(scenario: Scenario, ctx: dict, i: int) -> dict:
+    """Argumentos de client.request para la i-ésima repetición del escenario."""
+    params, body = scenario.build(i, ctx)
+    headers = {}
+    if scenario.role:
+        tokens = ctx["tokens"][scenario.role]
+        headers["Authorization"] = f"Bearer {tokens[i % len(tokens)]}"
+    return {"method": scenario.method, "url": scenario.path.format(**ctx), "params": params,
+            "json": body, "headers": headers}
+
+
+async def build_context(client: httpx.AsyncClient, supabase_url: str, base_url: str, students: int) -> dict:
+    open_scholarships = await client.get("/scholarships", params={"status": "Abierta", "limit": 100,
+                                                                  "fields": "id"})
+    open_ids = [row["id"] for row in open_scholarships.json()["data"]]
+    return {
+        "students": students,
+        "open_ids": open_ids,
+        "scholarship_id": open_ids[0] if open_ids else "00000000-0000-0000-0000-000000000000",
+        "tokens": await get_tokens(supabase_url, base_url, students),
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, ctx: dict, concurrency: int,
+                       total_requests: int) -> dict:
+    async def send(i: int) -> httpx.Response:
+        return await client.request(**request_kwargs(scenario, ctx, i))
+
+    # Calentamiento: conexiones abiertas y cachés (perfiles, catálogos) cargadas
+    await asyncio.gather(*(send(i) for i in range(concurrency)))
+
+    latencies, auth_times, errors = [], [], []
+    counter = iter(range(total_requests))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await send(i)
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+                timing = auth_ms(response)
+                if timing is not None:
+                    auth_times.append(timing)
+            except httpx.HTTPError as e:
+                errors.append(type(e).__name__)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "endpoint": scenario.name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "error_codes": sorted({str(code) for code in errors}),
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "auth_p50_ms": statistics.median(auth_times) if auth_times else None,
+    }
+
+
+def select_scenarios(endpoints: str) -> list:
+    names = None if endpoints == "default" else set(endpoints.split(","))
+    return [s for s in SCENARIOS if (s.default if names is None else (s.name in names or "all" in names))]
+
+
+async def run(args, base_url: str, supabase_url: str) -> list:
+    scenarios = select_scenarios(args.endpoints)
+    levels = [int(level) for level in args.levels.split(",")]
+
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        ctx = await build_context(client, supabase_url, base_url, args.students)
+
+        print(f"{'endpoint':<26} {'conc':>5} {'req':>6} {'err':>5} {'req/s':>9} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'auth ms':>8}")
+        results = []
+        for scenario in scenarios:
+            for level in levels:
+                result = await run_scenario(client, scenario, ctx, level, args.requests)
+                results.append(result)
+                auth = f"{result['auth_p50_ms']:.2f}" if result["auth_p50_ms"] is not None else "-"
+                codes = f"  ({', '.join(result['error_codes'])})" if result["errors"] else ""
+                print(
+                    f"{result['endpoint']:<26} {result['concurrency']:>5} {result['requests']:>6} "
+                    f"{result['errors']:>5} {result['throughput']:>9.1f} {result['p50_ms']:>8.1f} "
+                    f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {auth:>8}{codes}"
+                )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="API ya en ejecución (si no, se lanza una)")
+    parser.add_argument("--supabase-url", help="Supabase falso ya en ejecución (si no, se lanza uno)")
+    parser.add_argument("--scholarships", type=int, default=10000)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latencia simulada por llamada a Supabase")
+    parser.add_argument("--workers", type=int, default=1, help="Workers de la API")
+    parser.add_argument("--server", choices=["uvicorn", "gunicorn"], default="uvicorn",
+                        help="gunicorn usa gunicorn.conf.py (perfil de producción)")
+    parser.add_argument("--levels", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=200, help="Peticiones por endpoint y nivel")
+    parser.add_argument("--endpoints", default="default",
+                        help="Lista separada por comas, 'default' o 'all': " + ", ".join(s.name for s in SCENARIOS))
+    parser.add_argument("--output", help="Guardar resultados en JSON (para comparar antes/después)")
+    args = parser.parse_args()
+
+    processes = []
+    try:
+        supabase_url = args.supabase_url
+        if not supabase_url and not args.base_url:
+            process, supabase_url = start_fake_supabase(args)
+            processes.append(process)
+        base_url = args.base_url
+        if not base_url:
+            process, base_url = start_api(args, supabase_url)
+            processes.append(process)
+
+        results = asyncio.run(run(args, base_url, supabase_url))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
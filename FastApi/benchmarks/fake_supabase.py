@@ -0,0 +1,912 @@
+"""
+Supabase falso en memoria (PostgREST + GoTrue) para ejecutar y medir la API sin
+un proyecto real ni Docker.
+
+Implementa lo que usan los routers: select con columnas y recursos embebidos
+(applications -> scholarships/profiles, incluido !inner), filtros eq/neq/gt/gte/
+lt/lte/in/is/like/ilike, or=(...) con and(...) anidado, order, limit/offset,
+Prefer: count=..., .single(), insert/upsert/update/delete con
+return=representation, las funciones RPC de las migraciones (search_scholarships,
+submit_application, sync_scholarship_status, refresh_dashboard_stats) y los
+endpoints de Auth (password, signup, user, admin/users). Los tokens se firman
+con HS256, así que la API los valida localmente igual que en producción.
+
+Los datos se generan al arrancar (deterministas con --seed). Todos los usuarios
+tienen la contraseña PASSWORD: admin@example.com (admin),
+campus0@example.com... (campus_admin de cada centro) y student0@example.com...
+
+Uso:
+    python benchmarks/fake_supabase.py --port 54321 --scholarships 10000 --students 5000 \
+        --latency-ms 20
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_ANON_KEY=anon SUPABASE_SERVICE_KEY=service \
+        SUPABASE_JWT_SECRET=fake-supabase-jwt-secret-0123456789abcdef uvicorn main:app --port 8000
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import jwt
+import orjson
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+DEFAULT_JWT_SECRET = "fake-supabase-jwt-secret-0123456789abcdef"
+PASSWORD = "password123"
+TOKEN_TTL = 3600
+
+OPEN_STATUSES = ("Abierta", "active")
+STATS_TIMEZONE = ZoneInfo("America/Mexico_City")
+
+TIMESTAMP_COLUMNS = {
+    "created_at", "updated_at", "submitted_at", "application_start_date",
+    "application_end_date", "refreshed_at", "last_submitted_at",
+}
+
+# Columnas (con su valor por defecto) de cada tabla, como en las migraciones
+COLUMNS = {
+    "scholarships": {
+        "id": None, "university_center_id": None, "scholarship_type_id": None, "title": None,
+        "description": None, "requirements": None, "application_start_date": None,
+        "application_end_date": None, "status": "Cerrada", "created_at": None,
+        "search_vector": None,  # Generada en la BD; la API no debe exponerla
+    },
+    "applications": {"id": None, "student_id": None, "scholarship_id": None, "status": "Recibida", "submitted_at": None},
+    "profiles": {
+        "id": None, "university_center_id": None, "full_name": None, "student_code": None, "gpa": None,
+        "email": None, "role": "student", "campus": None, "updated_at": None,
+    },
+    "scholarship_types": {"id": None, "name": None, "description": None, "created_at": None},
+    "university_centers": {"id": None, "name": None, "acronym": None, "created_at": None},
+}
+# Columnas con valor generado al insertar
+GENERATED = {"id": lambda: str(uuid.uuid4()), "created_at": lambda: now_iso(),
+             "submitted_at": lambda: now_iso(), "updated_at": lambda: now_iso(),
+             "search_vector": lambda: "'beca':1"}
+# Llaves únicas además de la primaria
+UNIQUE = {"applications": [("student_id", "scholarship_id")], "profiles": [("student_code",)]}
+# Relaciones muchos-a-uno para recursos embebidos: tabla -> recurso -> (columna FK, tabla)
+RELATIONS = {
+    "applications": {"scholarships": ("scholarship_id", "scholarships"), "profiles": ("student_id", "profiles")},
+    "scholarships": {
+        "university_centers": ("university_center_id", "university_centers"),
+        "scholarship_types": ("scholarship_type_id", "scholarship_types"),
+    },
+}
+
+CENTERS = [
+    ("Centro Universitario de Ciencias Exactas e Ingenierías", "CUCEI"),
+    ("Centro Universitario de Ciencias Económico Administrativas", "CUCEA"),
+    ("Centro Universitario de Ciencias de la Salud", "CUCS"),
+    ("Centro Universitario de Ciencias Sociales y Humanidades", "CUCSH"),
+    ("Centro Universitario de Arte, Arquitectura y Diseño", "CUAAD"),
+    ("Centro Universitario de Ciencias Biológicas y Agropecuarias", "CUCBA"),
+    ("Centro Universitario de los Altos", "CUALTOS"),
+    ("Centro Universitario de la Ciénega", "CUCIENEGA"),
+    ("Centro Universitario de la Costa", "CUCOSTA"),
+    ("Centro Universitario del Sur", "CUSUR"),
+    ("Centro Universitario de Tonalá", "CUTONALA"),
+    ("Centro Universitario de los Valles", "CUVALLES"),
+]
+TYPES = ["Excelencia académica", "Apoyo económico", "Movilidad", "Deportiva", "Cultural", "Transporte"]
+TITLE_WORDS = ["Beca", "Apoyo", "Programa", "Estímulo", "Convocatoria"]
+TOPICS = ["investigación", "titulación", "movilidad internacional", "alimentación", "transporte",
+          "manutención", "idiomas", "emprendimiento", "servicio social", "deporte de alto rendimiento"]
+FIRST_NAMES = ["Ana", "Luis", "María", "José", "Fernanda", "Carlos", "Sofía", "Diego", "Valeria", "Jorge"]
+LAST_NAMES = ["García", "Hernández", "López", "Martínez", "González", "Pérez", "Rodríguez", "Sánchez"]
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def parse_timestamp(value):
+    if isinstance(value, datetime):
+        return value
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def status_at(start, end, at: datetime):
+    """Misma regla que scholarship_status_at() de la migración scholarship_status_sync."""
+    if start is None and end is None:
+        return None
+    start, end = parse_timestamp(start) if start else None, parse_timestamp(end) if end else None
+    if (start is None or at >= start) and (end is None or at <= end):
+        return "Abierta"
+    return "Cerrada"
+
+
+class PostgrestError(Exception):
+    def __init__(self, status: int, code: str, message: str):
+        self.status, self.code, self.message = status, code, message
+
+
+# --- ALMACÉN ---
+
+class Table:
+    """
+    Filas por llave primaria. Los índices de igualdad se mantienen al insertar y se
+    descartan (junto con los órdenes cacheados) al modificar o borrar filas.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows = {}
+        self._indexes = {}
+        self._sorted = {}
+        self._next_key = 0
+
+    def key_for(self, row: dict):
+        if row.get("id") is not None:
+            return row["id"]
+        self._next_key += 1
+        return self._next_key
+
+    def add(self, row: dict):
+        self.rows[self.key_for(row)] = row
+        for column, index in self._indexes.items():
+            index.setdefault(str(row.get(column)), []).append(row)
+        self._sorted.clear()
+
+    def touch(self):
+        self._indexes.clear()
+        self._sorted.clear()
+
+    def index(self, column: str) -> dict:
+        if column not in self._indexes:
+            index = {}
+            for row in self.rows.values():
+                index.setdefault(str(row.get(column)), []).append(row)
+            self._indexes[column] = index
+        return self._indexes[column]
+
+    def sorted_rows(self, order: tuple) -> list:
+        if order not in self._sorted:
+            self._sorted[order] = sort_rows(list(self.rows.values()), order)
+        return self._sorted[order]
+
+
+class Store:
+    def __init__(self):
+        self.tables = {name: Table(name) for name in COLUMNS}
+        self.users = {}       # email -> usuario de Auth
+        self.users_by_id = {}
+
+    def table(self, name: str) -> Table:
+        if name not in self.tables:
+            raise PostgrestError(404, "42P01", f'relation "public.{name}" does not exist')
+        return self.tables[name]
+
+    def add_user(self, email: str, password: str, user_id: str = None) -> dict:
+        if email in self.users:
+            raise PostgrestError(422, "email_exists", "A user with this email address has already been registered")
+        user = {"id": user_id or str(uuid.uuid4()), "email": email, "password": password, "created_at": now_iso()}
+        self.users[email] = user
+        self.users_by_id[user["id"]] = user
+        return user
+
+    def delete_user(self, user_id: str) -> bool:
+        user = self.users_by_id.pop(user_id, None)
+        if user:
+            self.users.pop(user["email"], None)
+        return user is not None
+
+    # Escrituras
+
+    def insert(self, table_name: str, rows: list, upsert: bool = False, on_conflict: str = None,
+               missing_default: bool = True) -> list:
+        table = self.table(table_name)
+        columns = COLUMNS[table_name]
+        conflict_columns = tuple(on_conflict.split(",")) if on_conflict else ("id",)
+        written, added, previous = [], [], []
+        try:
+            for payload in rows:
+                unknown = set(payload) - set(columns)
+                if unknown:
+                    raise PostgrestError(400, "PGRST204", f"Could not find the '{unknown.pop()}' column of '{table_name}'")
+
+                existing = None
+                if upsert:
+                    existing = self._find_by(table, conflict_columns, payload)
+                if existing is not None:
+                    previous.append((existing, dict(existing)))
+                    existing.update(payload)
+                    table.touch()
+                    row = existing
+                else:
+                    row = {column: default for column, default in columns.items()}
+                    for column, generate in GENERATED.items():
+                        if column in columns:
+                            row[column] = generate()
+                    row.update(payload)
+                    if table_name == "scholarships":
+                        self._apply_status(row)
+                    self._check_unique(table, row)
+                    table.add(row)
+                    added.append(row)
+                if existing is not None and table_name == "scholarships":
+                    self._apply_status(row)
+                written.append(row)
+        except PostgrestError:
+            # Un INSERT de varias filas es una sola sentencia: falla completo
+            for row, snapshot in previous:
+                row.clear()
+                row.update(snapshot)
+                table.touch()
+            if added:
+                self.delete(table_name, added)
+            raise
+        return written
+
+    def update(self, table_name: str, rows: list, changes: dict) -> list:
+        table = self.table(table_name)
+        unknown = set(changes) - set(COLUMNS[table_name])
+        if unknown:
+            raise PostgrestError(400, "PGRST204", f"Could not find the '{unknown.pop()}' column of '{table_name}'")
+        for row in rows:
+            row.update(changes)
+            if table_name == "scholarships":
+                self._apply_status(row)
+        table.touch()
+        return rows
+
+    def delete(self, table_name: str, rows: list) -> list:
+        table = self.table(table_name)
+        removed = {id(row) for row in rows}
+        table.rows = {key: row for key, row in table.rows.items() if id(row) not in removed}
+        removed_ids = {row.get("id") for row in rows}
+        if table_name == "scholarships" and removed_ids:
+            # ON DELETE CASCADE de applications.scholarship_id
+            applications = self.tables["applications"]
+            applications.rows = {
+                key: application for key, application in applications.rows.items()
+                if application["scholarship_id"] not in removed_ids
+            }
+            applications.touch()
+        table.touch()
+        return rows
+
+    def _find_by(self, table: Table, columns: tuple, payload: dict):
+        if not all(column in payload for column in columns):
+            return None
+        if columns == ("id",):
+            return table.rows.get(payload["id"])
+        for row in table.index(columns[0]).get(str(payload[columns[0]]), []):
+            if all(row.get(column) == payload[column] for column in columns):
+                return row
+        return None
+
+    def _check_unique(self, table: Table, row: dict):
+        if row.get("id") in table.rows:
+            raise PostgrestError(409, "23505", f'duplicate key value violates unique constraint "{table.name}_pkey"')
+        for columns in UNIQUE.get(table.name, []):
+            values = tuple(row.get(column) for column in columns)
+            if None in values:
+                continue
+            if self._find_by(table, columns, dict(zip(columns, values))) is not None:
+                raise PostgrestError(
+                    409, "23505", f'duplicate key value violates unique constraint "{table.name}_{"_".join(columns)}_key"'
+                )
+
+    @staticmethod
+    def _apply_status(row: dict):
+        # Trigger scholarships_set_status
+        status = status_at(row.get("application_start_date"), row.get("application_end_date"), datetime.now(timezone.utc))
+        if status:
+            row["status"] = status
+
+    # Vistas materializadas de dashboard_stats
+
+    def refresh_stats(self) -> str:
+        scholarships = self.tables["scholarships"].rows
+        summary, applications_summary, by_scholarship, daily = {}, {}, {}, {}
+        for s in scholarships.values():
+            key = (s["university_center_id"], s["scholarship_type_id"], s["status"])
+            summary[key] = summary.get(key, 0) + 1
+        for a in self.tables["applications"].rows.values():
+            s = scholarships.get(a["scholarship_id"])
+            if not s:
+                continue
+            key = (s["university_center_id"], a["status"])
+            applications_summary[key] = applications_summary.get(key, 0) + 1
+            entry = by_scholarship.setdefault(s["id"], {
+                "scholarship_id": s["id"], "university_center_id": s["university_center_id"],
+                "title": s["title"], "applications": 0, "last_submitted_at": None,
+            })
+            entry["applications"] += 1
+            if a["submitted_at"]:
+                if entry["last_submitted_at"] is None or a["submitted_at"] > entry["last_submitted_at"]:
+                    entry["last_submitted_at"] = a["submitted_at"]
+                day = parse_timestamp(a["submitted_at"]).astimezone(STATS_TIMEZONE).date().isoformat()
+                daily[(day, s["university_center_id"])] = daily.get((day, s["university_center_id"]), 0) + 1
+
+        refreshed_at = now_iso()
+        views = {
+            "stats_scholarships_summary": [
+                {"university_center_id": c, "scholarship_type_id": t, "status": st, "scholarships": n}
+                for (c, t, st), n in summary.items()
+            ],
+            "stats_applications_summary": [
+                {"university_center_id": c, "status": st, "applications": n} for (c, st), n in applications_summary.items()
+            ],
+            "stats_applications_by_scholarship": list(by_scholarship.values()),
+            "stats_applications_daily": [
+                {"day": d, "university_center_id": c, "applications": n} for (d, c), n in daily.items()
+            ],
+            "stats_refresh_log": [{"id": True, "refreshed_at": refreshed_at}],
+        }
+        for name, rows in views.items():
+            table = self.tables[name] = Table(name)
+            for row in rows:
+                table.add(row)
+        return refreshed_at
+
+
+# --- DATOS DE PRUEBA ---
+
+def seed(store: Store, scholarships: int, students: int, applications_per_student: int, seed_value: int = 42):
+    rng = random.Random(seed_value)
+    make_id = lambda: str(uuid.UUID(int=rng.getrandbits(128), version=4))  # noqa: E731
+    now = datetime.now(timezone.utc)
+
+    centers = [{"id": make_id(), "name": name, "acronym": acronym, "created_at": now_iso()} for name, acronym in CENTERS]
+    types = [{"id": make_id(), "name": name, "description": f"Becas de tipo {name.lower()}", "created_at": now_iso()}
+             for name in TYPES]
+    store.insert("university_centers", centers)
+    store.insert("scholarship_types", types)
+
+    rows = []
+    for i in range(scholarships):
+        created_at = now - timedelta(days=rng.uniform(0, 730))
+        start = created_at + timedelta(days=rng.uniform(0, 30))
+        topic = rng.choice(TOPICS)
+        rows.append({
+            "id": make_id(),
+            "university_center_id": rng.choice(centers)["id"],
+            "scholarship_type_id": rng.choice(types)["id"],
+            "title": f"{rng.choice(TITLE_WORDS)} de {topic} {2024 + i % 3}-{'AB'[i % 2]} #{i}",
+            "description": (
+                f"Convocatoria de {topic} para estudiantes de licenciatura y posgrado con promedio "
+                f"mínimo de {rng.randint(75, 95)}. Incluye apoyo económico mensual, seguimiento académico "
+                "y acompañamiento durante el periodo de la beca. Consulta las bases completas."
+            ),
+            "requirements": ["Constancia de estudios", "Kárdex certificado", "Identificación oficial",
+                             f"Carta de exposición de motivos ({topic})"][:rng.randint(2, 4)],
+            "application_start_date": start.isoformat(),
+            "application_end_date": (start + timedelta(days=rng.uniform(14, 120))).isoformat(),
+            "created_at": created_at.isoformat(),
+        })
+    store.insert("scholarships", rows)
+
+    profiles = [{"id": make_id(), "email": "admin@example.com", "full_name": "Administrador General",
+                 "student_code": "ADMIN", "role": "admin"}]
+    for i, center in enumerate(centers):
+        profiles.append({"id": make_id(), "email": f"campus{i}@example.com", "full_name": f"Admin {center['acronym']}",
+                         "student_code": f"ADMIN-{center['acronym']}", "role": "campus_admin", "campus": center["id"]})
+    for i in range(students):
+        center = rng.choice(centers)
+        profiles.append({
+            "id": make_id(), "email": f"student{i}@example.com",
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "student_code": f"{220000000 + i}", "role": "student", "university_center_id": center["id"],
+            "gpa": round(rng.uniform(70, 100), 1),
+        })
+    store.insert("profiles", profiles)
+    for profile in profiles:
+        store.add_user(profile["email"], PASSWORD, profile["id"])
+
+    scholarship_ids = [row["id"] for row in rows]
+    applications = []
+    for profile in profiles[1 + len(centers):]:
+        for scholarship_id in rng.sample(scholarship_ids, min(applications_per_student, len(scholarship_ids))):
+            applications.append({
+                "id": make_id(), "student_id": profile["id"], "scholarship_id": scholarship_id,
+                "status": rng.choice(["Recibida", "Recibida", "En revisión", "Aprobada", "Rechazada"]),
+                "submitted_at": (now - timedelta(days=rng.uniform(0, 120))).isoformat(),
+            })
+    store.insert("applications", applications)
+    store.refresh_stats()
+
+
+# --- CONSULTAS POSTGREST ---
+
+def split_top_level(text: str, separator: str = ",") -> list:
+    """Separa por comas fuera de paréntesis y comillas."""
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        if char == separator and depth == 0 and not quoted:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    if current:
+        parts.append("".join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def like_regex(pattern: str, flags: int = 0):
+    regex, escaped = [], False
+    for char in pattern:
+        if escaped:
+            regex.append(re.escape(char))
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in "%*":
+            regex.append(".*")
+        elif char == "_":
+            regex.append(".")
+        else:
+            regex.append(re.escape(char))
+    return re.compile("".join(regex), flags | re.DOTALL)
+
+
+def coerce(column: str, row_value, value: str):
+    """Convierte el valor del filtro al tipo de la columna para comparar."""
+    if column in TIMESTAMP_COLUMNS:
+        return parse_timestamp(row_value) if row_value is not None else None, parse_timestamp(value)
+    if isinstance(row_value, bool):
+        return row_value, value == "true"
+    if isinstance(row_value, (int, float)):
+        return row_value, float(value)
+    return (None if row_value is None else str(row_value)), value
+
+
+COMPARATORS = {
+    "eq": lambda a, b: a == b, "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a > b, "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b, "lte": lambda a, b: a <= b,
+}
+
+
+def make_filter(column: str, expression: str):
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    operator, _, raw = expression.partition(".")
+
+    if operator in COMPARATORS:
+        compare, value = COMPARATORS[operator], unquote(raw)
+
+        def predicate(row):
+            left, right = coerce(column, row.get(column), value)
+            return left is not None and right is not None and compare(left, right)
+    elif operator == "in":
+        values = {unquote(v) for v in split_top_level(raw.strip()[1:-1])}
+        predicate = lambda row: row.get(column) is not None and str(row.get(column)) in values  # noqa: E731
+    elif operator == "is":
+        expected = {"null": None, "true": True, "false": False}[raw]
+        predicate = lambda row: row.get(column) is expected  # noqa: E731
+    elif operator in ("like", "ilike"):
+        regex = like_regex(unquote(raw), re.IGNORECASE if operator == "ilike" else 0)
+        predicate = lambda row: row.get(column) is not None and regex.fullmatch(str(row.get(column))) is not None  # noqa: E731
+    else:
+        raise PostgrestError(400, "PGRST100", f'"failed to parse filter ({operator}.{raw})"')
+
+    return (lambda row: not predicate(row)) if negate else predicate
+
+
+def make_logic_filter(operator: str, expression: str):
+    """or=(a.eq.1,and(b.lt.2,c.gt.3))"""
+    conditions = []
+    for part in split_top_level(expression.strip()[1:-1]):
+        if part.startswith(("and(", "or(")):
+            nested, _, rest = part.partition("(")
+            conditions.append(make_logic_filter(nested, "(" + rest))
+        else:
+            column, _, condition = part.partition(".")
+            conditions.append(make_filter(column, condition))
+    combine = any if operator == "or" else all
+    return lambda row: combine(condition(row) for condition in conditions)
+
+
+def parse_select(select: str):
+    columns, embeds = [], []
+    for item in split_top_level(select or "*"):
+        if item.endswith(")") and "(" in item:
+            name, _, inner = item[:-1].partition("(")
+            resource, _, hint = name.partition("!")
+            embeds.append({"name": resource.strip(), "inner": hint == "inner", "select": parse_select(inner)})
+        else:
+            columns.append(item.split("::")[0].strip())
+    return {"columns": columns, "embeds": embeds}
+
+
+def project(store: Store, table_name: str, row: dict, select: dict, embedded_filters: dict):
+    """Proyecta columnas y resuelve recursos embebidos; None si un !inner no coincide."""
+    if "*" in select["columns"]:
+        result = dict(row)
+    else:
+        result = {column: row.get(column) for column in select["columns"]}
+    for embed in select["embeds"]:
+        relation = RELATIONS.get(table_name, {}).get(embed["name"])
+        if relation is None:
+            raise PostgrestError(400, "PGRST200", f"Could not find a relationship between '{table_name}' and '{embed['name']}'")
+        foreign_key, target = relation
+        child = store.table(target).rows.get(row.get(foreign_key))
+        filters = embedded_filters.get(embed["name"], [])
+        if child is not None and not all(condition(child) for condition in filters):
+            child = None
+        if child is None and embed["inner"]:
+            return None
+        result[embed["name"]] = project(store, target, child, embed["select"], {}) if child else None
+    return result
+
+
+def sort_rows(rows: list, order: tuple) -> list:
+    for column, descending, nulls_first in reversed(order):
+        present = [row for row in rows if row.get(column) is not None]
+        missing = [row for row in rows if row.get(column) is None]
+        present.sort(key=lambda row: sort_key(column, row[column]), reverse=descending)
+        rows = missing + present if nulls_first else present + missing
+    return rows
+
+
+def sort_key(column: str, value):
+    return parse_timestamp(value) if column in TIMESTAMP_COLUMNS else value
+
+
+def parse_order(order: str) -> tuple:
+    result = []
+    for part in split_top_level(order or ""):
+        column, *modifiers = part.split(".")
+        descending = "desc" in modifiers
+        nulls_first = "nullsfirst" in modifiers or (descending and "nullslast" not in modifiers)
+        result.append((column, descending, nulls_first))
+    return tuple(result)
+
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+def select_rows(store: Store, table_name: str, params) -> tuple:
+    """Filas que cumplen los filtros de la petición, en orden, más las partes de select/embebidos."""
+    table = store.table(table_name)
+    select = parse_select(params.get("select", "*"))
+    embed_names = {embed["name"] for embed in select["embeds"]}
+
+    filters, embedded_filters, index_lookup = [], {}, None
+    for key, value in params.multi_items():
+        if key in RESERVED_PARAMS:
+            continue
+        if key in ("or", "and"):
+            filters.append(make_logic_filter(key, value))
+            continue
+        resource, _, column = key.partition(".")
+        if column and resource in embed_names:
+            embedded_filters.setdefault(resource, []).append(make_filter(column, value))
+            continue
+        if index_lookup is None and value.startswith("eq.") and key not in TIMESTAMP_COLUMNS:
+            index_lookup = (key, unquote(value[3:]))
+        filters.append(make_filter(key, value))
+
+    order = parse_order(params.get("order"))
+    if index_lookup:
+        candidates = table.index(index_lookup[0]).get(index_lookup[1], [])
+        candidates = sort_rows(list(candidates), order) if order else candidates
+    else:
+        candidates = table.sorted_rows(order) if order else list(table.rows.values())
+
+    rows = [row for row in candidates if all(condition(row) for condition in filters)]
+    return rows, select, embedded_filters
+
+
+def prefer(request: Request) -> dict:
+    values = {}
+    for part in request.headers.get("prefer", "").split(","):
+        key, _, value = part.strip().partition("=")
+        if key:
+            values[key] = value
+    return values
+
+
+def json_response(data, status: int = 200, headers: dict = None) -> Response:
+    return Response(orjson.dumps(data), status_code=status, headers=headers, media_type="application/json")
+
+
+def error_response(error: PostgrestError) -> Response:
+    return json_response({"code": error.code, "message": error.message, "details": None, "hint": None}, error.status)
+
+
+def render_rows(store: Store, table_name: str, rows: list, select: dict, embedded_filters: dict, request: Request,
+                status: int = 200, total=None, offset: int = 0) -> Response:
+    projected = [
+        result for result in (project(store, table_name, row, select, embedded_filters) for row in rows)
+        if result is not None
+    ]
+    headers = {}
+    if projected:
+        headers["Content-Range"] = f"{offset}-{offset + len(projected) - 1}/{'*' if total is None else total}"
+    else:
+        headers["Content-Range"] = f"*/{'*' if total is None else total}"
+
+    if "vnd.pgrst.object" in request.headers.get("accept", ""):
+        if len(projected) != 1:
+            return json_response({
+                "code": "PGRST116", "message": "JSON object requested, multiple (or no) rows returned",
+                "details": f"The result contains {len(projected)} rows", "hint": None,
+            }, 406)
+        return json_response(projected[0], status, headers)
+    return json_response(projected, status, headers)
+
+
+class FakeSupabase:
+    def __init__(self, store: Store, jwt_secret: str, latency_ms: float = 0):
+        self.store = store
+        self.jwt_secret = jwt_secret
+        self.latency = latency_ms / 1000
+
+    async def delay(self):
+        # Latencia de red/BD simulada por llamada
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    # PostgREST
+
+    async def table_endpoint(self, request: Request) -> Response:
+        await self.delay()
+        table_name = request.path_params["table"]
+        try:
+            if request.method == "GET" or request.method == "HEAD":
+                return self._get(table_name, request)
+            if request.method == "POST":
+                return await self._post(table_name, request)
+            if request.method == "PATCH":
+                return await self._patch(table_name, request)
+            return self._delete(table_name, request)
+        except PostgrestError as e:
+            return error_response(e)
+
+    def _get(self, table_name: str, request: Request) -> Response:
+        params = request.query_params
+        rows, select, embedded_filters = select_rows(self.store, table_name, params)
+        if any(embed["inner"] for embed in select["embeds"]):
+            rows = [row for row in rows if project(self.store, table_name, row, select, embedded_filters) is not None]
+
+        count = prefer(request).get("count")
+        total = len(rows) if count else None
+        offset = int(params.get("offset", 0))
+        limit = params.get("limit")
+        page = rows[offset:offset + int(limit)] if limit is not None else rows[offset:]
+        return render_rows(self.store, table_name, page, select, embedded_filters, request, total=total, offset=offset)
+
+    async def _post(self, table_name: str, request: Request) -> Response:
+        payload = orjson.loads(await request.body())
+        preferences = prefer(request)
+        rows = self.store.insert(
+            table_name, payload if isinstance(payload, list) else [payload],
+            upsert=preferences.get("resolution") == "merge-duplicates",
+            on_conflict=request.query_params.get("on_conflict"),
+        )
+        return self._written(table_name, rows, request, 201)
+
+    async def _patch(self, table_name: str, request: Request) -> Response:
+        changes = orjson.loads(await request.body())
+        rows, _, _ = select_rows(self.store, table_name, request.query_params)
+        return self._written(table_name, self.store.update(table_name, rows, changes), request, 200)
+
+    def _delete(self, table_name: str, request: Request) -> Response:
+        rows, _, _ = select_rows(self.store, table_name, request.query_params)
+        return self._written(table_name, self.store.delete(table_name, rows), request, 200)
+
+    def _written(self, table_name: str, rows: list, request: Request, status: int) -> Response:
+        if prefer(request).get("return") != "representation":
+            return Response(status_code=204 if status == 200 else status)
+        select = parse_select(request.query_params.get("select", "*"))
+        return render_rows(self.store, table_name, rows, select, {}, request, status)
+
+    async def rpc_endpoint(self, request: Request) -> Response:
+        await self.delay()
+        name = request.path_params["function"]
+        body = await request.body()
+        args = orjson.loads(body) if body else {}
+        handler = getattr(self, f"rpc_{name}", None)
+        if handler is None:
+            return error_response(PostgrestError(404, "PGRST202", f"Could not find the function public.{name}"))
+        try:
+            return json_response(handler(**args))
+        except PostgrestError as e:
+            return error_response(e)
+
+    def rpc_search_scholarships(self, search_term, p_status=None, p_university_center_id=None,
+                                p_scholarship_type_id=None, p_limit=100, p_offset=0):
+        # El término llega sin escapar; como en la migración, solo se escapa para el ILIKE
+        escaped = search_term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        regex = like_regex(f"%{escaped}%", re.IGNORECASE)
+        term = search_term.lower()
+        matches = []
+        for row in self.store.tables["scholarships"].rows.values():
+            if p_status and row["status"] != p_status:
+                continue
+            if p_university_center_id and row["university_center_id"] != p_university_center_id:
+                continue
+            if p_scholarship_type_id and row["scholarship_type_id"] != p_scholarship_type_id:
+                continue
+            title, description = row["title"] or "", row["description"] or ""
+            if regex.fullmatch(title) or regex.fullmatch(description):
+                rank = 2 * title.lower().count(term) + description.lower().count(term)
+                public = {key: value for key, value in row.items() if key != "search_vector"}
+                matches.append({**public, "rank": float(rank)})
+        matches.sort(key=lambda row: (row["rank"], parse_timestamp(row["created_at"]), row["id"]), reverse=True)
+        limit, offset = min(max(p_limit, 1), 1000), max(p_offset, 0)
+        return [{**row, "total_count": len(matches)} for row in matches[offset:offset + limit]]
+
+    def rpc_submit_application(self, p_student_id, p_scholarship_id):
+        scholarship = self.store.tables["scholarships"].rows.get(p_scholarship_id)
+        empty = {"id": None, "student_id": p_student_id, "scholarship_id": p_scholarship_id,
+                 "status": None, "submitted_at": None}
+        if scholarship is None:
+            return [{"result": "not_found", **empty}]
+        for row in self.store.tables["applications"].index("student_id").get(p_student_id, []):
+            if row["scholarship_id"] == p_scholarship_id:
+                return [{"result": "exists", **row}]
+        if status_at(scholarship["application_start_date"], scholarship["application_end_date"],
+                     datetime.now(timezone.utc)) == "Cerrada":
+            return [{"result": "closed", **empty}]
+        row = self.store.insert("applications", [{"student_id": p_student_id, "scholarship_id": p_scholarship_id}])[0]
+        return [{"result": "created", **row}]
+
+    def rpc_sync_scholarship_status(self, p_batch_size=1000):
+        now = datetime.now(timezone.utc)
+        table = self.store.tables["scholarships"]
+        to_open, to_close = [], []
+        for row in table.rows.values():
+            status = status_at(row["application_start_date"], row["application_end_date"], now)
+            if status == "Abierta" and row["status"] != "Abierta" and len(to_open) < p_batch_size:
+                to_open.append(row)
+            elif status == "Cerrada" and row["status"] in OPEN_STATUSES and len(to_close) < p_batch_size:
+                to_close.append(row)
+        for row in to_open:
+            row["status"] = "Abierta"
+        for row in to_close:
+            row["status"] = "Cerrada"
+        if to_open or to_close:
+            table.touch()
+        return [
+            {key: row[key] for key in ("id", "university_center_id", "scholarship_type_id", "status")}
+            for row in to_open + to_close
+        ]
+
+    def rpc_refresh_dashboard_stats(self):
+        return self.store.refresh_stats()
+
+    # GoTrue
+
+    def _user_json(self, user: dict) -> dict:
+        return {
+            "id": user["id"], "aud": "authenticated", "role": "authenticated", "email": user["email"],
+            "email_confirmed_at": user["created_at"], "created_at": user["created_at"],
+            "updated_at": user["created_at"], "app_metadata": {"provider": "email", "providers": ["email"]},
+            "user_metadata": {}, "identities": [], "is_anonymous": False,
+        }
+
+    def _session(self, user: dict) -> dict:
+        issued = int(time.time())
+        token = jwt.encode({
+            "sub": user["id"], "aud": "authenticated", "role": "authenticated", "email": user["email"],
+            "iat": issued, "exp": issued + TOKEN_TTL, "session_id": str(uuid.uuid4()),
+        }, self.jwt_secret, algorithm="HS256")
+        return {
+            "access_token": token, "token_type": "bearer", "expires_in": TOKEN_TTL,
+            "expires_at": issued + TOKEN_TTL, "refresh_token": uuid.uuid4().hex, "user": self._user_json(user),
+        }
+
+    def _auth_error(self, status: int, code: str, message: str) -> Response:
+        return json_response({"code": status, "error_code": code, "msg": message}, status)
+
+    async def token(self, request: Request) -> Response:
+        await self.delay()
+        body = orjson.loads(await request.body())
+        user = self.store.users.get((body.get("email") or "").lower())
+        if user is None or user["password"] != body.get("password"):
+            return self._auth_error(400, "invalid_credentials", "Invalid login credentials")
+        return json_response(self._session(user))
+
+    async def signup(self, request: Request) -> Response:
+        await self.delay()
+        body = orjson.loads(await request.body())
+        try:
+            user = self.store.add_user(body["email"].lower(), body["password"])
+        except PostgrestError as e:
+            return self._auth_error(e.status, e.code, e.message)
+        return json_response(self._session(user))
+
+    async def get_user(self, request: Request) -> Response:
+        await self.delay()
+        token = request.headers.get("authorization", "").replace("Bearer ", "")
+        try:
+            claims = jwt.decode(token, self.jwt_secret, algorithms=["HS256"], audience="authenticated")
+        except jwt.InvalidTokenError:
+            return self._auth_error(403, "bad_jwt", "invalid JWT")
+        user = self.store.users_by_id.get(claims["sub"])
+        if user is None:
+            return self._auth_error(403, "user_not_found", "User from sub claim in JWT does not exist")
+        return json_response(self._user_json(user))
+
+    async def admin_create_user(self, request: Request) -> Response:
+        await self.delay()
+        body = orjson.loads(await request.body())
+        try:
+            user = self.store.add_user(body["email"].lower(), body.get("password", ""))
+        except PostgrestError as e:
+            return self._auth_error(e.status, e.code, e.message)
+        return json_response(self._user_json(user))
+
+    async def admin_user(self, request: Request) -> Response:
+        await self.delay()
+        user = self.store.users_by_id.get(request.path_params["user_id"])
+        if user is None:
+            return self._auth_error(404, "user_not_found", "User not found")
+        if request.method == "DELETE":
+            self.store.delete_user(user["id"])
+        return json_response(self._user_json(user))
+
+    async def jwks(self, request: Request) -> Response:
+        return json_response({"keys": []})
+
+    def app(self) -> Starlette:
+        return Starlette(routes=[
+            Route("/rest/v1/rpc/{function}", self.rpc_endpoint, methods=["GET", "POST"]),
+            Route("/rest/v1/{table}", self.table_endpoint, methods=["GET", "HEAD", "POST", "PATCH", "DELETE"]),
+            Route("/auth/v1/token", self.token, methods=["POST"]),
+            Route("/auth/v1/signup", self.signup, methods=["POST"]),
+            Route("/auth/v1/user", self.get_user, methods=["GET"]),
+            Route("/auth/v1/admin/users", self.admin_create_user, methods=["POST"]),
+            Route("/auth/v1/admin/users/{user_id}", self.admin_user, methods=["GET", "DELETE"]),
+            Route("/auth/v1/.well-known/jwks.json", self.jwks, methods=["GET"]),
+        ])
+
+
+def create_app(scholarships: int = 10000, students: int = 5000, applications_per_student: int = 3,
+               latency_ms: float = 0, jwt_secret: str = DEFAULT_JWT_SECRET, seed_value: int = 42) -> Starlette:
+    store = Store()
+    seed(store, scholarships, students, applications_per_student, seed_value)
+    return FakeSupabase(store, jwt_secret, latency_ms).app()
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--scholarships", type=int, default=10000)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--applications-per-student", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latencia simulada por llamada a Supabase")
+    parser.add_argument("--jwt-secret", default=os.environ.get("SUPABASE_JWT_SECRET", DEFAULT_JWT_SECRET))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    app = create_app(args.scholarships, args.students, args.applications_per_student,
+                     args.latency_ms, args.jwt_secret, args.seed)
+    print(f"Datos generados en {time.perf_counter() - start:.1f}s; escuchando en http://{args.host}:{args.port}", flush=True)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Compara el costo de armar la respuesta de GET /scholarships con 100, 1000 y
+10000 filas (con `requirements` JSONB) por tres caminos:
+
+  stdlib        .execute() (pydantic) + jsonable_encoder + json (comportamiento anterior)
+  orjson        .execute() (pydantic) + jsonable_encoder + orjson (DefaultJSONResponse)
+  passthrough   cuerpo de PostgREST reenviado sin decodificar (execute_raw)
+
+Todo corre en proceso, sin red, para aislar el CPU de serialización.
+
+Uso (desde FastApi/):
+    python benchmarks/json_encoding.py --sizes 100,1000,10000 --repeat 20
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from postgrest.base_request_builder import APIResponse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from serialization import envelope_with_raw_data, parse_content_range  # noqa: E402
+
+
+def make_rows(count: int) -> list:
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "university_center_id": str(uuid.uuid4()),
+            "scholarship_type_id": str(uuid.uuid4()),
+            "title": f"Beca de apoyo académico {i}",
+            "description": "Apoyo económico para estudiantes de licenciatura con promedio mínimo de 85. " * 3,
+            "requirements": ["Constancia de estudios", "Kárdex", "Identificación oficial", f"Carta {i}"],
+            "application_start_date": "2026-01-15",
+            "application_end_date": "2026-02-15",
+            "status": "Abierta",
+            "created_at": "2026-01-10T12:00:00.123456+00:00",
+        }
+        for i in range(count)
+    ]
+
+
+def postgrest_response(rows: list) -> httpx.Response:
+    """Respuesta como la que envía PostgREST (json_agg separa filas con coma y salto)."""
+    body = ("[" + ", \n ".join(json.dumps(row, ensure_ascii=False) for row in rows) + "]").encode()
+    request = httpx.Request("GET", "http://localhost/rest/v1/scholarships", headers={"prefer": "count=exact"})
+    return httpx.Response(
+        200, content=body, request=request,
+        headers={"content-range": f"0-{len(rows) - 1}/{len(rows)}"},
+    )
+
+
+def via_execute(raw: httpx.Response, response_class) -> bytes:
+    response = APIResponse.from_http_request_response(raw)
+    envelope = {
+        "status": "success",
+        "data": response.data,
+        "count": len(response.data),
+        "total": response.count,
+        "limit": len(response.data),
+        "offset": 0,
+    }
+    return response_class(jsonable_encoder(envelope)).body
+
+
+def via_passthrough(raw: httpx.Response) -> bytes:
+    returned, total = parse_content_range(raw.headers.get("content-range"))
+    return envelope_with_raw_data(raw.content, {"count": returned, "total": total, "limit": returned, "offset": 0})
+
+
+def measure(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    paths = {
+        "stdlib": lambda raw: via_execute(raw, JSONResponse),
+        "orjson": lambda raw: via_execute(raw, ORJSONResponse),
+        "passthrough": via_passthrough,
+    }
+
+    print(f"{'filas':>6} {'camino':>12} {'mediana ms':>11} {'KB':>9} {'vs stdlib':>10}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        raw = postgrest_response(make_rows(size))
+        baseline = None
+        for name, path in paths.items():
+            body = path(raw)
+            assert json.loads(body)["count"] == size
+            elapsed = measure(lambda: path(raw), args.repeat)
+            baseline = baseline or elapsed
+            print(f"{size:>6} {name:>12} {elapsed:>11.2f} {len(body) / 1024:>9.1f} {baseline / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Prueba de carga para GET /scholarships.
+
+Lanza peticiones concurrentes contra una instancia en ejecución de la API y
+reporta el throughput (req/s) y la latencia para cada nivel de concurrencia.
+Con los handlers bloqueando el event loop el throughput se queda plano; con la
+capa de datos asíncrona debe crecer al aumentar la concurrencia.
+
+Uso:
+    uvicorn main:app --port 8000
+    python benchmarks/load_scholarships.py --base-url http://localhost:8000 \
+        --levels 1,2,4,8,16,32 --requests 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def _worker(client: httpx.AsyncClient, path: str, params: dict, remaining: list, latencies: list, errors: list):
+    while remaining:
+        remaining.pop()
+        start = time.perf_counter()
+        try:
+            response = await client.get(path, params=params)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_level(base_url: str, path: str, params: dict, concurrency: int, total_requests: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        # Calentamiento: abre las conexiones antes de medir
+        await asyncio.gather(*(client.get(path, params=params) for _ in range(concurrency)))
+
+        remaining = list(range(total_requests))
+        latencies, errors = [], []
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(client, path, params, remaining, latencies, errors)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/scholarships")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--levels", default="1,2,4,8,16,32")
+    parser.add_argument("--requests", type=int, default=200, help="Peticiones por nivel de concurrencia")
+    args = parser.parse_args()
+
+    params = {"limit": args.limit}
+    levels = [int(level) for level in args.levels.split(",")]
+
+    print(f"{'conc':>5} {'req':>6} {'err':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    baseline = None
+    for level in levels:
+        result = await run_level(args.base_url, args.path, params, level, args.requests)
+        baseline = baseline or result["throughput"]
+        print(
+            f"{result['concurrency']:>5} {result['requests']:>6} {result['errors']:>5} "
+            f"{result['throughput']:>9.1f} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f}"
+            f"   x{result['throughput'] / baseline:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Tamaño de respuesta y latencia de páginas reales de GET /scholarships sin
+compresión, con gzip y con Brotli.
+
+Mide los bytes que viajan por la red y la latencia contra una instancia en
+ejecución (en localhost refleja sobre todo el CPU de comprimir), y estima el
+tiempo total en enlaces móviles sumando la transferencia de esos bytes.
+
+Uso:
+    uvicorn main:app --port 8000
+    python benchmarks/payload_compression.py --base-url http://localhost:8000 \
+        --limits 20,100,1000 --requests 30
+"""
+import argparse
+import statistics
+import time
+
+import httpx
+
+ENCODINGS = ("identity", "gzip", "br")
+
+# Ancho de banda de bajada (Mbps) y RTT (ms) aproximados
+LINKS = {
+    "3g": (1.6, 150),
+    "4g": (9.0, 60),
+}
+
+
+def measure(client: httpx.Client, path: str, params: dict, encoding: str, requests: int) -> dict:
+    headers = {"Accept-Encoding": encoding}
+    client.get(path, params=params, headers=headers)  # calentamiento (caché de respuestas)
+
+    latencies, wire_bytes = [], 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(path, params=params, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+        wire_bytes = response.num_bytes_downloaded
+
+    served = response.headers.get("content-encoding", "identity")
+    if served != encoding:
+        print(f"  aviso: se pidió {encoding} y el servidor respondió {served}")
+    return {"bytes": wire_bytes, "p50_ms": statistics.median(latencies) * 1000}
+
+
+def estimate_ms(result: dict, link: str) -> float:
+    mbps, rtt_ms = LINKS[link]
+    return result["p50_ms"] + rtt_ms + result["bytes"] * 8 / (mbps * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/scholarships")
+    parser.add_argument("--limits", default="20,100,1000")
+    parser.add_argument("--requests", type=int, default=30, help="Peticiones por combinación")
+    args = parser.parse_args()
+
+    print(f"{'limit':>6} {'encoding':>9} {'KB':>9} {'ratio':>6} {'p50 ms':>8} {'3g ms':>8} {'4g ms':>8}")
+    with httpx.Client(base_url=args.base_url, timeout=60) as client:
+        for limit in (int(value) for value in args.limits.split(",")):
+            baseline = None
+            for encoding in ENCODINGS:
+                result = measure(client, args.path, {"limit": limit}, encoding, args.requests)
+                baseline = baseline or result["bytes"]
+                print(
+                    f"{limit:>6} {encoding:>9} {result['bytes'] / 1024:>9.1f} "
+                    f"{result['bytes'] / baseline:>6.2f} {result['p50_ms']:>8.1f} "
+                    f"{estimate_ms(result, '3g'):>8.0f} {estimate_ms(result, '4g'):>8.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
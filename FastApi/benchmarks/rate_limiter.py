@@ -0,0 +1,90 @@
+"""
+Costo del limitador de /login y /register y su efecto ante una ráfaga.
+
+1. En proceso: microsegundos por verificación (take) con el backend en memoria
+   y, si se indica --redis-url, con Redis (un viaje de red por verificación).
+2. Contra una instancia en ejecución (--base-url): ráfaga de logins fallidos
+   concurrentes; reporta cuántos se rechazan con 429 y la latencia de cada tipo
+   de respuesta (los 429 no llegan a Supabase Auth).
+
+Uso:
+    python benchmarks/rate_limiter.py --keys 10000 --iterations 200000
+    python benchmarks/rate_limiter.py --redis-url redis://localhost:6379/0
+    uvicorn main:app --port 8000
+    python benchmarks/rate_limiter.py --base-url http://localhost:8000 --burst 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from rate_limit import MemoryBackend, Rate, RedisBackend  # noqa: E402
+
+
+async def bench_backend(name: str, backend, keys: int, iterations: int):
+    rate = Rate("5/60")
+    start = time.perf_counter()
+    rejected = 0
+    for i in range(iterations):
+        if await backend.take(f"login:ip:10.0.{i % keys // 256}.{i % 256}", rate):
+            rejected += 1
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:>7}: {elapsed / iterations * 1e6:8.2f} µs/verificación "
+        f"({iterations} verificaciones, {keys} claves, {rejected / iterations:.0%} rechazadas)"
+    )
+
+
+async def bench_burst(base_url: str, burst: int, concurrency: int, emails: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    results = []
+
+    async def attempt(client: httpx.AsyncClient, i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(
+                "/login", json={"email": f"bench{i % emails}@example.com", "password": "incorrecta"}
+            )
+            results.append((response.status_code, time.perf_counter() - start))
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(attempt(client, i) for i in range(burst)))
+        elapsed = time.perf_counter() - start
+
+    print(f"ráfaga: {burst} logins en {elapsed:.2f}s ({burst / elapsed:.0f} req/s)")
+    for status in sorted({status for status, _ in results}):
+        latencies = sorted(latency for code, latency in results if code == status)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+        print(
+            f"  {status}: {len(latencies):5d} ({len(latencies) / burst:5.1%})  "
+            f"p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=10000, help="IPs distintas simuladas")
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--redis-url", help="Medir también el backend Redis")
+    parser.add_argument("--base-url", help="Instancia en ejecución para la prueba de ráfaga")
+    parser.add_argument("--burst", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--emails", type=int, default=5, help="Emails distintos en la ráfaga")
+    args = parser.parse_args()
+
+    asyncio.run(bench_backend("memory", MemoryBackend(), args.keys, args.iterations))
+    if args.redis_url:
+        asyncio.run(bench_backend("redis", RedisBackend(args.redis_url), args.keys, min(args.iterations, 20000)))
+    if args.base_url:
+        asyncio.run(bench_burst(args.base_url, args.burst, args.concurrency, args.emails))
+
+
+if __name__ == "__main__":
+    main()
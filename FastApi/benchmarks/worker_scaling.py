@@ -0,0 +1,157 @@
+"""
+Escalamiento del throughput con el número de workers de la API.
+
+Levanta el Supabase falso una vez y, para cada cantidad de workers, la API con el perfil
+de producción (gunicorn + gunicorn.conf.py, o uvicorn --workers). La carga sale de varios
+procesos cliente (--clients) que arrancan a la vez, para que el generador no sea el cuello
+de botella. Reporta req/s, p50/p95/p99 y la aceleración respecto a la primera cantidad.
+
+Por defecto mide endpoints servidos desde la memoria de la API (catálogo, listados y becas
+en caché), donde el límite es la CPU de cada worker. Con endpoints que consultan Supabase y
+--latency-ms se ve en cambio el efecto del pool de conexiones de cada worker.
+El escalamiento depende de los núcleos libres: la API, el Supabase falso y los clientes
+comparten la máquina.
+
+Uso:
+    python benchmarks/worker_scaling.py --workers 1,2,4 --clients 4 --concurrency 64 --requests 4000
+    python benchmarks/worker_scaling.py --server uvicorn --endpoints scholarships,stats --output escalamiento.json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+
+import httpx
+
+from endpoints import (
+    build_context, percentile, request_kwargs, select_scenarios, start_api, start_fake_supabase
+)
+
+DEFAULT_ENDPOINTS = "scholarship_types,scholarships,scholarships_batch"
+
+
+def _client_process(base_url: str, scenario_name: str, ctx: dict, concurrency: int, requests: int,
+                    offset: int, barrier, results):
+    """Un proceso de carga: calienta sus conexiones, espera a los demás y mide."""
+    scenario = select_scenarios(scenario_name)[0]
+
+    async def main():
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+            await asyncio.gather(*(client.request(**request_kwargs(scenario, ctx, offset + i))
+                                   for i in range(concurrency)))
+            barrier.wait()
+
+            latencies, errors = [], 0
+            counter = iter(range(offset, offset + requests))
+
+            async def worker():
+                nonlocal errors
+                for i in counter:
+                    start = time.perf_counter()
+                    try:
+                        response = await client.request(**request_kwargs(scenario, ctx, i))
+                        if response.status_code >= 400:
+                            errors += 1
+                    except httpx.HTTPError:
+                        errors += 1
+                    latencies.append(time.perf_counter() - start)
+
+            started = time.time()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            return latencies, errors, started, time.time()
+
+    results.put(asyncio.run(main()))
+
+
+def measure(base_url: str, scenario_name: str, ctx: dict, args) -> dict:
+    mp = multiprocessing.get_context("spawn")
+    barrier = mp.Barrier(args.clients)
+    results = mp.Queue()
+    per_client = args.requests // args.clients
+    processes = [
+        mp.Process(target=_client_process, args=(
+            base_url, scenario_name, ctx, max(1, args.concurrency // args.clients), per_client,
+            n * per_client, barrier, results,
+        ))
+        for n in range(args.clients)
+    ]
+    for process in processes:
+        process.start()
+    outputs = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    latencies = sorted(latency for output in outputs for latency in output[0])
+    elapsed = max(output[3] for output in outputs) - min(output[2] for output in outputs)
+    return {
+        "endpoint": scenario_name,
+        "requests": len(latencies),
+        "errors": sum(output[1] for output in outputs),
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="Cantidades de workers a comparar")
+    parser.add_argument("--server", choices=["uvicorn", "gunicorn"], default="gunicorn")
+    parser.add_argument("--clients", type=int, default=max(1, min(4, os.cpu_count() or 1)),
+                        help="Procesos que generan la carga")
+    parser.add_argument("--concurrency", type=int, default=64, help="Peticiones simultáneas en total")
+    parser.add_argument("--requests", type=int, default=4000, help="Peticiones por endpoint y cantidad de workers")
+    parser.add_argument("--scholarships", type=int, default=10000)
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latencia simulada por llamada a Supabase")
+    parser.add_argument("--endpoints", default=DEFAULT_ENDPOINTS,
+                        help="Escenarios de benchmarks/endpoints.py separados por comas")
+    parser.add_argument("--output", help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    names = [name for name in args.endpoints.split(",") if select_scenarios(name)]
+    worker_counts = [int(count) for count in args.workers.split(",")]
+
+    fake, supabase_url = start_fake_supabase(args)
+    results = []
+    baseline = {}
+    try:
+        print(f"{'workers':>7} {'endpoint':<22} {'req':>6} {'err':>5} {'req/s':>9} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'x':>6}")
+        for count in worker_counts:
+            args.workers = count
+            api, base_url = start_api(args, supabase_url)
+            try:
+                async def context():
+                    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+                        return await build_context(client, supabase_url, base_url, args.students)
+
+                ctx = asyncio.run(context())
+                for name in names:
+                    result = {"workers": count, **measure(base_url, name, ctx, args)}
+                    baseline.setdefault(name, result["throughput"])
+                    result["speedup"] = result["throughput"] / baseline[name]
+                    results.append(result)
+                    print(
+                        f"{count:>7} {name:<22} {result['requests']:>6} {result['errors']:>5} "
+                        f"{result['throughput']:>9.1f} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+                        f"{result['p99_ms']:>8.1f} {result['speedup']:>5.2f}x"
+                    )
+            finally:
+                api.terminate()
+                api.wait()
+    finally:
+        fake.terminate()
+        fake.wait()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": {**vars(args), "workers": worker_counts}, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
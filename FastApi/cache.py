@@ -0,0 +1,55 @@
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Caché en memoria acotada (LRU) con expiración por entrada.
+
+    Pensada para usarse desde el event loop de un solo worker: no usa locks.
+    Cada worker de uvicorn tiene su propia copia.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def clear(self):
+        self._data.clear()
+
+    def items(self) -> list:
+        """Pares (llave, valor) vigentes; es una copia, así que se puede modificar la caché al recorrerla."""
+        now = time.monotonic()
+        return [(key, value) for key, (value, expires_at) in self._data.items() if expires_at > now]
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._data)
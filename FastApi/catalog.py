@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+import json
+import os
+from database import supabase
+from cache import TTLCache
+from logging_utils import get_logger
+from serialization import dumps
+
+logger = get_logger("catalog")
+
+# Las tablas de catálogo casi nunca cambian: se sirven desde memoria
+CATALOG_TTL = float(os.environ.get("CATALOG_TTL", "3600"))
+
+# Tabla -> columnas que se exponen en los endpoints de dropdowns
+CATALOG_TABLES = {
+    'scholarship_types': 'id, name',
+    'university_centers': 'id, name, acronym',
+}
+
+
+class CatalogEntry:
+    """Contenido de una tabla de catálogo junto con su ETag y la respuesta ya codificada."""
+
+    def __init__(self, data: list):
+        self.data = data
+        self.body = dumps({"status": "success", "data": data})
+        body = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+        self.etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+
+
+class Catalog:
+    """
+    Caché en proceso de las tablas de catálogo (tipos de beca, centros universitarios).
+
+    Las entradas expiran tras CATALOG_TTL segundos o al llamar a invalidate().
+    Si varias peticiones encuentran la caché vacía a la vez, solo una consulta a Supabase.
+    """
+
+    def __init__(self, ttl: float = CATALOG_TTL):
+        self._entries = TTLCache(maxsize=len(CATALOG_TABLES), ttl=ttl)
+        self._locks = {name: asyncio.Lock() for name in CATALOG_TABLES}
+
+    async def get(self, name: str) -> CatalogEntry:
+        entry = self._entries.get(name)
+        if entry is not None:
+            return entry
+
+        async with self._locks[name]:
+            # Otra petición pudo haberla cargado mientras esperábamos el lock
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = await self._load(name)
+        return entry
+
+    async def _load(self, name: str) -> CatalogEntry:
+        response = await supabase.table(name).select(CATALOG_TABLES[name]).execute()
+        entry = CatalogEntry(response.data)
+        self._entries.set(name, entry)
+        return entry
+
+    def invalidate(self, name: str = None):
+        """Descarta una tabla del catálogo (o todas si no se indica)."""
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name)
+
+    async def preload(self) -> bool:
+        """
+        Carga todas las tablas del catálogo en paralelo (se llama al arrancar cada worker).
+
+        Returns:
+            True si se cargaron todas; False si alguna falló o no hay conexión a Supabase.
+        """
+        if not supabase:
+            return False
+
+        async def load(name: str) -> bool:
+            try:
+                await self._load(name)
+                return True
+            except Exception:
+                logger.exception("Error al precargar catálogo", extra={"table": name})
+                return False
+
+        return all(await asyncio.gather(*(load(name) for name in CATALOG_TABLES)))
+
+
+catalog = Catalog()
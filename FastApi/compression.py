@@ -0,0 +1,154 @@
+import os
+import zlib
+from typing import Optional
+from starlette.datastructures import MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Respuestas más chicas que esto se envían sin comprimir (el ahorro no compensa el CPU)
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+# 4-5 comprime mejor que gzip 6 con un costo similar; 11 es solo para archivos estáticos
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "4"))
+
+# Formatos ya comprimidos o binarios: recomprimirlos solo gasta CPU
+SKIP_MEDIA_TYPES = (
+    "application/gzip", "application/zip", "application/octet-stream",
+    "image/", "audio/", "video/", "font/woff",
+)
+
+
+class GzipCompressor:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31) # wbits=31 -> formato gzip
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        # Z_SYNC_FLUSH entrega cada bloque del stream al cliente sin esperar al final
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class BrotliCompressor:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        output = self._compressor.process(data)
+        return output + (self._compressor.finish() if final else self._compressor.flush())
+
+
+COMPRESSORS = {"gzip": GzipCompressor}
+if brotli is not None:
+    COMPRESSORS = {"br": BrotliCompressor, **COMPRESSORS}
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Elige la codificación según Accept-Encoding (con pesos q).
+    Ante empate gana el orden de preferencia del servidor: br, luego gzip.
+    """
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        weights[token.strip()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in COMPRESSORS:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _should_skip(headers: MutableHeaders) -> bool:
+    if "content-encoding" in headers:
+        return True
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(SKIP_MEDIA_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI puro que comprime con Brotli o gzip según Accept-Encoding.
+
+    - Respuestas completas menores a minimum_size se envían tal cual.
+    - Respuestas en streaming (exportaciones) se comprimen bloque por bloque, sin
+      acumular el cuerpo en memoria.
+    - No toca respuestas que ya traen Content-Encoding ni formatos ya comprimidos
+      (p. ej. las exportaciones con gzip=true).
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding) if accept_encoding else None
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        state = {"start": None, "compressor": None, "passthrough": False}
+
+        async def send_compressed(message):
+            if message["type"] == "http.response.start":
+                if _should_skip(MutableHeaders(raw=list(message.get("headers", [])))):
+                    state["passthrough"] = True
+                    await send(message)
+                else:
+                    # Se retiene hasta ver el primer bloque del cuerpo
+                    state["start"] = message
+                return
+
+            if message["type"] != "http.response.body" or state["passthrough"]:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if state["compressor"] is None:
+                # Sin cuerpo (304, HEAD) o demasiado chico: se envía tal cual
+                if not more_body and (not body or len(body) < self.minimum_size):
+                    state["passthrough"] = True
+                    await send(state["start"])
+                    await send(message)
+                    return
+
+                state["compressor"] = COMPRESSORS[encoding]()
+                compressed = state["compressor"].compress(body, final=not more_body)
+
+                headers = MutableHeaders(raw=list(state["start"].get("headers", [])))
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "etag" in headers and not headers["etag"].startswith("W/"):
+                    # Otra representación de los mismos datos: el ETag deja de ser byte a byte
+                    headers["ETag"] = "W/" + headers["etag"]
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(compressed))
+
+                await send({**state["start"], "headers": headers.raw})
+                await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+                return
+
+            compressed = state["compressor"].compress(body, final=not more_body)
+            await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,31 +1,267 @@
 import os
-from supabase import create_client, Client
+import functools
+import anyio
+import httpx
+from anyio import to_thread
 from dotenv import load_dotenv
+from metrics import TimedTransport
+from logging_utils import get_logger
 
 load_dotenv()
 
+logger = get_logger("database")
+
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_ANON_KEY = os.environ.get("SUPABASE_ANON_KEY")
 SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
+# Redis compartido por la caché de respuestas, el límite de intentos y los trabajos en lote
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+
+# Ajustes del pool HTTP compartido hacia Supabase (PostgREST / GoTrue)
+HTTP_MAX_CONNECTIONS = int(os.environ.get("SUPABASE_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("SUPABASE_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.environ.get("SUPABASE_TIMEOUT", "10"))
+
+# Hilos disponibles para llamadas que siguen siendo síncronas
+THREADPOOL_SIZE = int(os.environ.get("SUPABASE_THREADPOOL_SIZE", "20"))
+
+# 'sdk': cliente completo de supabase-py.
+# 'lean': solo PostgREST + GoTrue; no importa realtime, storage ni functions (que esta API
+# no usa), lo que acorta el arranque en frío en Vercel.
+SUPABASE_CLIENT = os.environ.get("SUPABASE_CLIENT", "sdk").lower()
+
+_http_transport = None
+_redis = None
+_threadpool_limiter = anyio.CapacityLimiter(THREADPOOL_SIZE)
+
+
+def get_http_transport() -> TimedTransport:
+    """
+    Un solo transporte (pool de conexiones HTTP/2) compartido por ambos clientes.
+    Cada cliente conserva su propio httpx.AsyncClient para no mezclar headers
+    (anon key vs service key), pero las conexiones TCP/TLS se reutilizan.
+    TimedTransport mide cada llamada (métricas por tabla/operación y Server-Timing).
+    """
+    global _http_transport
+    if _http_transport is None:
+        _http_transport = TimedTransport(httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+        ))
+    return _http_transport
+
+
+def get_redis(setting: str):
+    """
+    Cliente de Redis del worker (un solo pool de conexiones) para todo backend con 'redis'.
+
+    Args:
+        setting: Variable que pidió Redis (p. ej. "RESPONSE_CACHE_BACKEND"), para el error.
+
+    Raises:
+        RuntimeError: Si el paquete redis no está instalado.
+    """
+    global _redis
+    if _redis is None:
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError(f"{setting}=redis requiere el paquete 'redis'")
+        _redis = redis.from_url(REDIS_URL)
+    return _redis
+
+
+class LeanClient:
+    """
+    Cliente mínimo con la misma interfaz que usan los handlers (table, rpc, auth),
+    construido directamente sobre postgrest y supabase_auth.
+    """
+
+    def __init__(self, url: str, key: str, http_client: httpx.AsyncClient):
+        from postgrest import AsyncPostgrestClient
+        from supabase_auth import AsyncGoTrueClient
+
+        headers = {"apiKey": key, "Authorization": f"Bearer {key}"}
+        self.postgrest = AsyncPostgrestClient(f"{url}/rest/v1", headers=headers, http_client=http_client)
+        # Sin sesión persistente: un sign_in no cambia el token con el que consulta este cliente
+        self.auth = AsyncGoTrueClient(
+            url=f"{url}/auth/v1",
+            headers=dict(headers),
+            http_client=http_client,
+            auto_refresh_token=False,
+            persist_session=False,
+        )
+
+    def table(self, table_name: str):
+        return self.postgrest.from_(table_name)
+
+    def from_(self, table_name: str):
+        return self.postgrest.from_(table_name)
+
+    def rpc(self, fn: str, params: dict = None, **kwargs):
+        return self.postgrest.rpc(fn, params or {}, **kwargs)
+
+
+def _create_client(key: str, http_client: httpx.AsyncClient):
+    """Crea un cliente asíncrono de Supabase que usa el pool compartido."""
+    if SUPABASE_CLIENT == "lean":
+        return LeanClient(SUPABASE_URL, key, http_client)
+
+    # Import diferido: el SDK completo es la dependencia más lenta de importar
+    from supabase import AsyncClient, AsyncClientOptions
+    return AsyncClient(SUPABASE_URL, key, AsyncClientOptions(httpx_client=http_client))
+
+
+class LazyClient:
+    """
+    Proxy que construye el cliente real en su primer uso.
+
+    Importar la app no crea clientes ni importa el SDK: en un arranque en frío el costo
+    solo se paga si la petición consulta Supabase. `if not supabase_admin:` sigue
+    funcionando (es falso si falta la URL o la llave).
+    """
+
+    def __init__(self, key: str, name: str):
+        self._key = key
+        self._name = name
+        self._client = None
+        self._http_client = None
+
+    def __bool__(self) -> bool:
+        return bool(SUPABASE_URL and self._key)
+
+    def __getattr__(self, attr):
+        return getattr(self.get(), attr)
 
-supabase: Client = None
-supabase_admin: Client = None
+    def get(self):
+        if self._client is None:
+            self._http_client = httpx.AsyncClient(transport=get_http_transport(), timeout=HTTP_TIMEOUT)
+            self._client = _create_client(self._key, self._http_client)
+            logger.info("Cliente de Supabase creado", extra={"client": self._name, "mode": SUPABASE_CLIENT})
+        return self._client
+
+    async def aclose(self):
+        """Cierra el cliente; el siguiente uso crea uno nuevo."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._client = None
+        self._http_client = None
+
+
+async def run_sync(func, *args, **kwargs):
+    """
+    Ejecuta una llamada bloqueante en el pool de hilos para no congelar el event loop.
+
+    Usar solo para llamadas que no tienen versión async (p. ej. librerías de terceros).
+    """
+    return await to_thread.run_sync(
+        functools.partial(func, *args, **kwargs),
+        limiter=_threadpool_limiter,
+    )
+
+
+async def iter_keyset_chunks(build_query, chunk_size: int = 1000, key: str = 'id'):
+    """
+    Recorre todas las filas de una consulta en bloques de tamaño fijo por keyset (key > último valor).
+
+    A diferencia de offset, cada bloque cuesta lo mismo sin importar qué tan adentro de la tabla
+    esté, y solo un bloque vive en memoria a la vez.
+
+    Args:
+        build_query: Función sin argumentos que devuelve un query builder nuevo con el
+            select (que debe incluir `key`) y los filtros ya aplicados.
+        chunk_size: Filas por bloque (no mayor que max_rows de PostgREST).
+        key: Columna única y ordenable para avanzar.
+
+    Yields:
+        Listas de filas.
+    """
+    last_key = None
+    while True:
+        query = build_query()
+        if last_key is not None:
+            query = query.gt(key, last_key)
+        response = await query.order(key).limit(chunk_size).execute()
+
+        rows = response.data
+        if not rows:
+            return
+        yield rows
+
+        if len(rows) < chunk_size:
+            return
+        last_key = rows[-1][key]
+
+
+async def execute_raw(query) -> httpx.Response:
+    """
+    Ejecuta un query builder de PostgREST sin decodificar el cuerpo.
+
+    `.execute()` parsea y valida cada fila con pydantic; cuando el JSON se reenvía
+    tal cual al cliente eso es trabajo perdido. Aquí se devuelve la respuesta HTTP
+    (cuerpo en bytes y headers como Content-Range) y solo se decodifica si hubo error.
+
+    Raises:
+        APIError: Igual que `.execute()` si PostgREST responde con error.
+    """
+    from postgrest.exceptions import APIError
+
+    response = await query.request.send()
+    if not response.is_success:
+        try:
+            error = response.json()
+        except ValueError:
+            error = {"message": response.text, "code": str(response.status_code)}
+        raise APIError(error if isinstance(error, dict) else {"message": str(error)})
+    return response
+
+
+def returning(query, columns: str):
+    """
+    Limita la representación que devuelve un insert/update/upsert/delete a `columns`.
+
+    Sin esto PostgREST devuelve `*`, incluidas columnas internas (p. ej. search_vector).
+    Equivale al `select=` de una consulta normal.
+    """
+    query.request.params = query.request.params.set("select", columns.replace(" ", ""))
+    return query
+
+
+supabase = LazyClient(SUPABASE_ANON_KEY, "public")
+supabase_admin = LazyClient(SUPABASE_SERVICE_KEY, "admin")
 
 if not SUPABASE_URL or not SUPABASE_ANON_KEY:
-    print("ERROR CRÍTICO: Faltan variables de entorno URL o ANON KEY.")
-else:
-    try:
-        supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
-        print("✅ Cliente Público conectado.")
-        
-        # Initialize admin client with service key (for admin operations)
-        if SUPABASE_SERVICE_KEY:
-            supabase_admin = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-            print(" Cliente Admin conectado (Service Key aceptada).")
-        else:
-            print("ADVERTENCIA: No se encontró SERVICE_KEY. Las funciones de escritura fallarán.")
-            
-    except Exception as e:
-        print(f"Error al conectar con Supabase: {e}")
-        supabase = None
-        supabase_admin = None
+    logger.critical("Faltan variables de entorno URL o ANON KEY.")
+elif not SUPABASE_SERVICE_KEY:
+    logger.warning("No se encontró SERVICE_KEY. Las funciones de escritura fallarán.")
+
+
+def open_clients():
+    """
+    Crea los clientes configurados y su pool (para el lifespan de cada worker).
+
+    Con varios workers cada proceso arma su propio pool: las conexiones HTTP/2 no se
+    comparten entre procesos. La primera consulta (la precarga del catálogo) abre la conexión.
+    """
+    for client in (supabase, supabase_admin):
+        if client:
+            client.get()
+
+
+async def close_clients():
+    """Cierra los clientes, el pool compartido y las conexiones a Redis al apagar el worker."""
+    global _http_transport
+    for client in (supabase, supabase_admin):
+        await client.aclose()
+    if _http_transport is not None:
+        await _http_transport.aclose()
+        _http_transport = None
+    if _redis is not None:
+        # Cierra las conexiones del pool; los backends pueden seguir usando el cliente
+        await _redis.aclose()
+    logger.info("Clientes de Supabase cerrados")
@@ -0,0 +1,122 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional, Literal
+from database import supabase_admin, iter_keyset_chunks
+from auth_utils import get_current_user_profile
+from scholarships import SCHOLARSHIP_FIELDS, parse_list_param, parse_uuid_param
+from scholarships_crud import resolve_campus_scope
+from export_utils import export_response, prefetch_chunks
+from logging_utils import get_logger
+
+router = APIRouter()
+logger = get_logger("export")
+
+# Filas por bloque leído de PostgREST (no mayor que max_rows = 1000)
+EXPORT_CHUNK_SIZE = 1000
+
+APPLICATION_EXPORT_COLUMNS = [
+    'id', 'scholarship_id', 'scholarship_title', 'university_center_id',
+    'student_id', 'student_name', 'student_email', 'student_code',
+    'status', 'submitted_at'
+]
+
+# --- RUTAS ---
+
+@router.get(path= "/export/scholarships")
+async def export_scholarships(
+    format: Literal['ndjson', 'csv'] = Query('csv'),
+    gzip: bool = Query(False, description="Descargar comprimido (.gz)"),
+    university_center_id: Optional[str] = Query(None),
+    scholarship_type_id: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Columnas a exportar separadas por coma"),
+    profile: dict = Depends(get_current_user_profile)
+):
+    """Exporta becas en streaming, leyendo la tabla en bloques por keyset."""
+    university_center_id = parse_uuid_param(university_center_id, 'university_center_id')
+    scholarship_type_id = parse_uuid_param(scholarship_type_id, 'scholarship_type_id')
+    campus = resolve_campus_scope(profile, university_center_id)
+
+    if not supabase_admin:
+        raise HTTPException(status_code=503, detail="BD no disponible")
+
+    columns = parse_list_param(fields, SCHOLARSHIP_FIELDS, 'fields') or list(SCHOLARSHIP_FIELDS)
+    select_columns = columns if 'id' in columns else columns + ['id']
+
+    def build_query():
+        query = supabase_admin.table('scholarships').select(', '.join(select_columns))
+        if campus:
+            query = query.eq('university_center_id', campus)
+        if scholarship_type_id:
+            query = query.eq('scholarship_type_id', scholarship_type_id)
+        if status:
+            query = query.eq('status', status)
+        return query
+
+    try:
+        chunks = await prefetch_chunks(iter_keyset_chunks(build_query, chunk_size=EXPORT_CHUNK_SIZE))
+    except Exception:
+        logger.exception("Error exporting scholarships")
+        raise HTTPException(status_code=500, detail="Error al exportar becas")
+    return export_response(chunks, format, columns, "becas", gzip=gzip)
+
+@router.get(path= "/export/applications")
+async def export_applications(
+    format: Literal['ndjson', 'csv'] = Query('csv'),
+    gzip: bool = Query(False, description="Descargar comprimido (.gz)"),
+    university_center_id: Optional[str] = Query(None),
+    scholarship_id: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    profile: dict = Depends(get_current_user_profile)
+):
+    """
+    Exporta solicitudes en streaming con el título de la beca y los datos del estudiante.
+    El campus se filtra a través de la beca (join !inner), en el mismo query de cada bloque.
+    """
+    university_center_id = parse_uuid_param(university_center_id, 'university_center_id')
+    scholarship_id = parse_uuid_param(scholarship_id, 'scholarship_id')
+    campus = resolve_campus_scope(profile, university_center_id)
+
+    if not supabase_admin:
+        raise HTTPException(status_code=503, detail="BD no disponible")
+
+    def build_query():
+        query = supabase_admin.table('applications').select(
+            'id, student_id, scholarship_id, status, submitted_at, '
+            'scholarships!inner(title, university_center_id), '
+            'profiles(full_name, email, student_code)'
+        )
+        if campus:
+            query = query.eq('scholarships.university_center_id', campus)
+        if scholarship_id:
+            query = query.eq('scholarship_id', scholarship_id)
+        if status:
+            query = query.eq('status', status)
+        return query
+
+    async def flat_chunks():
+        async for rows in iter_keyset_chunks(build_query, chunk_size=EXPORT_CHUNK_SIZE):
+            yield [flatten_application(row) for row in rows]
+
+    try:
+        chunks = await prefetch_chunks(flat_chunks())
+    except Exception:
+        logger.exception("Error exporting applications")
+        raise HTTPException(status_code=500, detail="Error al exportar solicitudes")
+    return export_response(chunks, format, APPLICATION_EXPORT_COLUMNS, "solicitudes", gzip=gzip)
+
+def flatten_application(row: dict) -> dict:
+    """Aplana los objetos embebidos (beca, perfil) en columnas para reportes."""
+    scholarship = row.get('scholarships') or {}
+    student = row.get('profiles') or {}
+    return {
+        'id': row['id'],
+        'scholarship_id': row.get('scholarship_id'),
+        'scholarship_title': scholarship.get('title'),
+        'university_center_id': scholarship.get('university_center_id'),
+        'student_id': row.get('student_id'),
+        'student_name': student.get('full_name'),
+        'student_email': student.get('email'),
+        'student_code': student.get('student_code'),
+        'status': row.get('status'),
+        'submitted_at': row.get('submitted_at'),
+    }
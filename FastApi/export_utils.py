@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+import zlib
+from fastapi.responses import StreamingResponse
+
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def _csv_value(value):
+    # Objetos embebidos y JSONB (requirements) se escriben como JSON dentro de la celda
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+async def ndjson_stream(chunks):
+    """Convierte bloques de filas en líneas NDJSON (una fila por línea)."""
+    async for rows in chunks:
+        yield ''.join(json.dumps(row, ensure_ascii=False, default=str) + '\n' for row in rows).encode()
+
+
+async def csv_stream(chunks, columns: list):
+    """Convierte bloques de filas en CSV; el encabezado sale antes del primer bloque."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    # BOM para que Excel detecte UTF-8 (acentos en nombres)
+    buffer.write('\ufeff')
+    writer.writeheader()
+
+    async for rows in chunks:
+        writer.writerows({k: _csv_value(v) for k, v in row.items()} for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        # Sin filas: al menos se envía el encabezado
+        yield buffer.getvalue().encode()
+
+
+async def gzip_stream(body, level: int = 6):
+    """Comprime en gzip un stream de bytes bloque por bloque (memoria constante)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31) # wbits=31 -> formato gzip
+    async for chunk in body:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def prefetch_chunks(chunks):
+    """
+    Lee el primer bloque antes de armar la respuesta y devuelve un iterador con todos.
+
+    StreamingResponse envía el 200 antes de pedir el primer bloque: si la consulta falla
+    (filtro inválido, Supabase caído) el cliente recibiría un archivo vacío o truncado.
+    Llamado dentro del try del handler, ese error se convierte en un 4xx/5xx normal.
+    """
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+
+    async def chained():
+        if first is None:
+            return
+        yield first
+        async for rows in chunks:
+            yield rows
+
+    return chained()
+
+
+def export_response(chunks, export_format: str, columns: list, filename: str, gzip: bool = False) -> StreamingResponse:
+    """
+    Respuesta en streaming para exportaciones: las filas se escriben por bloques
+    conforme llegan de la base de datos en vez de armar un JSON gigante en memoria.
+
+    Con gzip=True se descarga como archivo .gz comprimido al vuelo.
+    """
+    if export_format == 'csv':
+        body = csv_stream(chunks, columns)
+    else:
+        body = ndjson_stream(chunks)
+
+    media_type = EXPORT_MEDIA_TYPES[export_format]
+    filename = f"{filename}.{export_format}"
+    if gzip:
+        body = gzip_stream(body)
+        media_type = 'application/gzip'
+        filename += '.gz'
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,56 @@
+# Servidor de producción fuera de Vercel:
+#     gunicorn main:app -c gunicorn.conf.py
+# Cada worker es un proceso con su propio event loop, pool de conexiones a Supabase y
+# cachés en memoria (ver el lifespan en main.py).
+#
+# Límites por worker a tener en cuenta:
+# - /metrics: cada scrape llega a un worker al azar. Con METRICS_MULTIPROC_DIR (definido abajo)
+#   cada worker publica sus histogramas ahí y /metrics devuelve la suma de todos.
+# - Perfiles en caché (auth_utils): un cambio de rol o un borrado invalida el perfil solo en el
+#   worker que atendió la petición; el resto lo usa hasta PROFILE_CACHE_TTL (60 s). Con
+#   RESPONSE_CACHE_BACKEND=redis la caché es compartida y la invalidación llega a todos.
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = os.environ.get("BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+
+# Los workers son async: uno por núcleo basta (la fórmula 2n+1 es para workers síncronos)
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "workers.BecasWorker"
+
+# Sin preload: la app (y su pool HTTP/2) se crea dentro de cada worker, no en el proceso maestro
+preload_app = False
+
+# Keep-alive con los clientes / balanceador. Debe superar el idle timeout del balanceador
+# (60s en la mayoría) para que no reutilice una conexión que la API ya cerró (502).
+keepalive = int(os.environ.get("KEEPALIVE", "75"))
+
+# Un worker que no responde en `timeout` segundos se reinicia
+timeout = int(os.environ.get("WORKER_TIMEOUT", "60"))
+# Apagado (SIGTERM / despliegue): peticiones en curso + tareas de fondo (SHUTDOWN_DRAIN_TIMEOUT)
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", "30"))
+
+# Reciclar workers cada N peticiones (0 = nunca); cada reinicio vacía sus cachés en memoria
+max_requests = int(os.environ.get("MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.environ.get("MAX_REQUESTS_JITTER", "0"))
+
+# IPs de proxies confiables para X-Forwarded-For / X-Forwarded-Proto
+forwarded_allow_ips = os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+# Los logs de la app ya salen en JSON (ACCESS_LOG=1 para una línea por petición)
+accesslog = None
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+# Directorio donde los workers publican sus histogramas para /metrics (ver metrics.py).
+# Se define aquí, en el proceso maestro, para que todos los workers lo hereden.
+os.environ.setdefault("METRICS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "becas-metrics"))
+
+
+def on_starting(server):
+    """Vacía el directorio de métricas: no se suman los histogramas de una ejecución anterior."""
+    directory = os.environ["METRICS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
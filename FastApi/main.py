@@ -1,16 +1,79 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import os
+import secrets
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
-from database import supabase
+from database import supabase, open_clients, close_clients
+from catalog import catalog
+from metrics import MetricsMiddleware, render_metrics, start_metrics_flusher, flush_metrics
+from compression import CompressionMiddleware
+from rate_limit import limiter, is_credentials_error
+from status_sync import start_status_scheduler
+from response_cache import response_cache, row_cache
+from provisioning import running_jobs
+from serialization import DefaultJSONResponse
+from logging_utils import get_logger
 import scholarships
 import admin_routes
 import scholarships_crud
+import applications
+import export_routes
+import stats
+
+logger = get_logger("main")
+
+# Si se define, /metrics exige "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+# Segundos del apagado para terminar tareas de fondo (altas masivas, revalidaciones de caché)
+# después de que uvicorn drena las peticiones en curso. Ver workers.py.
+SHUTDOWN_DRAIN_TIMEOUT = float(os.environ.get("SHUTDOWN_DRAIN_TIMEOUT", "10"))
+
+
+async def drain_background_tasks(timeout: float):
+    """Espera las tareas de fondo hasta `timeout` segundos y cancela las que sigan."""
+    tasks = [*running_jobs(), *response_cache.pending_tasks(), *row_cache.pending_tasks()]
+    if not tasks:
+        return
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.wait(pending)
+    logger.info("Tareas de fondo drenadas", extra={"tasks": len(tasks), "cancelled": len(pending)})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Clientes y pool de conexiones propios de este worker (se crean después del fork)
+    open_clients()
+    # Precarga de catálogos para que los dropdowns no consulten la BD; abre la primera conexión
+    await catalog.preload()
+    # Apertura/cierre de becas por fechas (solo si STATUS_SYNC_INTERVAL > 0)
+    status_task = start_status_scheduler()
+    # Con varios workers, publica los histogramas de este worker para que /metrics los sume
+    metrics_task = start_metrics_flusher()
+    yield
+    # Aquí uvicorn ya dejó de aceptar conexiones y esperó las peticiones en curso
+    if status_task:
+        status_task.cancel()
+    await drain_background_tasks(SHUTDOWN_DRAIN_TIMEOUT)
+    await close_clients()
+    if metrics_task:
+        metrics_task.cancel()
+        flush_metrics()
+
 
 app = FastAPI(
     title="API de Becas CGSU",
     description="API backend para gestión de becas y autenticación.",
-    version="1.1.0"
+    version="1.1.0",
+    lifespan=lifespan,
+    # orjson por defecto; JSON_RENDERER=json vuelve al encoder estándar
+    default_response_class=DefaultJSONResponse
 )
 
 origins = [
@@ -26,12 +89,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"], 
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Brotli/gzip según Accept-Encoding; umbral en COMPRESSION_MIN_SIZE
+app.add_middleware(CompressionMiddleware)
+
+# Se agrega al final para envolver todo (incluido CORS) y medir la petición completa
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(scholarships.router)
 
 app.include_router(admin_routes.router)
 app.include_router(scholarships_crud.router)
+app.include_router(applications.router)
+app.include_router(export_routes.router)
+app.include_router(stats.router)
 
 
 
@@ -48,17 +121,31 @@ def read_root():
         "message": "Bienvenido a la API de Becas CGSU. Visita /docs para ver la documentación y probar los endpoints."
     }
 
+@app.get(path= "/metrics", include_in_schema=False)
+async def metrics(authorization: str = Header(None)):
+    """
+    Histogramas de latencia (por ruta y por llamada a Supabase) en formato Prometheus.
+    Con METRICS_MULTIPROC_DIR (gunicorn) suma los de todos los workers.
+    Async: lee los histogramas en el event loop, no desde un hilo mientras se actualizan.
+    """
+    if METRICS_TOKEN and not secrets.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="No autorizado")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.post(path= "/register")
-async def register_user(credentials: UserCredentials):
+async def register_user(credentials: UserCredentials, request: Request):
     """
     Registra un usuario nuevo en Supabase Auth.
+    Limitado por IP y por email (429 sin llegar a Supabase).
     """
     if not supabase:
         raise HTTPException(status_code=503, detail="Base de datos no disponible (Revisa variables de entorno)")
 
+    await limiter.check_register(request, credentials.email)
+
     try:
       
-        response = supabase.auth.sign_up({
+        response = await supabase.auth.sign_up({
             "email": credentials.email,
             "password": credentials.password
         })
@@ -78,25 +165,32 @@ async def register_user(credentials: UserCredentials):
 
 
 @app.post(path= "/login")
-async def login_user(credentials: UserCredentials):
+async def login_user(credentials: UserCredentials, request: Request):
     """
     Inicia sesión y devuelve el token de acceso (session).
+    Limitado por IP y por email; tras varios fallos del mismo email la espera crece
+    exponencialmente. Los rechazos (429) no llegan a Supabase.
     """
     if not supabase:
         raise HTTPException(status_code=503, detail="Base de datos no disponible")
 
+    await limiter.check_login(request, credentials.email)
+
     try:
        
-        response = supabase.auth.sign_in_with_password({
+        response = await supabase.auth.sign_in_with_password({
             "email": credentials.email,
             "password": credentials.password
         })
 
-        if not response.session:
-            raise HTTPException(status_code=401, detail="Credenciales inválidas (Email o contraseña incorrectos)")
-            
-        return response.session
-
     except Exception as e:
-       
-        raise HTTPException(status_code=401, detail=f"Error al iniciar sesión: {str(e)}")
\ No newline at end of file
+        if is_credentials_error(e):
+            await limiter.login_failed(credentials.email)
+        raise HTTPException(status_code=401, detail=f"Error al iniciar sesión: {str(e)}")
+
+    if not response.session:
+        await limiter.login_failed(credentials.email)
+        raise HTTPException(status_code=401, detail="Credenciales inválidas (Email o contraseña incorrectos)")
+
+    await limiter.login_succeeded(credentials.email)
+    return response.session
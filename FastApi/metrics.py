@@ -0,0 +1,291 @@
+import asyncio
+import glob
+import json
+import os
+import re
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+import httpx
+from logging_utils import get_logger
+
+logger = get_logger("access")
+metrics_logger = get_logger("metrics")
+
+ACCESS_LOG = os.environ.get("ACCESS_LOG", "0") == "1"
+
+# Con varios workers cada proceso tiene sus propios histogramas. Si se define, cada worker vuelca
+# los suyos a este directorio (cada METRICS_FLUSH_INTERVAL segundos y al apagarse) y /metrics
+# devuelve la suma de todos, como el modo multiproceso de prometheus_client. gunicorn.conf.py
+# lo define y lo vacía al arrancar; los archivos de workers reciclados se conservan para que
+# los contadores no retrocedan.
+METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "5"))
+
+# Segundos; cubren desde hits de caché hasta llamadas lentas a Supabase
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Tiempos de la petición en curso para el header Server-Timing: nombre -> [ms acumulados, llamadas]
+_request_timings: ContextVar = ContextVar("request_timings", default=None)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def add(self, counts: list, total: float, count: int):
+        """Suma los valores de otro histograma con los mismos buckets."""
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.total += total
+        self.count += count
+
+
+class MetricsRegistry:
+    """Histogramas en memoria (por worker) con salida en formato de texto de Prometheus."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._help = {}
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def snapshot(self) -> list:
+        """Histogramas serializables en JSON (para sumarlos con los de otros workers)."""
+        return [
+            [name, [[k, str(v)] for k, v in labels], histogram.counts, histogram.total, histogram.count]
+            for (name, labels), histogram in list(self._histograms.items())
+        ]
+
+    def merge(self, snapshot: list):
+        """Suma a este registro los histogramas de un snapshot()."""
+        for name, labels, counts, total, count in snapshot:
+            key = (name, tuple((k, v) for k, v in labels))
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.add(counts, total, count)
+
+    def render(self) -> str:
+        lines = []
+        by_name = {}
+        for (name, labels), histogram in self._histograms.items():
+            by_name.setdefault(name, []).append((labels, histogram))
+
+        for name in sorted(by_name):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in by_name[name]:
+                base = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{{{_join(base, _le(bound))}}} {cumulative}")
+                lines.append(f"{name}_bucket{{{_join(base, _le('+Inf'))}}} {histogram.count}")
+                lines.append(f"{name}_sum{{{base}}} {histogram.total}")
+                lines.append(f"{name}_count{{{base}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _le(bound) -> str:
+    return 'le="' + str(bound) + '"'
+
+
+def _join(base: str, extra: str) -> str:
+    return f"{base},{extra}" if base else extra
+
+
+registry = MetricsRegistry()
+registry.describe("http_request_duration_seconds", "Latencia de las peticiones por ruta.")
+registry.describe("upstream_request_duration_seconds", "Latencia de llamadas a Supabase por servicio, tabla y operación.")
+registry.describe("app_section_duration_seconds", "Latencia de secciones internas (p. ej. auth).")
+
+
+def write_snapshot(directory: str = METRICS_MULTIPROC_DIR):
+    """Vuelca los histogramas de este worker a <directory>/<pid>.json (reemplazo atómico)."""
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(registry.snapshot(), f)
+    os.replace(path + ".tmp", path)
+
+
+def render_metrics() -> str:
+    """Salida de /metrics: los histogramas de este worker o, con METRICS_MULTIPROC_DIR, los de todos."""
+    if not METRICS_MULTIPROC_DIR:
+        return registry.render()
+
+    write_snapshot()
+    combined = MetricsRegistry()
+    combined._help = dict(registry._help)
+    for path in glob.glob(os.path.join(METRICS_MULTIPROC_DIR, "*.json")):
+        try:
+            with open(path) as f:
+                combined.merge(json.load(f))
+        except (OSError, ValueError) as e:
+            metrics_logger.warning("Snapshot de métricas ilegible", extra={"path": path, "error": str(e)})
+    return combined.render()
+
+
+def flush_metrics():
+    """Publica los histogramas de este worker si METRICS_MULTIPROC_DIR está definido."""
+    if not METRICS_MULTIPROC_DIR:
+        return
+    try:
+        write_snapshot()
+    except OSError as e:
+        metrics_logger.error("Error al escribir métricas", extra={"error": str(e)})
+
+
+async def run_metrics_flusher(interval: float = METRICS_FLUSH_INTERVAL):
+    """Bucle de fondo del lifespan: publica los histogramas de este worker para /metrics."""
+    while True:
+        await asyncio.sleep(interval)
+        flush_metrics()
+
+
+def start_metrics_flusher():
+    """Crea la tarea del bucle si METRICS_MULTIPROC_DIR está definido; si no, None."""
+    if not METRICS_MULTIPROC_DIR:
+        return None
+    return asyncio.create_task(run_metrics_flusher())
+
+
+def record_timing(name: str, seconds: float):
+    """Registra una sección interna en el histograma y en el Server-Timing de la petición actual."""
+    registry.observe("app_section_duration_seconds", seconds, section=name)
+    _add_server_timing(name, seconds)
+
+
+def _add_server_timing(name: str, seconds: float):
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.get(name)
+        if entry is None:
+            timings[name] = [seconds * 1000, 1]
+        else:
+            entry[0] += seconds * 1000
+            entry[1] += 1
+
+
+# --- LLAMADAS A SUPABASE ---
+
+_UUID_SEGMENT = re.compile(r"/[0-9a-fA-F-]{36}(?=/|$)")
+_POSTGREST_OPERATIONS = {"GET": "select", "HEAD": "count", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+
+def classify_upstream(request: httpx.Request) -> tuple:
+    """(servicio, tabla/endpoint, operación) a partir de la URL de Supabase."""
+    path = request.url.path
+    if path.startswith("/rest/v1/rpc/"):
+        return "postgrest", path[len("/rest/v1/rpc/"):], "rpc"
+    if path.startswith("/rest/v1/"):
+        operation = _POSTGREST_OPERATIONS.get(request.method, request.method.lower())
+        if operation == "insert" and "merge-duplicates" in request.headers.get("prefer", ""):
+            operation = "upsert"
+        return "postgrest", path[len("/rest/v1/"):], operation
+    if path.startswith("/auth/v1/"):
+        endpoint = _UUID_SEGMENT.sub("", path[len("/auth/v1/"):])
+        return "auth", endpoint, request.method.lower()
+    return "other", path, request.method.lower()
+
+
+class TimedTransport(httpx.AsyncBaseTransport):
+    """
+    Envuelve el transporte HTTP hacia Supabase y mide cada llamada (hasta recibir los headers).
+    Así todas las consultas quedan medidas sin tocar cada .execute().
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = await self._transport.handle_async_request(request)
+            status = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            service, target, operation = classify_upstream(request)
+            registry.observe(
+                "upstream_request_duration_seconds", elapsed,
+                service=service, target=target, operation=operation, status=status
+            )
+            _add_server_timing(f"{service}.{target.replace('/', '.')}.{operation}", elapsed)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# --- MIDDLEWARE ---
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro (sin BaseHTTPMiddleware, compatible con streaming):
+    mide cada petición por ruta y agrega el header Server-Timing.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        timings = {}
+        token = _request_timings.set(timings)
+        status_holder = [500]
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+                total_ms = (time.perf_counter() - start) * 1000
+                parts = [f"app;dur={total_ms:.1f}"]
+                parts += [f"{name};dur={ms:.1f};desc=\"x{calls}\"" for name, (ms, calls) in timings.items()]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", ", ".join(parts).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            registry.observe(
+                "http_request_duration_seconds", elapsed,
+                method=scope["method"], route=route_path, status=status_holder[0]
+            )
+            if ACCESS_LOG:
+                logger.info("request", extra={
+                    "method": scope["method"],
+                    "route": route_path,
+                    "status": status_holder[0],
+                    "duration_ms": round(elapsed * 1000, 2),
+                })
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from database import supabase_admin, get_redis
+from auth_utils import invalidate_cached_profile
+from cache import TTLCache
+from logging_utils import get_logger
+
+logger = get_logger("provisioning")
+
+# Llamadas simultáneas a auth.admin.create_user por trabajo (GoTrue limita la tasa por proyecto)
+PROVISION_CONCURRENCY = int(os.environ.get("PROVISION_CONCURRENCY", "8"))
+PROVISION_MAX_USERS = int(os.environ.get("PROVISION_MAX_USERS", "500"))
+# Segundos que se conserva el reporte de un trabajo terminado para consultarlo
+PROVISION_JOB_TTL = float(os.environ.get("PROVISION_JOB_TTL", "86400"))
+# Con Redis, el progreso se guarda como mucho cada N segundos (y siempre al terminar)
+PROVISION_SAVE_INTERVAL = float(os.environ.get("PROVISION_SAVE_INTERVAL", "0.5"))
+
+# 'memory' (por worker) o 'redis' (compartido entre workers, requiere el paquete redis).
+# Con varios workers y 'memory', la consulta del progreso puede caer en otro worker.
+JOBS_BACKEND = os.environ.get("JOBS_BACKEND", "memory")
+
+
+class MemoryJobStore:
+    """Reportes de trabajos en proceso; el dict guardado es el mismo que se va actualizando."""
+
+    def __init__(self, maxsize: int = 256):
+        self._jobs = TTLCache(maxsize=maxsize, ttl=PROVISION_JOB_TTL)
+
+    async def save(self, job: dict):
+        self._jobs.set(job["id"], job)
+
+    async def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+
+class RedisJobStore:
+    """Reportes compartidos entre workers: una llave JSON por trabajo con expiración."""
+
+    def __init__(self, prefix: str = "becas:job:"):
+        self._redis = get_redis("JOBS_BACKEND")
+        self._prefix = prefix
+
+    async def save(self, job: dict):
+        await self._redis.set(self._prefix + job["id"], json.dumps(job), ex=int(PROVISION_JOB_TTL))
+
+    async def get(self, job_id: str):
+        raw = await self._redis.get(self._prefix + job_id)
+        return json.loads(raw) if raw is not None else None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _error_message(error: Exception) -> str:
+    # AuthApiError y APIError de PostgREST traen el mensaje del servidor en .message
+    return getattr(error, "message", None) or str(error) or type(error).__name__
+
+
+# --- OPERACIONES POR USUARIO ---
+
+def profile_row(user_id: str, user_data) -> dict:
+    return {
+        "id": user_id,
+        "email": user_data.email,
+        "full_name": user_data.full_name,
+        "student_code": user_data.student_code,
+        "role": user_data.role,
+        "campus": user_data.campus if user_data.role == 'campus_admin' else None
+    }
+
+
+async def create_auth_user(user_data) -> str:
+    auth_response = await supabase_admin.auth.admin.create_user({
+        "email": user_data.email,
+        "password": user_data.password,
+        "email_confirm": True
+    })
+    return auth_response.user.id
+
+
+async def rollback_auth_user(user_id: str) -> bool:
+    """Borra la cuenta de Auth de un usuario cuyo perfil no se pudo guardar. False si falla."""
+    try:
+        await supabase_admin.auth.admin.delete_user(user_id)
+        return True
+    except Exception as e:
+        logger.error("No se pudo revertir el usuario de Auth", extra={"user_id": user_id, "error": str(e)})
+        return False
+
+
+# --- TRABAJOS DE ALTA MASIVA ---
+
+def new_provisioning_job(users: list, atomic: bool) -> dict:
+    """
+    Reporte inicial. `processed` cuenta los usuarios cuya cuenta de Auth ya se intentó crear;
+    cada resultado termina en 'created' o 'failed' (con `stage` 'validation', 'auth', 'profile' o 'rollback').
+    """
+    return {
+        "id": str(uuid.uuid4()),
+        "status": "pending",
+        "phase": "auth",
+        "atomic": atomic,
+        "total": len(users),
+        "processed": 0,
+        "created": 0,
+        "failed": 0,
+        "created_at": _now(),
+        "finished_at": None,
+        "results": [
+            {"index": i, "email": user.email, "status": "pending", "user_id": None, "stage": None, "error": None}
+            for i, user in enumerate(users)
+        ],
+    }
+
+
+def _validate_batch(users: list, results: list):
+    """Marca como fallidos los emails y códigos de estudiante repetidos dentro del lote."""
+    seen_emails, seen_codes = set(), set()
+    for user, result in zip(users, results):
+        email = user.email.lower()
+        if email in seen_emails:
+            _fail(result, "validation", "Email repetido en el lote")
+        elif user.student_code and user.student_code in seen_codes:
+            _fail(result, "validation", "Código de estudiante repetido en el lote")
+        seen_emails.add(email)
+        if user.student_code:
+            seen_codes.add(user.student_code)
+
+
+def _fail(result: dict, stage: str, error: str):
+    result.update(status="failed", stage=stage, error=error)
+
+
+class _ProgressSaver:
+    def __init__(self, job: dict):
+        self.job = job
+        self._last = 0.0
+
+    async def __call__(self, force: bool = False):
+        now = time.monotonic()
+        if force or now - self._last >= PROVISION_SAVE_INTERVAL:
+            self._last = now
+            await job_store.save(self.job)
+
+
+async def run_provisioning(job: dict, users: list):
+    """
+    1. Crea las cuentas de Auth en paralelo (hasta PROVISION_CONCURRENCY a la vez).
+    2. Guarda todos los perfiles con un solo upsert; si el lote falla, reintenta fila por fila
+       para aislar las que fallan.
+    3. Borra las cuentas de Auth cuyo perfil no se guardó: no quedan usuarios huérfanos.
+       Con job["atomic"], cualquier fallo revierte todo el lote.
+    """
+    results = job["results"]
+    save = _ProgressSaver(job)
+    semaphore = asyncio.Semaphore(PROVISION_CONCURRENCY)
+    job["status"] = "running"
+    await save(force=True)
+
+    try:
+        _validate_batch(users, results)
+        job["processed"] = sum(1 for result in results if result["status"] == "failed")
+        if job["atomic"] and job["processed"]:
+            for result in results:
+                if result["status"] == "pending":
+                    _fail(result, "rollback", "No creado: otro usuario del lote no es válido")
+
+        async def create(user, result):
+            async with semaphore:
+                try:
+                    result["user_id"] = await create_auth_user(user)
+                except Exception as e:
+                    _fail(result, "auth", _error_message(e))
+            job["processed"] += 1
+            await save()
+
+        await asyncio.gather(*(
+            create(user, result) for user, result in zip(users, results) if result["status"] == "pending"
+        ))
+
+        job["phase"] = "profiles"
+        await save(force=True)
+        pending = [(user, result) for user, result in zip(users, results) if result["status"] == "pending"]
+        if job["atomic"] and len(pending) < len(users):
+            await _rollback(pending, "rollback", "Revertido: otro usuario del lote falló")
+        elif pending:
+            await _upsert_profiles(pending, semaphore, job["atomic"])
+
+        created = []
+        for _, result in pending:
+            if result["status"] == "pending":
+                result["status"] = "created"
+                created.append(result["user_id"])
+        await invalidate_cached_profile(*created)
+
+        job["status"] = "completed"
+    except asyncio.CancelledError:
+        # Apagado del worker: el reporte indica qué usuarios alcanzaron a crearse
+        job["status"] = "cancelled"
+        job["error"] = "Interrumpido al apagar el servidor"
+        raise
+    except Exception:
+        logger.exception("Error en el alta masiva de usuarios", extra={"job_id": job["id"]})
+        job["status"] = "failed"
+        job["error"] = "Error inesperado en el alta masiva"
+    finally:
+        job["phase"] = "done"
+        job["created"] = sum(1 for result in results if result["status"] == "created")
+        job["failed"] = sum(1 for result in results if result["status"] == "failed")
+        job["finished_at"] = _now()
+        await save(force=True)
+        logger.info("Alta masiva terminada", extra={
+            "job_id": job["id"], "users_created": job["created"], "users_failed": job["failed"]
+        })
+    return job
+
+
+async def _upsert_profiles(pending: list, semaphore: asyncio.Semaphore, atomic: bool):
+    try:
+        await supabase_admin.table('profiles').upsert(
+            [profile_row(result["user_id"], user) for user, result in pending]
+        ).execute()
+        return
+    except Exception as e:
+        if atomic:
+            await _rollback(pending, "profile", f"Revertido: {_error_message(e)}")
+            return
+        logger.warning("Falló el upsert por lote de perfiles; se reintenta por usuario", extra={"error": str(e)})
+
+    async def upsert_one(user, result):
+        async with semaphore:
+            try:
+                await supabase_admin.table('profiles').upsert(profile_row(result["user_id"], user)).execute()
+            except Exception as e:
+                await _rollback([(user, result)], "profile", _error_message(e))
+
+    await asyncio.gather(*(upsert_one(user, result) for user, result in pending))
+
+
+async def _rollback(pending: list, stage: str, error: str):
+    async def undo(result):
+        rolled_back = await rollback_auth_user(result["user_id"])
+        _fail(result, stage, error if rolled_back else f"{error} (la cuenta de Auth no se pudo borrar)")
+        if rolled_back:
+            result["user_id"] = None
+
+    await asyncio.gather(*(undo(result) for _, result in pending))
+
+
+_running_jobs = set()
+
+
+def running_jobs() -> list:
+    return list(_running_jobs)
+
+
+def start_provisioning(job: dict, users: list) -> asyncio.Task:
+    """Lanza el trabajo en segundo plano; se guarda la referencia para que no lo recoja el GC."""
+    task = asyncio.create_task(run_provisioning(job, users))
+    _running_jobs.add(task)
+    task.add_done_callback(_running_jobs.discard)
+    return task
+
+
+def _create_store():
+    if JOBS_BACKEND == "redis":
+        return RedisJobStore()
+    return MemoryJobStore()
+
+
+job_store = _create_store()
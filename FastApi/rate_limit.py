@@ -0,0 +1,219 @@
+import math
+import os
+import time
+from fastapi import HTTPException, Request
+from cache import TTLCache
+from database import get_redis
+from logging_utils import get_logger
+
+logger = get_logger("rate_limit")
+
+# "N/segundos": N intentos de ráfaga que se recargan a lo largo de ese periodo
+LOGIN_RATE_PER_IP = os.environ.get("LOGIN_RATE_PER_IP", "20/60")
+LOGIN_RATE_PER_EMAIL = os.environ.get("LOGIN_RATE_PER_EMAIL", "5/60")
+REGISTER_RATE_PER_IP = os.environ.get("REGISTER_RATE_PER_IP", "5/300")
+REGISTER_RATE_PER_EMAIL = os.environ.get("REGISTER_RATE_PER_EMAIL", "3/3600")
+
+# Espera exponencial tras logins fallidos del mismo email: 1s, 2s, 4s... hasta el máximo
+LOGIN_FREE_FAILURES = int(os.environ.get("LOGIN_FREE_FAILURES", "3"))
+LOGIN_BACKOFF_BASE = float(os.environ.get("LOGIN_BACKOFF_BASE", "1"))
+LOGIN_BACKOFF_MAX = float(os.environ.get("LOGIN_BACKOFF_MAX", "900"))
+# Tras este tiempo sin fallos el contador vuelve a cero
+LOGIN_FAILURE_WINDOW = float(os.environ.get("LOGIN_FAILURE_WINDOW", "3600"))
+
+# 'memory' (por worker) o 'redis' (compartido entre workers, requiere el paquete redis)
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MEMORY_SIZE = int(os.environ.get("RATE_LIMIT_MEMORY_SIZE", "50000"))
+
+# X-Forwarded-For lo controla el cliente: por defecto se usa la IP de la conexión (con gunicorn/
+# uvicorn, forwarded_allow_ips ya la reemplaza por la que informa un proxy confiable). Con "1" se
+# toma el último salto del header, el que agregó el proxy de confianza (p. ej. Vercel).
+TRUST_FORWARDED_FOR = os.environ.get("RATE_LIMIT_TRUST_FORWARDED_FOR", "0") == "1"
+
+
+class Rate:
+    """Cubeta de `capacity` fichas que se recarga por completo en `period` segundos."""
+
+    __slots__ = ("capacity", "period", "refill")
+
+    def __init__(self, spec: str):
+        capacity, _, period = spec.partition("/")
+        self.capacity = float(capacity)
+        self.period = float(period)
+        self.refill = self.capacity / self.period
+
+
+def backoff_delay(failures: int) -> float:
+    if failures <= LOGIN_FREE_FAILURES:
+        return 0.0
+    return min(LOGIN_BACKOFF_MAX, LOGIN_BACKOFF_BASE * 2 ** (failures - LOGIN_FREE_FAILURES - 1))
+
+
+class MemoryBackend:
+    """Cubetas en un LRU acotado: bajo un ataque con muchas IPs la memoria no crece sin límite."""
+
+    def __init__(self, maxsize: int = RATE_LIMIT_MEMORY_SIZE):
+        self._buckets = TTLCache(maxsize=maxsize)
+        self._failures = TTLCache(maxsize=maxsize, ttl=LOGIN_FAILURE_WINDOW)
+        self._blocked = TTLCache(maxsize=maxsize)
+
+    async def take(self, key: str, rate: Rate) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key) or (rate.capacity, now)
+        tokens = min(rate.capacity, tokens + (now - updated_at) * rate.refill)
+        if tokens < 1:
+            return (1 - tokens) / rate.refill
+        # Pasado un periodo la cubeta estaría llena de nuevo: la entrada puede expirar
+        self._buckets.set(key, (tokens - 1, now), ttl=rate.period)
+        return 0.0
+
+    async def blocked_for(self, key: str) -> float:
+        until = self._blocked.get(key)
+        return max(0.0, until - time.monotonic()) if until else 0.0
+
+    async def register_failure(self, key: str) -> float:
+        failures = self._failures.get(key, 0) + 1
+        self._failures.set(key, failures)
+        delay = backoff_delay(failures)
+        if delay:
+            self._blocked.set(key, time.monotonic() + delay, ttl=delay)
+        return delay
+
+    async def reset(self, key: str):
+        self._failures.pop(key)
+        self._blocked.pop(key)
+
+
+# Cubeta de fichas atómica en Redis: recarga, consume y devuelve la espera en un solo viaje
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill)
+if tokens < 1 then
+  return tostring((1 - tokens) / refill)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens - 1, 'ts', now)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return '0'
+"""
+
+
+class RedisBackend:
+    """Backend compartido entre workers e instancias (mismo cliente de Redis que la caché de respuestas)."""
+
+    def __init__(self, prefix: str = "becas:ratelimit:"):
+        self._redis = get_redis("RATE_LIMIT_BACKEND")
+        self._take = self._redis.register_script(_TAKE_SCRIPT)
+        self._prefix = prefix
+
+    async def take(self, key: str, rate: Rate) -> float:
+        wait = await self._take(
+            keys=[self._prefix + key],
+            args=[rate.capacity, rate.refill, time.time(), math.ceil(rate.period)],
+        )
+        return float(wait)
+
+    async def blocked_for(self, key: str) -> float:
+        ttl_ms = await self._redis.pttl(f"{self._prefix}blocked:{key}")
+        return max(0, ttl_ms) / 1000
+
+    async def register_failure(self, key: str) -> float:
+        failures_key = f"{self._prefix}failures:{key}"
+        pipe = self._redis.pipeline()
+        pipe.incr(failures_key)
+        pipe.expire(failures_key, math.ceil(LOGIN_FAILURE_WINDOW))
+        failures, _ = await pipe.execute()
+        delay = backoff_delay(failures)
+        if delay:
+            await self._redis.set(f"{self._prefix}blocked:{key}", 1, px=int(delay * 1000))
+        return delay
+
+    async def reset(self, key: str):
+        await self._redis.delete(f"{self._prefix}failures:{key}", f"{self._prefix}blocked:{key}")
+
+
+class RateLimiter:
+    """
+    Límites de /login y /register, evaluados antes de llamar a Supabase Auth.
+
+    Si el backend falla (p. ej. Redis caído) se deja pasar la petición: el limitador
+    protege la cuota de Auth, no debe tumbar el login.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.login_ip = Rate(LOGIN_RATE_PER_IP)
+        self.login_email = Rate(LOGIN_RATE_PER_EMAIL)
+        self.register_ip = Rate(REGISTER_RATE_PER_IP)
+        self.register_email = Rate(REGISTER_RATE_PER_EMAIL)
+
+    async def _safe(self, operation) -> float:
+        try:
+            return await operation or 0.0
+        except Exception as e:
+            logger.warning("Rate limiter backend error", extra={"error": str(e)})
+            return 0.0
+
+    async def check_login(self, request: Request, email: str):
+        email = normalize_email(email)
+        wait = (
+            await self._safe(self.backend.blocked_for(f"login:backoff:{email}"))
+            or await self._safe(self.backend.take(f"login:ip:{client_ip(request)}", self.login_ip))
+            or await self._safe(self.backend.take(f"login:email:{email}", self.login_email))
+        )
+        if wait > 0:
+            raise too_many_requests(wait)
+
+    async def check_register(self, request: Request, email: str):
+        wait = (
+            await self._safe(self.backend.take(f"register:ip:{client_ip(request)}", self.register_ip))
+            or await self._safe(self.backend.take(f"register:email:{normalize_email(email)}", self.register_email))
+        )
+        if wait > 0:
+            raise too_many_requests(wait)
+
+    async def login_failed(self, email: str):
+        await self._safe(self.backend.register_failure(f"login:backoff:{normalize_email(email)}"))
+
+    async def login_succeeded(self, email: str):
+        await self._safe(self.backend.reset(f"login:backoff:{normalize_email(email)}"))
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            # Los saltos anteriores los puede escribir el cliente; el último lo agregó el proxy
+            return forwarded.split(",")[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def too_many_requests(wait: float) -> HTTPException:
+    retry_after = max(1, math.ceil(wait))
+    return HTTPException(
+        status_code=429,
+        detail=f"Demasiados intentos. Intenta de nuevo en {retry_after} segundos.",
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+def is_credentials_error(error: Exception) -> bool:
+    """Errores de Supabase Auth que cuentan como intento fallido (no caídas ni timeouts)."""
+    return getattr(error, "status", None) in (400, 401)
+
+
+def _create_backend():
+    if RATE_LIMIT_BACKEND == "redis":
+        return RedisBackend()
+    return MemoryBackend(RATE_LIMIT_MEMORY_SIZE)
+
+
+limiter = RateLimiter(_create_backend())
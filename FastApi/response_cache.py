@@ -0,0 +1,274 @@
+import asyncio
+import json
+import os
+import time
+from urllib.parse import urlencode
+from cache import TTLCache
+from database import get_redis
+from logging_utils import get_logger
+
+logger = get_logger("response_cache")
+
+# Tiempo en que una respuesta se considera fresca, y ventana extra en la que se sirve
+# "stale" mientras se revalida en segundo plano (stale-while-revalidate)
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "30"))
+RESPONSE_CACHE_STALE_TTL = float(os.environ.get("RESPONSE_CACHE_STALE_TTL", "300"))
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "512"))
+# Becas individuales (POST /scholarships/batch): caché aparte para no desplazar los listados
+ROW_CACHE_SIZE = int(os.environ.get("ROW_CACHE_SIZE", "5000"))
+
+# 'memory' (por worker) o 'redis' (compartida entre workers, requiere el paquete redis)
+RESPONSE_CACHE_BACKEND = os.environ.get("RESPONSE_CACHE_BACKEND", "memory")
+
+
+class MemoryBackend:
+    """
+    Backend en proceso: LRU con TTL. Cada entrada guarda sus tags e invalidar recorre las
+    entradas vivas, así que lo que el LRU desaloja no deja rastro (no hay índice que crezca).
+    """
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE):
+        self._entries = TTLCache(maxsize=maxsize)
+
+    async def get(self, key: str):
+        item = self._entries.get(key)
+        return None if item is None else item[0]
+
+    async def get_many(self, keys: list) -> list:
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key: str, entry: dict, ttl: float, tags: list):
+        self._entries.set(key, (entry, frozenset(tags)), ttl=ttl)
+
+    async def set_many(self, entries: dict, ttl: float):
+        for key, entry in entries.items():
+            self._entries.set(key, (entry, frozenset()), ttl=ttl)
+
+    async def delete(self, keys: list):
+        for key in keys:
+            self._entries.pop(key)
+
+    async def invalidate_tags(self, tags: list):
+        tags = set(tags)
+        for key, (_, entry_tags) in self._entries.items():
+            if not tags.isdisjoint(entry_tags):
+                self._entries.pop(key)
+
+    async def clear(self):
+        self._entries.clear()
+
+
+class RedisBackend:
+    """Backend compartido en Redis. Cada tag es un set con las llaves que lo usan."""
+
+    def __init__(self, prefix: str = "becas:response:"):
+        self._redis = get_redis("RESPONSE_CACHE_BACKEND")
+        self._prefix = prefix
+
+    async def get(self, key: str):
+        raw = await self._redis.get(self._prefix + key)
+        return json.loads(raw) if raw else None
+
+    async def get_many(self, keys: list) -> list:
+        raws = await self._redis.mget([self._prefix + key for key in keys])
+        return [json.loads(raw) if raw else None for raw in raws]
+
+    async def set(self, key: str, entry: dict, ttl: float, tags: list):
+        pipe = self._redis.pipeline()
+        pipe.set(self._prefix + key, json.dumps(entry, default=str), ex=max(1, int(ttl)))
+        for tag in tags:
+            tag_key = f"{self._prefix}tag:{tag}"
+            pipe.sadd(tag_key, key)
+            pipe.expire(tag_key, max(1, int(ttl)))
+        await pipe.execute()
+
+    async def set_many(self, entries: dict, ttl: float):
+        pipe = self._redis.pipeline()
+        for key, entry in entries.items():
+            pipe.set(self._prefix + key, json.dumps(entry, default=str), ex=max(1, int(ttl)))
+        await pipe.execute()
+
+    async def delete(self, keys: list):
+        await self._redis.delete(*(self._prefix + key for key in keys))
+
+    async def invalidate_tags(self, tags: list):
+        for tag in tags:
+            tag_key = f"{self._prefix}tag:{tag}"
+            keys = await self._redis.smembers(tag_key)
+            if keys:
+                await self._redis.delete(*(self._prefix + k.decode() for k in keys))
+            await self._redis.delete(tag_key)
+
+    async def clear(self):
+        async for key in self._redis.scan_iter(match=self._prefix + "*"):
+            await self._redis.delete(key)
+
+
+class ResponseCache:
+    """
+    Caché de respuestas con stale-while-revalidate y coalescencia de peticiones.
+
+    - Fresca: se devuelve directo.
+    - Stale: se devuelve y se lanza UNA revalidación en segundo plano.
+    - Ausente: la primera petición consulta; las concurrentes esperan ese mismo resultado.
+    """
+
+    def __init__(self, backend, ttl: float = RESPONSE_CACHE_TTL, stale_ttl: float = RESPONSE_CACHE_STALE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._inflight = {}  # llave -> (generación, tarea)
+        self._tasks = set()
+        # Cambia en cada invalidación: una consulta iniciada antes no guarda su resultado
+        # ni la reciben las peticiones que llegan después
+        self._generation = 0
+
+    async def get_or_fetch(self, key: str, fetch, tags: list):
+        """
+        Args:
+            key: Llave normalizada (ver cache_key).
+            fetch: Función async sin argumentos que produce el valor.
+            tags: Tags para invalidar la entrada después.
+        """
+        entry = await self.backend.get(key)
+        if entry is not None:
+            if entry["fresh_until"] <= time.time():
+                self._load_once(key, fetch, tags)
+            return entry["value"]
+
+        # shield: si el cliente se desconecta no se cancela la consulta que otros esperan
+        return await asyncio.shield(self._load_once(key, fetch, tags))
+
+    def _load_once(self, key: str, fetch, tags: list) -> asyncio.Task:
+        inflight = self._inflight.get(key)
+        # Una consulta iniciada antes de una escritura no se comparte con peticiones posteriores
+        if inflight is not None and inflight[0] == self._generation:
+            return inflight[1]
+
+        generation = self._generation
+        task = asyncio.ensure_future(self._load(key, fetch, tags, generation))
+        self._inflight[key] = (generation, task)
+        self._tasks.add(task)
+        task.add_done_callback(lambda t: self._on_done(key, t))
+        return task
+
+    def pending_tasks(self) -> list:
+        """Consultas en curso (para esperarlas al apagar el worker)."""
+        return list(self._tasks)
+
+    def _on_done(self, key: str, task: asyncio.Task):
+        self._tasks.discard(task)
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[1] is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Error al revalidar caché", extra={"key": key, "error": str(task.exception())})
+
+    async def _load(self, key: str, fetch, tags: list, generation: int):
+        value = await fetch()
+        if generation == self._generation:
+            entry = {"value": value, "fresh_until": time.time() + self.ttl}
+            await self.backend.set(key, entry, ttl=self.ttl + self.stale_ttl, tags=tags)
+        return value
+
+    async def get_many_or_fetch(self, keys: list, fetch) -> dict:
+        """
+        Varias llaves con una sola lectura de la caché. Las ausentes o vencidas se piden
+        juntas a fetch(missing), que devuelve {llave: valor}; lo que devuelva se guarda
+        (incluido None, para recordar que algo no existe).
+
+        Returns:
+            {llave: valor} con las llaves cacheadas o devueltas por fetch.
+        """
+        now = time.time()
+        entries = await self.backend.get_many(keys)
+        found = {
+            key: entry["value"] for key, entry in zip(keys, entries)
+            if entry is not None and entry["fresh_until"] > now
+        }
+        missing = [key for key in keys if key not in found]
+        if missing:
+            generation = self._generation
+            fetched = await fetch(missing)
+            if fetched and generation == self._generation:
+                fresh_until = time.time() + self.ttl
+                await self.backend.set_many(
+                    {key: {"value": value, "fresh_until": fresh_until} for key, value in fetched.items()},
+                    ttl=self.ttl
+                )
+            found.update(fetched)
+        return found
+
+    async def invalidate(self, tags: list):
+        self._generation += 1
+        await self.backend.invalidate_tags(tags)
+
+    async def delete(self, keys: list):
+        self._generation += 1
+        await self.backend.delete(keys)
+
+    async def clear(self):
+        self._generation += 1
+        await self.backend.clear()
+
+
+def cache_key(namespace: str, params: dict) -> str:
+    """Llave estable a partir de parámetros: ignora None y el orden de los argumentos."""
+    normalized = sorted((k, str(v)) for k, v in params.items() if v is not None)
+    return f"{namespace}?{urlencode(normalized)}"
+
+
+def scholarship_scope_tag(university_center_id=None, scholarship_type_id=None) -> str:
+    return f"scholarships:{university_center_id or '*'}:{scholarship_type_id or '*'}"
+
+
+def scholarship_row_key(scholarship_id: str) -> str:
+    return f"scholarship:{scholarship_id}"
+
+
+async def invalidate_scholarship_scopes(rows: list):
+    """
+    Invalida los listados que pueden contener las becas dadas: los filtrados por su campus,
+    por su tipo, por ambos y los que no filtran ninguno de los dos. También descarta
+    cada beca de la caché por id.
+    """
+    tags = set()
+    for row in rows:
+        campus, scholarship_type = row.get('university_center_id'), row.get('scholarship_type_id')
+        tags.update({
+            scholarship_scope_tag(campus, scholarship_type),
+            scholarship_scope_tag(campus, None),
+            scholarship_scope_tag(None, scholarship_type),
+            scholarship_scope_tag(None, None),
+        })
+    row_keys = [scholarship_row_key(row['id']) for row in rows if row.get('id')]
+    try:
+        await response_cache.invalidate(list(tags))
+        if row_keys:
+            await row_cache.delete(row_keys)
+    except Exception as e:
+        logger.error("Error al invalidar caché de becas", extra={"error": str(e)})
+
+
+async def clear_scholarship_cache():
+    """Para escrituras cuyo campus/tipo anterior no se conoce (p. ej. cambio de campus)."""
+    try:
+        await response_cache.clear()
+        await row_cache.clear()
+    except Exception as e:
+        logger.error("Error al limpiar caché de becas", extra={"error": str(e)})
+
+
+def _create_backend(maxsize: int, prefix: str):
+    if RESPONSE_CACHE_BACKEND == "redis":
+        return RedisBackend(prefix)
+    return MemoryBackend(maxsize)
+
+
+def create_cache(maxsize: int, prefix: str, **kwargs) -> ResponseCache:
+    """ResponseCache sobre el backend configurado: memoria del worker o Redis compartido."""
+    return ResponseCache(_create_backend(maxsize, prefix), **kwargs)
+
+
+response_cache = create_cache(RESPONSE_CACHE_SIZE, "becas:response:")
+row_cache = create_cache(ROW_CACHE_SIZE, "becas:row:")
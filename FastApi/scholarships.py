@@ -1,9 +1,64 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
-from database import supabase
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from pydantic import BaseModel, Field
+from typing import Optional, Literal, List
+from datetime import datetime
+from database import supabase, execute_raw
+from catalog import catalog, CatalogEntry
+from response_cache import response_cache, row_cache, cache_key, scholarship_scope_tag, scholarship_row_key
+from logging_utils import get_logger
+from serialization import RawJSONResponse, dumps, envelope_with_raw_data, parse_content_range
+import asyncio
+import base64
+import json
 import re
+import uuid
 
 router = APIRouter()
+logger = get_logger("scholarships")
+
+# Browsers/CDNs may reuse catalog responses for this long before revalidating with If-None-Match
+CATALOG_CLIENT_MAX_AGE = 300
+
+# Explicit column list: keeps the generated search_vector column out of responses
+SCHOLARSHIP_FIELDS = (
+    'id', 'university_center_id', 'scholarship_type_id', 'title', 'description', 'requirements',
+    'application_start_date', 'application_end_date', 'status', 'created_at'
+)
+SCHOLARSHIP_COLUMNS = ', '.join(SCHOLARSHIP_FIELDS)
+
+# Batch lookup: ids per request, and ids per in_() filter (keeps the URL short)
+BATCH_MAX_IDS = 500
+BATCH_CHUNK_SIZE = 200
+
+# expand= option -> (catalog table, foreign key column on scholarships)
+SCHOLARSHIP_EXPANSIONS = {
+    'university_center': ('university_centers', 'university_center_id'),
+    'scholarship_type': ('scholarship_types', 'scholarship_type_id'),
+}
+
+
+def normalize_search_term(search_term: str) -> str:
+    """
+    Clean a raw search string without escaping it (for full-text and trigram search).
+
+    Args:
+        search_term: The raw search string from user input
+
+    Returns:
+        The term without null bytes, trimmed and limited in length
+    """
+    if not search_term:
+        return ""
+
+    # Remove any null bytes
+    normalized = search_term.replace('\x00', '')
+
+    # Limit length to prevent DoS
+    max_length = 100
+    if len(normalized) > max_length:
+        normalized = normalized[:max_length]
+
+    return normalized.strip()
 
 
 def sanitize_search_term(search_term: str) -> str:
@@ -16,49 +71,221 @@ def sanitize_search_term(search_term: str) -> str:
     Returns:
         Sanitized search term safe for use in ILIKE queries
     """
-    if not search_term:
-        return ""
-    
     # Escape special characters that have meaning in ILIKE patterns
     # % = wildcard for any characters
     # _ = wildcard for single character
     # \ = escape character
-    sanitized = search_term.replace('\\', '\\\\')  # Escape backslashes first
+    sanitized = normalize_search_term(search_term).replace('\\', '\\\\')  # Escape backslashes first
     sanitized = sanitized.replace('%', '\\%')      # Escape percent signs
     sanitized = sanitized.replace('_', '\\_')      # Escape underscores
-    
-    # Remove any null bytes
-    sanitized = sanitized.replace('\x00', '')
-    
-    # Limit length to prevent DoS
-    max_length = 100
-    if len(sanitized) > max_length:
-        sanitized = sanitized[:max_length]
-    
-    return sanitized.strip()
+    return sanitized
+
+
+def encode_cursor(row: dict) -> str:
+    """
+    Build an opaque keyset cursor from the last row of a page.
+
+    Args:
+        row: A scholarship row containing at least created_at and id
+
+    Returns:
+        URL-safe token that points right after the given row
+    """
+    raw = json.dumps([row.get('created_at'), row.get('id')], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Decode and validate a cursor produced by encode_cursor.
+
+    Returns:
+        Tuple (created_at, id)
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        # Validate both values so nothing unexpected reaches the PostgREST filter
+        datetime.fromisoformat(created_at)
+        return created_at, str(uuid.UUID(row_id))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+
+def parse_list_param(value: Optional[str], allowed, param_name: str) -> list:
+    """
+    Parse a comma-separated query parameter against a whitelist.
+
+    Raises:
+        HTTPException: If any of the values is not allowed.
+    """
+    if not value:
+        return []
+
+    items = list(dict.fromkeys(item.strip() for item in value.split(',') if item.strip()))
+    invalid = [item for item in items if item not in allowed]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Valores no válidos en '{param_name}': {', '.join(invalid)}. Permitidos: {', '.join(allowed)}"
+        )
+    return items
+
+
+def parse_uuid_param(value: Optional[str], param_name: str) -> Optional[str]:
+    """
+    Validate an optional UUID query parameter before it reaches a PostgREST filter.
+
+    Returns:
+        The canonical UUID string, or None if the parameter was not sent
+
+    Raises:
+        HTTPException: If the value is not a UUID.
+    """
+    if value is None:
+        return None
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"'{param_name}' no es un UUID válido")
+
+
+def build_projection(fields: list, expand: list, use_cursor: bool) -> list:
+    """
+    Columns to select for the requested fields.
+
+    Foreign keys needed by expand, and the cursor key in cursor mode,
+    are always included so the response can be built.
+    """
+    columns = list(fields or SCHOLARSHIP_FIELDS)
+    required = [SCHOLARSHIP_EXPANSIONS[name][1] for name in expand]
+    if use_cursor:
+        required += ['created_at', 'id']
+    for column in required:
+        if column not in columns:
+            columns.append(column)
+    return columns
+
+
+async def expand_related(rows: list, expand: list) -> list:
+    """
+    Attach university center / scholarship type objects to each row.
+
+    The related data comes from the in-process catalog, so expanding costs
+    no extra database round trip.
+    """
+    for name in expand:
+        table, foreign_key = SCHOLARSHIP_EXPANSIONS[name]
+        entry = await catalog.get(table)
+        by_id = {item['id']: item for item in entry.data}
+        for row in rows:
+            row[name] = by_id.get(row.get(foreign_key))
+    return rows
+
+
+async def search_scholarships_ranked(
+    search_term: str,
+    status: Optional[str],
+    university_center_id: Optional[str],
+    scholarship_type_id: Optional[str],
+    limit: int,
+    offset: int
+) -> dict:
+    """
+    Run a relevance-ranked search through the search_scholarships RPC.
+
+    The function combines the Spanish full-text index with pg_trgm similarity,
+    so it tolerates typos and partial words while ordering the best matches first.
+
+    Args:
+        search_term: Search string from normalize_search_term (not ILIKE-escaped: the RPC
+            feeds it to websearch_to_tsquery and similarity() and escapes it for its ILIKE)
+
+    Returns:
+        The same envelope as get_scholarships, each row carrying its rank.
+    """
+    response = await supabase.rpc('search_scholarships', {
+        'search_term': search_term,
+        'p_status': status,
+        'p_university_center_id': university_center_id,
+        'p_scholarship_type_id': scholarship_type_id,
+        'p_limit': limit,
+        'p_offset': offset
+    }).execute()
+
+    rows = response.data or []
+    if rows:
+        total = rows[0]['total_count']
+    elif offset > 0:
+        # Past the last match the page carries no total_count: ask for the first row only
+        first = await supabase.rpc('search_scholarships', {
+            'search_term': search_term,
+            'p_status': status,
+            'p_university_center_id': university_center_id,
+            'p_scholarship_type_id': scholarship_type_id,
+            'p_limit': 1,
+            'p_offset': 0
+        }).execute()
+        total = first.data[0]['total_count'] if first.data else 0
+    else:
+        total = 0
+    for row in rows:
+        row.pop('total_count', None)
+
+    return {
+        "status": "success",
+        "data": rows,
+        "count": len(rows),
+        "total": total,
+        "limit": limit,
+        "offset": offset
+    }
 
 @router.get(path= "/scholarships")
 async def get_scholarships(
-    status: Optional[str] = Query(None, description="Filter by status (e.g., 'Abierta', 'Cerrada')"),
+    status: Optional[str] = Query(None, description="Filter by status: 'Abierta' or 'Cerrada' (kept in sync with the application dates)"),
     university_center_id: Optional[str] = Query(None, description="Filter by university center ID"),
     scholarship_type_id: Optional[str] = Query(None, description="Filter by scholarship type ID"),
     search: Optional[str] = Query(None, description="Search in title and description"),
+    search_mode: Literal['ilike', 'ranked'] = Query('ilike', description="'ilike' substring match or 'ranked' full-text search ordered by relevance"),
     limit: Optional[int] = Query(100, ge=1, le=1000, description="Maximum number of results (1-1000)"),
-    offset: Optional[int] = Query(0, ge=0, description="Number of results to skip for pagination")
+    offset: Optional[int] = Query(0, ge=0, description="Number of results to skip for pagination"),
+    pagination: Literal['offset', 'cursor'] = Query('offset', description="Pagination mode: 'offset' or keyset 'cursor'"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor (implies pagination=cursor)"),
+    count: Literal['exact', 'planned', 'estimated', 'none'] = Query('exact', description="How to compute 'total': exact, planned, estimated or none"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (e.g. 'id,title,status')"),
+    expand: Optional[str] = Query(None, description="Comma-separated related data to embed: university_center, scholarship_type")
 ) -> dict:
     """
     Get scholarships with optional server-side filters for better performance.
+
+    Responses are cached per normalized query (see response_cache) and served
+    stale-while-revalidate; create/update/delete invalidate the affected listings.
     
     Query parameters:
-    - status: Filter by status (e.g., 'Abierta', 'Cerrada')
+    - status: Filter by status ('Abierta', 'Cerrada'). The database derives it from the
+      application dates, so 'Abierta' means open right now
     - university_center_id: Filter by university center ID
     - scholarship_type_id: Filter by scholarship type ID
     - search: Search in title and description
+    - search_mode: 'ilike' (default) substring match, or 'ranked' to use the full-text and
+      trigram indexes and order results by relevance (offset pagination only)
     - limit: Maximum number of results (1-1000, default: 100)
     - offset: Number of results to skip for pagination (default: 0)
+    - pagination: 'offset' (default) or 'cursor'. Cursor mode orders by (created_at, id)
+      descending and keeps latency flat no matter how deep the client scrolls
+    - cursor: next_cursor value from the previous page (implies cursor mode)
+    - count: 'exact' (default), 'planned', 'estimated' or 'none' to skip the COUNT entirely
+    - fields: Columns to return, so list views can skip description/requirements
+    - expand: 'university_center' and/or 'scholarship_type' to embed the related
+      name (and acronym) in each row instead of returning only the foreign key
 
     Returns:
-        A dictionary with the status, data, count of returned items, total items, limit, and offset.
+        A dictionary with the status, data, count of returned items, total items (None when
+        count='none'), limit, and offset (offset mode) or next_cursor (cursor mode).
 
     Raises:
         HTTPException: If there is an error fetching data from the database.
@@ -67,54 +294,207 @@ async def get_scholarships(
         raise HTTPException(status_code=503, detail="Servicio de base de datos no disponible")
 
     try:
-        # Start building the query
-        query = supabase.table('scholarships').select('*', count='exact')
+        sanitized_search = sanitize_search_term(search) if search else ""
+        use_cursor = pagination == 'cursor' or cursor is not None
+        requested_fields = parse_list_param(fields, SCHOLARSHIP_FIELDS, 'fields')
+        requested_expand = parse_list_param(expand, tuple(SCHOLARSHIP_EXPANSIONS), 'expand')
+        columns = build_projection(requested_fields, requested_expand, use_cursor)
+
+        cursor_position = decode_cursor(cursor) if cursor else None
+        if search_mode == 'ranked' and sanitized_search and use_cursor:
+            raise HTTPException(status_code=400, detail="La búsqueda por relevancia solo admite paginación por offset")
+
+        # The cache stores the encoded body (as text, so the Redis backend can hold it too):
+        # cache hits skip serialization entirely
+        async def fetch_page() -> str:
+            if search_mode == 'ranked' and sanitized_search:
+                result = await search_scholarships_ranked(
+                    normalize_search_term(search), status, university_center_id, scholarship_type_id, limit, offset
+                )
+                if requested_fields:
+                    # The RPC returns whole rows: project them before sending
+                    keep = set(columns) | {'rank'}
+                    result["data"] = [{k: v for k, v in row.items() if k in keep} for row in result["data"]]
+                await expand_related(result["data"], requested_expand)
+                return dumps(result).decode()
+
+            # Start building the query
+            count_method = None if count == 'none' else count
+            query = supabase.table('scholarships').select(', '.join(columns), count=count_method)
         
-        # Apply server-side filters
-        if status:
-            query = query.eq('status', status)
+            # Apply server-side filters
+            if status:
+                query = query.eq('status', status)
         
-        if university_center_id:
-            query = query.eq('university_center_id', university_center_id)
+            if university_center_id:
+                query = query.eq('university_center_id', university_center_id)
         
-        if scholarship_type_id:
-            query = query.eq('scholarship_type_id', scholarship_type_id)
+            if scholarship_type_id:
+                query = query.eq('scholarship_type_id', scholarship_type_id)
         
-        # Search in title and description using OR condition with sanitized input
-        if search:
-            sanitized_search = sanitize_search_term(search)
-            
+            # Search in title and description using OR condition with sanitized input
             if sanitized_search:
                 query = query.or_(f'title.ilike.%{sanitized_search}%,description.ilike.%{sanitized_search}%')
         
-        # Apply pagination
-        query = query.range(offset, offset + limit - 1)
+            # Apply pagination
+            if use_cursor:
+                # Keyset pagination: seek past the last (created_at, id) instead of skipping rows
+                if cursor_position:
+                    last_created_at, last_id = cursor_position
+                    query = query.or_(
+                        f'created_at.lt."{last_created_at}",'
+                        f'and(created_at.eq."{last_created_at}",id.lt.{last_id})'
+                    )
+                query = query.order('created_at', desc=True).order('id', desc=True).limit(limit)
+            else:
+                query = query.range(offset, offset + limit - 1)
+
+            if not use_cursor and not requested_expand:
+                # Nothing to transform: forward PostgREST's JSON array untouched instead of
+                # parsing every row and encoding it again
+                raw = await execute_raw(query)
+                returned, total = parse_content_range(raw.headers.get('content-range'))
+                return envelope_with_raw_data(raw.content, {
+                    "count": returned,
+                    "total": total,
+                    "limit": limit,
+                    "offset": offset
+                }).decode()
         
-        # Execute query
-        response = query.execute()
+            # Execute query
+            response = await query.execute()
+            await expand_related(response.data, requested_expand)
         
-        return {
-            "status": "success",
-            "data": response.data,
-            "count": len(response.data),
-            "total": response.count,
-            "limit": limit,
-            "offset": offset
-        }
+            result = {
+                "status": "success",
+                "data": response.data,
+                "count": len(response.data),
+                "total": response.count,
+                "limit": limit
+            }
+
+            if use_cursor:
+                has_more = len(response.data) == limit
+                result["next_cursor"] = encode_cursor(response.data[-1]) if has_more else None
+            else:
+                result["offset"] = offset
 
+            return dumps(result).decode()
+
+        # Identical queries (normalized parameters) share one cached response;
+        # writes to a campus/type invalidate the listings that may include it
+        key = cache_key('scholarships', {
+            'status': status,
+            'university_center_id': university_center_id,
+            'scholarship_type_id': scholarship_type_id,
+            'search': sanitized_search or None,
+            'search_mode': search_mode if sanitized_search else None,
+            'limit': limit,
+            'offset': None if use_cursor else offset,
+            'pagination': 'cursor' if use_cursor else None,
+            'cursor': cursor,
+            'count': count,
+            'fields': ','.join(requested_fields) or None,
+            'expand': ','.join(sorted(requested_expand)) or None
+        })
+        tags = [scholarship_scope_tag(university_center_id, scholarship_type_id)]
+        body = await response_cache.get_or_fetch(key, fetch_page, tags)
+        return RawJSONResponse(body)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error al obtener becas")
+        raise HTTPException(status_code=500, detail=f"Error interno al obtener becas: {str(e)}")
+
+class ScholarshipBatchRequest(BaseModel):
+    # Too many ids is an invalid parameter (422 with the limit), like limit > 1000 on the listing
+    ids: List[str] = Field(..., max_length=BATCH_MAX_IDS)
+
+@router.post(path= "/scholarships/batch")
+async def get_scholarships_batch(batch: ScholarshipBatchRequest):
+    """
+    Get many scholarships by id in a single request (saved scholarships, application views).
+
+    Fresh rows come from the per-scholarship cache; the rest are loaded together with
+    in_() filters of up to BATCH_CHUNK_SIZE ids, sent concurrently.
+
+    Returns:
+        data: The scholarships found, in the order requested (repeated ids appear once)
+        missing: Requested ids that do not exist
+        count: Number of rows in data
+    """
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Servicio de base de datos no disponible")
+
+    if not batch.ids:
+        raise HTTPException(status_code=400, detail="No se enviaron ids")
+
+    try:
+        # Canonical form, the same PostgREST returns, so cache keys and lookups match
+        ids = list(dict.fromkeys(str(uuid.UUID(value)) for value in batch.ids))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="IDs de beca inválidos")
+    keys = {scholarship_row_key(scholarship_id): scholarship_id for scholarship_id in ids}
+
+    async def fetch_rows(missing_keys: list) -> dict:
+        missing_ids = [keys[key] for key in missing_keys]
+        responses = await asyncio.gather(*(
+            supabase.table('scholarships').select(SCHOLARSHIP_COLUMNS)
+            .in_('id', missing_ids[i:i + BATCH_CHUNK_SIZE]).execute()
+            for i in range(0, len(missing_ids), BATCH_CHUNK_SIZE)
+        ))
+        fetched = {key: None for key in missing_keys} # Inexistentes: también se cachean (crear invalida por id)
+        fetched.update({
+            scholarship_row_key(row['id']): dumps(row).decode()
+            for response in responses for row in response.data
+        })
+        return fetched
+
+    try:
+        rows = await row_cache.get_many_or_fetch(list(keys), fetch_rows)
     except Exception as e:
-        print(f"Error al obtener becas: {e}")
+        logger.exception("Error al obtener becas por id")
         raise HTTPException(status_code=500, detail=f"Error interno al obtener becas: {str(e)}")
 
+    found = [rows[key].encode() for key in keys if rows.get(key) is not None]
+    missing = [scholarship_id for key, scholarship_id in keys.items() if rows.get(key) is None]
+    return RawJSONResponse(envelope_with_raw_data(b'[' + b','.join(found) + b']', {
+        "count": len(found),
+        "missing": missing
+    }))
+
+def catalog_response(entry: CatalogEntry, request: Request) -> Response:
+    """
+    Build a catalog response with ETag/Cache-Control headers.
+
+    Returns:
+        An empty 304 response when the client's If-None-Match matches the current
+        ETag, otherwise the usual envelope (pre-encoded by the catalog) with the headers set.
+    """
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": f"public, max-age={CATALOG_CLIENT_MAX_AGE}"
+    }
+
+    if_none_match = request.headers.get("if-none-match", "")
+    client_etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if entry.etag in client_etags or "*" in client_etags:
+        return Response(status_code=304, headers=headers)
+
+    return RawJSONResponse(entry.body, headers=headers)
+
 @router.get(path="/scholarship-types")
-async def get_scholarship_types() -> dict:
+async def get_scholarship_types(request: Request) -> dict:
     """
     Get all scholarship types for filter dropdown
 
-    Returns a list of scholarship types with their IDs and names.
+    Returns a list of scholarship types with their IDs and names, served from the
+    in-process catalog. Supports conditional requests through If-None-Match.
 
     Returns:
-        A dictionary with the status and data containing scholarship types.
+        A dictionary with the status and data containing scholarship types,
+        or 304 Not Modified if the client copy is still current.
 
     Raises:
         HTTPException: If there is an error fetching data from the database.
@@ -125,21 +505,24 @@ async def get_scholarship_types() -> dict:
         raise HTTPException(status_code=503, detail="Servicio de base de datos no disponible")
 
     try:
-        response = supabase.table('scholarship_types').select('id, name').execute()
-        return {"status": "success", "data": response.data}
+        entry = await catalog.get('scholarship_types')
     except Exception as e:
-        print(f"Error al obtener tipos de beca: {e}")
+        logger.exception("Error al obtener tipos de beca")
         raise HTTPException(status_code=500, detail=str(e))
 
+    return catalog_response(entry, request)
+
 @router.get(path="/university-centers")
-async def get_university_centers() -> dict:
+async def get_university_centers(request: Request) -> dict:
     """
     Get all university centers for filter dropdown
 
-    Returns a list of university centers with their IDs and names.
+    Returns a list of university centers with their IDs, names and acronyms, served from the
+    in-process catalog. Supports conditional requests through If-None-Match.
 
     Returns:
-        A dictionary with the status and data containing university centers.
+        A dictionary with the status and data containing university centers,
+        or 304 Not Modified if the client copy is still current.
 
     Raises:
         HTTPException: If there is an error fetching data from the database.
@@ -149,8 +532,9 @@ async def get_university_centers() -> dict:
         raise HTTPException(status_code=503, detail="Servicio de base de datos no disponible")
 
     try:
-        response = supabase.table('university_centers').select('id, name').execute()
-        return {"status": "success", "data": response.data}
+        entry = await catalog.get('university_centers')
     except Exception as e:
-        print(f"Error al obtener centros universitarios: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        logger.exception("Error al obtener centros universitarios")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return catalog_response(entry, request)
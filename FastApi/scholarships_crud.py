@@ -1,11 +1,28 @@
-from fastapi import APIRouter, HTTPException, Body, Depends
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Body, Depends, Request
+from pydantic import BaseModel, ValidationError
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-from database import supabase, supabase_admin # Usamos admin para escribir
+from database import supabase, supabase_admin, returning # Usamos admin para escribir
 from auth_utils import get_current_user_profile
+from scholarships import SCHOLARSHIP_COLUMNS
+from response_cache import invalidate_scholarship_scopes, clear_scholarship_cache
+from status_sync import sync_scholarship_status
+from logging_utils import get_logger
+import asyncio
+import csv
+import io
+import json
+import uuid
 
 router = APIRouter()
+logger = get_logger("scholarships_crud")
+
+# Operaciones masivas: filas máximas por petición y filas por lote de escritura.
+# Los lotes también limitan cuántos ids viajan en un filtro in_() (largo de la URL).
+BULK_MAX_ROWS = 1000
+BULK_CHUNK_SIZE = 200
+# UPDATEs masivos simultáneos (uno por lote de filas con los mismos cambios)
+BULK_UPDATE_CONCURRENCY = 8
 
 # --- SECURITY HELPERS ---
 
@@ -51,6 +68,56 @@ def verify_campus_ownership(profile: dict, university_center_id: str):
     
     return False
 
+def resolve_campus_scope(profile: dict, university_center_id: Optional[str]) -> Optional[str]:
+    """
+    Campus al que se limita una consulta de solo lectura (exportaciones, estadísticas):
+    un campus_admin solo ve su campus; el super admin puede filtrar por uno o ver todo.
+    """
+    verify_admin_or_campus_admin(profile)
+
+    if profile.get('role') == 'campus_admin':
+        campus = university_center_id or profile.get('campus')
+        verify_campus_ownership(profile, campus)
+        return campus
+
+    return university_center_id
+
+def apply_campus_guard(query, profile: dict):
+    """
+    Restringe un UPDATE/DELETE al campus del campus_admin.
+    Así el chequeo de propiedad viaja en la misma escritura (un solo round trip, sin ventana de carrera).
+    """
+    if profile.get('role') == 'campus_admin':
+        campus = profile.get('campus')
+        if not campus:
+            raise HTTPException(
+                status_code=403,
+                detail="Tu usuario es Admin de Sede pero no tiene campus asignado"
+            )
+        query = query.eq('university_center_id', campus)
+    return query
+
+async def raise_missing_or_forbidden(scholarship_id: str, not_found_detail: str = "Beca no encontrada"):
+    """
+    Se llama solo cuando una escritura protegida no afectó filas:
+    distingue si la beca no existe (404) o es de otro campus (403).
+    """
+    existing = await supabase_admin.table('scholarships').select('id').eq('id', scholarship_id).limit(1).execute()
+    if existing.data:
+        raise HTTPException(
+            status_code=403,
+            detail="No tienes permiso para gestionar becas de otro campus"
+        )
+    raise HTTPException(status_code=404, detail=not_found_detail)
+
+def campus_ownership_error(profile: dict, university_center_id: str) -> Optional[str]:
+    """Como verify_campus_ownership, pero devuelve el motivo en vez de lanzar (para reportes por fila)."""
+    try:
+        verify_campus_ownership(profile, university_center_id)
+        return None
+    except HTTPException as e:
+        return e.detail
+
 # --- MODELOS DE DATOS ---
 
 class ScholarshipCreate(BaseModel):
@@ -61,7 +128,7 @@ class ScholarshipCreate(BaseModel):
     requirements: Optional[List[str]] = [] # JSONB: Lo manejamos como lista de textos
     application_start_date: datetime
     application_end_date: datetime
-    status: str = "active"
+    status: str = "active" # Con fechas, la BD lo recalcula (Abierta/Cerrada) al guardar
 
 class ScholarshipUpdate(BaseModel):
     title: Optional[str] = None
@@ -71,7 +138,121 @@ class ScholarshipUpdate(BaseModel):
     requirements: Optional[List[str]] = None
     application_start_date: Optional[datetime] = None
     application_end_date: Optional[datetime] = None
-    status: Optional[str] = None
+    status: Optional[str] = None # Solo se conserva en becas sin fechas (ver trigger scholarships_set_status)
+
+class ScholarshipBulkUpdateItem(ScholarshipUpdate):
+    id: str
+
+class ScholarshipBulkDelete(BaseModel):
+    ids: List[str]
+
+# --- UTILIDADES PARA OPERACIONES MASIVAS ---
+
+def serialize_dates(data: dict) -> dict:
+    """Convierte las fechas de aplicación a string ISO para enviarlas a Supabase."""
+    for key in ('application_start_date', 'application_end_date'):
+        if isinstance(data.get(key), datetime):
+            data[key] = data[key].isoformat()
+    return data
+
+def chunked(items: list, size: int = BULK_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _parse_csv_row(row: dict) -> dict:
+    """Limpia una fila CSV: celdas vacías se omiten y requirements acepta JSON o 'a|b|c'."""
+    parsed = {k.strip(): v.strip() for k, v in row.items() if k and v is not None and v.strip() != ''}
+    requirements = parsed.get('requirements')
+    if requirements is not None:
+        if requirements.startswith('['):
+            parsed['requirements'] = json.loads(requirements)
+        else:
+            parsed['requirements'] = [item.strip() for item in requirements.split('|') if item.strip()]
+    return parsed
+
+async def parse_bulk_payload(request: Request) -> list:
+    """
+    Lee el cuerpo de una operación masiva: arreglo JSON (o {"items": [...]}) o CSV con encabezados.
+    """
+    body = await request.body()
+    content_type = request.headers.get('content-type', '')
+
+    try:
+        if 'csv' in content_type:
+            reader = csv.DictReader(io.StringIO(body.decode('utf-8-sig')))
+            rows = [_parse_csv_row(row) for row in reader]
+        else:
+            payload = json.loads(body)
+            rows = payload.get('items') if isinstance(payload, dict) else payload
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Cuerpo inválido: se esperaba un arreglo JSON o un CSV")
+
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise HTTPException(status_code=400, detail="Cuerpo inválido: se esperaba una lista de becas")
+    if not rows:
+        raise HTTPException(status_code=400, detail="No se enviaron datos")
+    if len(rows) > BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Máximo {BULK_MAX_ROWS} becas por petición")
+    return rows
+
+def normalize_scholarship_id(value) -> Optional[str]:
+    """Forma canónica del UUID (la que devuelve PostgREST) o None si no es un UUID válido."""
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return None
+
+def _row_error(index: int, error: str, scholarship_id: str = None) -> dict:
+    return {"index": index, "id": scholarship_id, "status": "error", "error": error}
+
+def _validation_message(error: ValidationError) -> str:
+    messages = []
+    for e in error.errors():
+        location = '.'.join(str(p) for p in e['loc'])
+        messages.append(f"{location}: {e['msg']}" if location else e['msg'])
+    return "; ".join(messages)
+
+def bulk_report(results: list) -> dict:
+    failed = sum(1 for r in results if r["status"] == "error")
+    return {
+        "status": "success" if not failed else ("error" if failed == len(results) else "partial"),
+        "summary": {"total": len(results), "succeeded": len(results) - failed, "failed": failed},
+        "results": results
+    }
+
+async def fetch_existing_scholarships(ids: list, columns: str = SCHOLARSHIP_COLUMNS) -> dict:
+    """Trae las becas afectadas con un in_() por lote (uno solo hasta BULK_CHUNK_SIZE ids)."""
+    existing = {}
+    for ids_chunk in chunked(list(dict.fromkeys(ids))):
+        response = await supabase_admin.table('scholarships').select(columns).in_('id', ids_chunk).execute()
+        existing.update({row['id']: row for row in response.data})
+    return existing
+
+async def report_unmatched(results: list, unmatched: list, profile: dict, error_detail: str):
+    """
+    Filas que una escritura protegida no afectó: con una consulta por lote distingue si la
+    beca no existe o es de otro campus (como raise_missing_or_forbidden, pero por fila).
+    """
+    if not unmatched:
+        return
+    try:
+        existing = await fetch_existing_scholarships(
+            [scholarship_id for _, scholarship_id in unmatched], columns='id, university_center_id'
+        )
+    except Exception:
+        logger.exception("Error fetching unmatched scholarships")
+        existing = None
+
+    for index, scholarship_id in unmatched:
+        if existing is None:
+            results[index] = _row_error(index, error_detail, scholarship_id)
+        elif scholarship_id in existing:
+            ownership_error = campus_ownership_error(profile, existing[scholarship_id]['university_center_id'])
+            results[index] = _row_error(
+                index, ownership_error or "No tienes permiso para gestionar becas de otro campus", scholarship_id
+            )
+        else:
+            results[index] = _row_error(index, "Beca no encontrada", scholarship_id)
 
 # --- RUTAS DEL CRUD ---
 # 1. CREAR BECA (Create) - Admin
@@ -95,14 +276,223 @@ async def create_scholarship(
         data['application_start_date'] = data['application_start_date'].isoformat()
         data['application_end_date'] = data['application_end_date'].isoformat()
 
-        response = supabase_admin.table('scholarships').insert(data).execute()
+        query = supabase_admin.table('scholarships').insert(data)
+        response = await returning(query, SCHOLARSHIP_COLUMNS).execute()
+        await invalidate_scholarship_scopes(response.data)
         return {"status": "success", "message": "Beca creada", "data": response.data}
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Error creating scholarship: {str(e)}")
+    except Exception:
+        logger.exception("Error creating scholarship")
         raise HTTPException(status_code=400, detail="Error al crear beca")
 
+# --- OPERACIONES MASIVAS ---
+# Declaradas antes de /scholarships/{scholarship_id} para que "bulk" no se tome como id.
+
+@router.post(path= "/scholarships/bulk")
+async def bulk_create_scholarships(
+    request: Request,
+    profile: dict = Depends(get_current_user_profile)
+):
+    """
+    Crea becas en lote a partir de un arreglo JSON o un CSV (Content-Type: text/csv).
+    Valida cada fila con ScholarshipCreate e inserta en lotes. Devuelve un reporte por fila.
+    """
+    verify_admin_or_campus_admin(profile)
+
+    if not supabase_admin:
+        raise HTTPException(status_code=503, detail="Falta Service Key para escritura")
+
+    rows = await parse_bulk_payload(request)
+    results = [None] * len(rows)
+    pending = []  # (índice, datos listos para insertar)
+
+    for index, raw in enumerate(rows):
+        try:
+            scholarship = ScholarshipCreate(**raw)
+        except ValidationError as e:
+            results[index] = _row_error(index, _validation_message(e))
+            continue
+
+        ownership_error = campus_ownership_error(profile, scholarship.university_center_id)
+        if ownership_error:
+            results[index] = _row_error(index, ownership_error)
+            continue
+
+        pending.append((index, serialize_dates(scholarship.dict())))
+
+    for batch in chunked(pending):
+        try:
+            query = supabase_admin.table('scholarships').insert([data for _, data in batch])
+            response = await returning(query, 'id').execute()
+            for (index, _), row in zip(batch, response.data):
+                results[index] = {"index": index, "id": row['id'], "status": "created"}
+        except Exception:
+            logger.exception("Error in bulk scholarship insert")
+            for index, _ in batch:
+                results[index] = _row_error(index, "Error al crear beca")
+
+    await invalidate_scholarship_scopes([data for _, data in pending])
+    return bulk_report(results)
+
+@router.put(path= "/scholarships/bulk")
+async def bulk_update_scholarships(
+    request: Request,
+    profile: dict = Depends(get_current_user_profile)
+):
+    """
+    Actualiza becas en lote (JSON o CSV, cada fila con su "id").
+    Las filas con los mismos cambios se escriben juntas con un UPDATE ... in_('id') por lote
+    que solo envía esas columnas y lleva el chequeo de campus en la misma escritura: nunca
+    inserta filas ni pisa columnas que no se enviaron. Devuelve un reporte por fila.
+    """
+    verify_admin_or_campus_admin(profile)
+
+    if not supabase_admin:
+        raise HTTPException(status_code=503, detail="Falta Service Key")
+
+    rows = await parse_bulk_payload(request)
+    results = [None] * len(rows)
+    groups = {}  # cambios serializados -> (cambios, [(índice, id)])
+    seen_ids = set()
+
+    for index, raw in enumerate(rows):
+        try:
+            item = ScholarshipBulkUpdateItem(**raw)
+        except ValidationError as e:
+            results[index] = _row_error(index, _validation_message(e), raw.get('id'))
+            continue
+
+        scholarship_id = normalize_scholarship_id(item.id)
+        if scholarship_id is None:
+            results[index] = _row_error(index, "Id de beca inválido", item.id)
+            continue
+
+        # Dos cambios a la misma beca en una petición serían ambiguos
+        if scholarship_id in seen_ids:
+            results[index] = _row_error(index, "Id duplicado en la petición", scholarship_id)
+            continue
+        seen_ids.add(scholarship_id)
+
+        changes = serialize_dates({k: v for k, v in item.dict().items() if v is not None and k != 'id'})
+        if not changes:
+            results[index] = _row_error(index, "No se enviaron datos", scholarship_id)
+            continue
+
+        # El campus destino se valida aquí; el campus actual, en el propio UPDATE
+        if 'university_center_id' in changes:
+            ownership_error = campus_ownership_error(profile, changes['university_center_id'])
+            if ownership_error:
+                results[index] = _row_error(index, ownership_error, scholarship_id)
+                continue
+
+        group_key = json.dumps(changes, sort_keys=True)
+        groups.setdefault(group_key, (changes, []))[1].append((index, scholarship_id))
+
+    semaphore = asyncio.Semaphore(BULK_UPDATE_CONCURRENCY)
+    updated_rows = []
+    unmatched = []  # (índice, id) que el UPDATE no tocó: no existen o son de otro campus
+    scope_changed = False
+
+    async def update_batch(changes: dict, batch: list):
+        nonlocal scope_changed
+        query = supabase_admin.table('scholarships').update(changes).in_('id', [scholarship_id for _, scholarship_id in batch])
+        query = returning(apply_campus_guard(query, profile), 'id, university_center_id, scholarship_type_id')
+        async with semaphore:
+            try:
+                response = await query.execute()
+            except Exception:
+                logger.exception("Error in bulk scholarship update")
+                for index, scholarship_id in batch:
+                    results[index] = _row_error(index, "Error al actualizar beca", scholarship_id)
+                return
+
+        updated = {row['id'] for row in response.data}
+        updated_rows.extend(response.data)
+        if updated and ('university_center_id' in changes or 'scholarship_type_id' in changes):
+            scope_changed = True
+        for index, scholarship_id in batch:
+            if scholarship_id in updated:
+                results[index] = {"index": index, "id": scholarship_id, "status": "updated"}
+            else:
+                unmatched.append((index, scholarship_id))
+
+    await asyncio.gather(*(
+        update_batch(changes, batch)
+        for changes, items in groups.values()
+        for batch in chunked(items)
+    ))
+    await report_unmatched(results, unmatched, profile, "Error al actualizar beca")
+
+    # Si cambió el campus o el tipo no sabemos los anteriores: se limpia todo el listado
+    if scope_changed:
+        await clear_scholarship_cache()
+    else:
+        await invalidate_scholarship_scopes(updated_rows)
+    return bulk_report(results)
+
+@router.delete(path= "/scholarships/bulk")
+async def bulk_delete_scholarships(
+    payload: ScholarshipBulkDelete,
+    profile: dict = Depends(get_current_user_profile)
+):
+    """Elimina becas en lote. Reporta por id: eliminada, no encontrada, inválida o sin permiso."""
+    verify_admin_or_campus_admin(profile)
+
+    if not supabase_admin:
+        raise HTTPException(status_code=503, detail="Falta Service Key")
+    if not payload.ids:
+        raise HTTPException(status_code=400, detail="No se enviaron datos")
+    if len(payload.ids) > BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Máximo {BULK_MAX_ROWS} becas por petición")
+
+    results = [None] * len(payload.ids)
+    requested = []  # (índice, id canónico)
+    for index, raw_id in enumerate(payload.ids):
+        scholarship_id = normalize_scholarship_id(raw_id)
+        if scholarship_id is None:
+            results[index] = _row_error(index, "Id de beca inválido", raw_id)
+        else:
+            requested.append((index, scholarship_id))
+
+    try:
+        existing = await fetch_existing_scholarships(
+            [scholarship_id for _, scholarship_id in requested], columns='id, university_center_id'
+        )
+    except Exception:
+        logger.exception("Error fetching scholarships for bulk delete")
+        raise HTTPException(status_code=400, detail="Error al eliminar becas")
+
+    pending = []  # (índice, id)
+    for index, scholarship_id in requested:
+        current = existing.get(scholarship_id)
+        if not current:
+            results[index] = _row_error(index, "Beca no encontrada", scholarship_id)
+            continue
+        ownership_error = campus_ownership_error(profile, current['university_center_id'])
+        if ownership_error:
+            results[index] = _row_error(index, ownership_error, scholarship_id)
+            continue
+        pending.append((index, scholarship_id))
+
+    for batch in chunked(pending):
+        try:
+            query = supabase_admin.table('scholarships').delete().in_('id', [scholarship_id for _, scholarship_id in batch])
+            response = await returning(apply_campus_guard(query, profile), 'id').execute()
+            deleted = {row['id'] for row in response.data}
+            for index, scholarship_id in batch:
+                if scholarship_id in deleted:
+                    results[index] = {"index": index, "id": scholarship_id, "status": "deleted"}
+                else:
+                    results[index] = _row_error(index, "Beca no encontrada (ya eliminada?)", scholarship_id)
+        except Exception:
+            logger.exception("Error in bulk scholarship delete")
+            for index, scholarship_id in batch:
+                results[index] = _row_error(index, "Error al eliminar beca", scholarship_id)
+
+    await invalidate_scholarship_scopes([existing[scholarship_id] for _, scholarship_id in pending])
+    return bulk_report(results)
+
 # 2. ACTUALIZAR BECA (Update) - Admin
 @router.put(path= "/scholarships/{scholarship_id}")
 async def update_scholarship(
@@ -117,19 +507,6 @@ async def update_scholarship(
         raise HTTPException(status_code=503, detail="Falta Service Key")
 
     try:
-        # Primero verificar que la beca existe y obtener su campus
-        existing = supabase_admin.table('scholarships')\
-            .select('university_center_id')\
-            .eq('id', scholarship_id)\
-            .single()\
-            .execute()
-        
-        if not existing.data:
-            raise HTTPException(status_code=404, detail="Beca no encontrada")
-        
-        # Verificar permisos de campus
-        verify_campus_ownership(profile, existing.data['university_center_id'])
-        
         # Si se está cambiando el campus, verificar permisos para el nuevo campus
         if scholarship.university_center_id:
             verify_campus_ownership(profile, scholarship.university_center_id)
@@ -146,15 +523,23 @@ async def update_scholarship(
         if 'application_end_date' in update_data:
             update_data['application_end_date'] = update_data['application_end_date'].isoformat()
 
-        response = supabase_admin.table('scholarships').update(update_data).eq('id', scholarship_id).execute()
+        # El permiso sobre el campus actual va en el mismo UPDATE (un solo round trip)
+        query = supabase_admin.table('scholarships').update(update_data).eq('id', scholarship_id)
+        response = await returning(apply_campus_guard(query, profile), SCHOLARSHIP_COLUMNS).execute()
         if not response.data:
-            raise HTTPException(status_code=404, detail="Beca no encontrada")
+            await raise_missing_or_forbidden(scholarship_id)
+
+        # Si cambió el campus o el tipo no sabemos los anteriores: se limpia todo el listado
+        if 'university_center_id' in update_data or 'scholarship_type_id' in update_data:
+            await clear_scholarship_cache()
+        else:
+            await invalidate_scholarship_scopes(response.data)
         return {"status": "success", "message": "Beca actualizada", "data": response.data}
         
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Error updating scholarship: {str(e)}")
+    except Exception:
+        logger.exception("Error updating scholarship")
         raise HTTPException(status_code=400, detail="Error al actualizar beca")
 
 # 3. ELIMINAR BECA (Delete) - Admin
@@ -170,26 +555,35 @@ async def delete_scholarship(
         raise HTTPException(status_code=503, detail="Falta Service Key")
 
     try:
-        # Verificar que la beca existe y obtener su campus para validar permisos
-        existing = supabase_admin.table('scholarships')\
-            .select('university_center_id')\
-            .eq('id', scholarship_id)\
-            .single()\
-            .execute()
-        
-        if not existing.data:
-            raise HTTPException(status_code=404, detail="Beca no encontrada")
-        
-        # Verificar permisos de campus
-        verify_campus_ownership(profile, existing.data['university_center_id'])
-        
-        response = supabase_admin.table('scholarships').delete().eq('id', scholarship_id).execute()
+        # El permiso de campus va en el mismo DELETE (un solo round trip)
+        query = supabase_admin.table('scholarships').delete().eq('id', scholarship_id)
+        response = await returning(apply_campus_guard(query, profile), SCHOLARSHIP_COLUMNS).execute()
         if not response.data:
-            raise HTTPException(status_code=404, detail="Beca no encontrada (ya eliminada?)")
+            await raise_missing_or_forbidden(scholarship_id, "Beca no encontrada (ya eliminada?)")
+        await invalidate_scholarship_scopes(response.data)
         return {"status": "success", "message": "Beca eliminada", "data": response.data}
         
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Error deleting scholarship: {str(e)}")
-        raise HTTPException(status_code=400, detail="Error al eliminar beca")
\ No newline at end of file
+    except Exception:
+        logger.exception("Error deleting scholarship")
+        raise HTTPException(status_code=400, detail="Error al eliminar beca")
+
+# 4. SINCRONIZAR ESTADOS POR FECHAS - Super Admin
+@router.post(path= "/admin/scholarships/sync-status")
+async def sync_status(profile: dict = Depends(get_current_user_profile)):
+    """
+    Abre/cierra ya las becas cuya ventana de fechas cambió, sin esperar a pg_cron
+    ni al bucle de STATUS_SYNC_INTERVAL. Solo Super Admin.
+    """
+    verify_super_admin(profile)
+
+    if not supabase_admin:
+        raise HTTPException(status_code=503, detail="Falta Service Key")
+
+    try:
+        result = await sync_scholarship_status()
+        return {"status": "success", **result}
+    except Exception:
+        logger.exception("Error syncing scholarship status")
+        raise HTTPException(status_code=500, detail="Error al sincronizar estados de becas")
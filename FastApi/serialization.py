@@ -0,0 +1,58 @@
+import json
+import os
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 'orjson' (si está instalado) o 'json' para volver al encoder de la librería estándar
+JSON_RENDERER = os.environ.get("JSON_RENDERER", "orjson").lower()
+USE_ORJSON = JSON_RENDERER == "orjson" and orjson is not None
+
+# Clase de respuesta por defecto de la app (ver main.py)
+DefaultJSONResponse = ORJSONResponse if USE_ORJSON else JSONResponse
+
+
+class RawJSONResponse(Response):
+    """Cuerpo JSON ya codificado: no pasa por jsonable_encoder ni por otro json.dumps."""
+    media_type = "application/json"
+
+
+def dumps(obj) -> bytes:
+    """Codifica a JSON compacto en UTF-8 (fechas y UUID como texto)."""
+    if USE_ORJSON:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=str).encode()
+
+
+def envelope_with_raw_data(raw_data: bytes, meta: dict) -> bytes:
+    """
+    Arma {"status": "success", "data": <raw_data>, **meta} sin decodificar las filas.
+
+    raw_data es el arreglo JSON tal como lo devolvió PostgREST; solo se codifican
+    los pocos campos de meta.
+    """
+    body = b'{"status":"success","data":' + raw_data
+    if meta:
+        body += b',' + dumps(meta)[1:]
+    else:
+        body += b'}'
+    return body
+
+
+def parse_content_range(header: str) -> tuple:
+    """
+    Interpreta el Content-Range de PostgREST ("0-99/1234", "*/0", "0-24/*").
+
+    Returns:
+        (filas en la página, total o None si no se pidió conteo)
+    """
+    page_range, _, total = (header or '*/*').partition('/')
+    if page_range == '*':
+        rows = 0
+    else:
+        first, _, last = page_range.partition('-')
+        rows = int(last) - int(first) + 1
+    return rows, (None if total in ('', '*') else int(total))
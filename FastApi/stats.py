@@ -0,0 +1,185 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import asyncio
+from database import supabase_admin
+from auth_utils import get_current_user_profile
+from scholarships import parse_uuid_param
+from scholarships_crud import resolve_campus_scope, verify_super_admin
+from response_cache import response_cache, cache_key
+from serialization import RawJSONResponse, dumps
+from logging_utils import get_logger
+
+router = APIRouter()
+logger = get_logger("stats")
+
+# Mismo criterio de "abierta" que el índice parcial de próximos cierres
+OPEN_STATUSES = ['Abierta', 'active']
+# Zona con la que stats_applications_daily agrupa por día
+STATS_TIMEZONE = ZoneInfo('America/Mexico_City')
+TOP_SCHOLARSHIPS = 10
+MAX_DEADLINES = 20
+STATS_TAG = 'stats'
+
+# --- AGREGACIÓN ---
+
+def count_by(rows: list, key: str, value: str) -> list:
+    """Suma `value` agrupando por `key`; devuelve [{key, value}] de mayor a menor."""
+    totals = {}
+    for row in rows:
+        totals[row.get(key)] = totals.get(row.get(key), 0) + row[value]
+    return [
+        {key: group, value: total}
+        for group, total in sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    ]
+
+def scoped(query, campus: Optional[str]):
+    return query.eq('university_center_id', campus) if campus else query
+
+async def load_stats(campus: Optional[str], days: int, deadline_days: int) -> dict:
+    """
+    Lee las vistas materializadas de la migración dashboard_stats (filas ya agregadas)
+    y los próximos cierres, todo en paralelo.
+    """
+    now = datetime.now(timezone.utc)
+    since = now.astimezone(STATS_TIMEZONE).date() - timedelta(days=days - 1)
+
+    scholarships, applications, daily, top, deadlines, refresh_log = await asyncio.gather(
+        scoped(supabase_admin.table('stats_scholarships_summary')
+               .select('university_center_id, scholarship_type_id, status, scholarships'), campus).execute(),
+        scoped(supabase_admin.table('stats_applications_summary')
+               .select('university_center_id, status, applications'), campus).execute(),
+        scoped(supabase_admin.table('stats_applications_daily')
+               .select('day, university_center_id, applications')
+               .gte('day', since.isoformat()), campus).execute(),
+        scoped(supabase_admin.table('stats_applications_by_scholarship')
+               .select('scholarship_id, title, university_center_id, applications, last_submitted_at'), campus)
+               .order('applications', desc=True).limit(TOP_SCHOLARSHIPS).execute(),
+        # Los cierres dependen de la hora actual: se leen en vivo (índice parcial por fecha de cierre)
+        scoped(supabase_admin.table('scholarships')
+               .select('id, title, university_center_id, application_end_date')
+               .in_('status', OPEN_STATUSES)
+               .gte('application_end_date', now.isoformat())
+               .lte('application_end_date', (now + timedelta(days=deadline_days)).isoformat()), campus)
+               .order('application_end_date').limit(MAX_DEADLINES).execute(),
+        supabase_admin.table('stats_refresh_log').select('refreshed_at').limit(1).execute(),
+    )
+
+    by_day = {row['day']: 0 for row in daily.data}
+    for row in daily.data:
+        by_day[row['day']] += row['applications']
+
+    return {
+        "university_center_id": campus,
+        "refreshed_at": refresh_log.data[0]['refreshed_at'] if refresh_log.data else None,
+        "scholarships": {
+            "total": sum(row['scholarships'] for row in scholarships.data),
+            "by_status": count_by(scholarships.data, 'status', 'scholarships'),
+            "by_campus": count_by(scholarships.data, 'university_center_id', 'scholarships'),
+            "by_type": count_by(scholarships.data, 'scholarship_type_id', 'scholarships'),
+        },
+        "applications": {
+            "total": sum(row['applications'] for row in applications.data),
+            "by_status": count_by(applications.data, 'status', 'applications'),
+            "by_day": [{"day": day, "applications": total} for day, total in sorted(by_day.items())],
+            "top_scholarships": top.data,
+        },
+        "upcoming_deadlines": deadlines.data,
+    }
+
+# --- RUTAS ---
+
+@router.get(path= "/stats")
+async def get_stats(
+    university_center_id: Optional[str] = Query(None, description="Campus (solo super admin; un campus_admin ve el suyo)"),
+    days: int = Query(30, ge=1, le=365, description="Días de historial de solicitudes por día"),
+    deadline_days: int = Query(7, ge=1, le=90, description="Ventana de próximos cierres en días"),
+    profile: dict = Depends(get_current_user_profile)
+):
+    """
+    Estadísticas del panel: becas por estado, campus y tipo; solicitudes por estado, por día
+    y por beca; y becas abiertas por cerrar.
+
+    Los conteos vienen de vistas materializadas (ver refreshed_at), así que el costo no crece
+    con el número de solicitudes. Un campus_admin solo ve su campus.
+    """
+    campus = resolve_campus_scope(profile, university_center_id)
+
+    if not supabase_admin:
+        raise HTTPException(status_code=503, detail="BD no disponible")
+
+    async def fetch() -> str:
+        return dumps({"status": "success", "data": await load_stats(campus, days, deadline_days)}).decode()
+
+    try:
+        key = cache_key('stats', {'campus': campus, 'days': days, 'deadline_days': deadline_days})
+        body = await response_cache.get_or_fetch(key, fetch, [STATS_TAG])
+        return RawJSONResponse(body)
+    except Exception:
+        logger.exception("Error loading stats")
+        raise HTTPException(status_code=500, detail="Error al obtener estadísticas")
+
+@router.get(path= "/stats/scholarships")
+async def get_scholarship_application_counts(
+    university_center_id: Optional[str] = Query(None, description="Campus (solo super admin; un campus_admin ve el suyo)"),
+    scholarship_id: Optional[str] = Query(None, description="Solo esta beca"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    profile: dict = Depends(get_current_user_profile)
+):
+    """
+    Solicitudes por beca, de todas las becas (top_scholarships de /stats solo trae las primeras),
+    de mayor a menor y paginadas. Sale de la misma vista materializada, así que tiene el mismo
+    refreshed_at; las becas sin solicitudes no aparecen.
+    """
+    university_center_id = parse_uuid_param(university_center_id, 'university_center_id')
+    scholarship_id = parse_uuid_param(scholarship_id, 'scholarship_id')
+    campus = resolve_campus_scope(profile, university_center_id)
+
+    if not supabase_admin:
+        raise HTTPException(status_code=503, detail="BD no disponible")
+
+    async def fetch() -> str:
+        query = scoped(supabase_admin.table('stats_applications_by_scholarship')
+                       .select('scholarship_id, title, university_center_id, applications, last_submitted_at',
+                               count='exact'), campus)
+        if scholarship_id:
+            query = query.eq('scholarship_id', scholarship_id)
+        response = await query.order('applications', desc=True).order('scholarship_id')\
+            .range(offset, offset + limit - 1).execute()
+        return dumps({
+            "status": "success",
+            "data": response.data,
+            "count": len(response.data),
+            "total": response.count,
+            "limit": limit,
+            "offset": offset
+        }).decode()
+
+    try:
+        key = cache_key('stats_scholarships', {
+            'campus': campus, 'scholarship_id': scholarship_id, 'limit': limit, 'offset': offset
+        })
+        body = await response_cache.get_or_fetch(key, fetch, [STATS_TAG])
+        return RawJSONResponse(body)
+    except Exception:
+        logger.exception("Error loading scholarship application counts")
+        raise HTTPException(status_code=500, detail="Error al obtener estadísticas")
+
+@router.post(path= "/admin/stats/refresh")
+async def refresh_stats(profile: dict = Depends(get_current_user_profile)):
+    """Recalcula las vistas materializadas de estadísticas (solo Super Admin)."""
+    verify_super_admin(profile)
+
+    if not supabase_admin:
+        raise HTTPException(status_code=503, detail="BD no disponible")
+
+    try:
+        response = await supabase_admin.rpc('refresh_dashboard_stats', {}).execute()
+    except Exception:
+        logger.exception("Error refreshing stats")
+        raise HTTPException(status_code=500, detail="Error al actualizar estadísticas")
+
+    await response_cache.invalidate([STATS_TAG])
+    return {"status": "success", "refreshed_at": response.data}
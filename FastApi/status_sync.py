@@ -0,0 +1,85 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from database import supabase_admin
+from response_cache import invalidate_scholarship_scopes, RESPONSE_CACHE_BACKEND
+from logging_utils import get_logger
+
+logger = get_logger("status_sync")
+
+# Segundos entre sincronizaciones dentro de la API; 0 = desactivado (lo hace pg_cron).
+# Útil en despliegues sin pg_cron o para invalidar la caché de listados en cuanto cambia un estado.
+STATUS_SYNC_INTERVAL = float(os.environ.get("STATUS_SYNC_INTERVAL", "0"))
+STATUS_SYNC_BATCH_SIZE = int(os.environ.get("STATUS_SYNC_BATCH_SIZE", "1000"))
+
+
+async def sync_scholarship_status(batch_size: int = STATUS_SYNC_BATCH_SIZE) -> dict:
+    """
+    Abre/cierra las becas cuya ventana de fechas cambió (función sync_scholarship_status de
+    la migración scholarship_status_sync). Cada llamada es un UPDATE de hasta batch_size filas;
+    se repite mientras llegue un lote completo. Invalida los listados en caché afectados.
+    """
+    opened, closed = 0, 0
+    while True:
+        response = await supabase_admin.rpc('sync_scholarship_status', {'p_batch_size': batch_size}).execute()
+        rows = response.data or []
+        if rows:
+            await invalidate_scholarship_scopes(rows)
+        for row in rows:
+            if row['status'] == 'Abierta':
+                opened += 1
+            else:
+                closed += 1
+        if len(rows) < batch_size:
+            break
+
+    if opened or closed:
+        logger.info("Estados de becas sincronizados", extra={"opened": opened, "closed": closed})
+    return {"opened": opened, "closed": closed}
+
+
+async def invalidate_crossed_windows(since: datetime, until: datetime):
+    """
+    Invalida en este worker los listados con becas cuya fecha de apertura o cierre cayó en
+    (since, until].
+
+    Con la caché en memoria cada worker tiene la suya y sync_scholarship_status solo invalida
+    la del worker que cambió las filas; así el resto (y los cambios que hizo pg_cron o
+    POST /admin/scholarships/sync-status en otro worker) también se enteran.
+    """
+    def crossed(column: str) -> str:
+        return f'and({column}.gt."{since.isoformat()}",{column}.lte."{until.isoformat()}")'
+
+    response = await supabase_admin.table('scholarships') \
+        .select('id, university_center_id, scholarship_type_id') \
+        .or_(f"{crossed('application_start_date')},{crossed('application_end_date')}") \
+        .execute()
+    if response.data:
+        await invalidate_scholarship_scopes(response.data)
+
+
+async def run_status_scheduler(interval: float = STATUS_SYNC_INTERVAL):
+    """
+    Bucle de fondo para el lifespan (corre en cada worker): un error no detiene las siguientes
+    ejecuciones. Con RESPONSE_CACHE_BACKEND=redis la invalidación ya es compartida; en memoria
+    cada vuelta además invalida las becas que cruzaron una fecha en los dos últimos intervalos
+    (el segundo cubre las que otro worker tenía bloqueadas en la vuelta anterior).
+    """
+    previous_run = None
+    while True:
+        started = datetime.now(timezone.utc)
+        try:
+            await sync_scholarship_status()
+            if previous_run is not None and RESPONSE_CACHE_BACKEND == "memory":
+                await invalidate_crossed_windows(previous_run - timedelta(seconds=interval), started)
+        except Exception as e:
+            logger.error("Error al sincronizar estados de becas", extra={"error": str(e)})
+        previous_run = started
+        await asyncio.sleep(interval)
+
+
+def start_status_scheduler():
+    """Crea la tarea del bucle si STATUS_SYNC_INTERVAL > 0 y hay Service Key; si no, None."""
+    if STATUS_SYNC_INTERVAL <= 0 or not supabase_admin:
+        return None
+    return asyncio.create_task(run_status_scheduler(STATUS_SYNC_INTERVAL))
@@ -0,0 +1,115 @@
+"""
+Fixtures comunes: la API corre en proceso contra el Supabase falso de
+benchmarks/fake_supabase.py (PostgREST + GoTrue en memoria), sin red ni proyecto real.
+
+Cada prueba recibe datos nuevos y cachés vacías.
+"""
+import os
+import sys
+
+import httpx
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.join(APP_DIR, "benchmarks"))
+
+from fake_supabase import DEFAULT_JWT_SECRET, FakeSupabase, Store, seed  # noqa: E402
+
+# Antes de importar la app: los módulos leen su configuración al importarse
+os.environ.update({
+    "SUPABASE_URL": "http://fake-supabase",
+    "SUPABASE_ANON_KEY": "anon",
+    "SUPABASE_SERVICE_KEY": "service",
+    "SUPABASE_JWT_SECRET": DEFAULT_JWT_SECRET,
+    "SUPABASE_CLIENT": "lean",
+    "STATUS_SYNC_INTERVAL": "0",
+    "RESPONSE_CACHE_BACKEND": "memory",
+    "RATE_LIMIT_BACKEND": "memory",
+    "JOBS_BACKEND": "memory",
+})
+os.environ.pop("METRICS_MULTIPROC_DIR", None)
+os.environ.pop("METRICS_TOKEN", None)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import auth_utils  # noqa: E402
+import database  # noqa: E402
+import main  # noqa: E402
+import rate_limit  # noqa: E402
+from catalog import catalog  # noqa: E402
+from metrics import TimedTransport  # noqa: E402
+from response_cache import MemoryBackend, response_cache, row_cache  # noqa: E402
+
+SCHOLARSHIPS = 60
+STUDENTS = 20
+
+
+class FakeBackend:
+    """Supabase falso de una prueba: acceso directo a sus tablas y tokens firmados para cualquier usuario."""
+
+    def __init__(self):
+        self.store = Store()
+        seed(self.store, scholarships=SCHOLARSHIPS, students=STUDENTS, applications_per_student=2)
+        self.supabase = FakeSupabase(self.store, DEFAULT_JWT_SECRET)
+
+    def rows(self, table: str) -> dict:
+        return self.store.tables[table].rows
+
+    def profile(self, email: str) -> dict:
+        return next(row for row in self.rows("profiles").values() if row["email"] == email)
+
+    def scholarships_of(self, campus: str, same: bool = True) -> list:
+        """Becas del campus dado (o, con same=False, de cualquier otro)."""
+        return [
+            row for row in self.rows("scholarships").values()
+            if (row["university_center_id"] == campus) == same
+        ]
+
+    def headers(self, email: str) -> dict:
+        token = self.supabase._session(self.store.users[email])["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+
+def _reset_clients():
+    for client in (database.supabase, database.supabase_admin):
+        client._client = None
+        client._http_client = None
+
+
+@pytest.fixture
+def fake():
+    backend = FakeBackend()
+    # Todas las llamadas a Supabase pasan por el transporte compartido: se apunta a la app falsa
+    _reset_clients()
+    database._http_transport = TimedTransport(httpx.ASGITransport(app=backend.supabase.app()))
+    yield backend
+    _reset_clients()
+    database._http_transport = None
+
+
+@pytest.fixture
+def client(fake, monkeypatch):
+    # Estado por worker que no debe pasar de una prueba a otra
+    for cache in (response_cache, row_cache, auth_utils.profile_cache):
+        monkeypatch.setattr(cache, "backend", MemoryBackend())
+    monkeypatch.setattr(rate_limit.limiter, "backend", rate_limit.MemoryBackend())
+    catalog.invalidate()
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def admin(fake) -> dict:
+    return fake.headers("admin@example.com")
+
+
+@pytest.fixture
+def campus_admin(fake) -> dict:
+    return fake.headers("campus0@example.com")
+
+
+@pytest.fixture
+def student(fake) -> dict:
+    return fake.headers("student0@example.com")
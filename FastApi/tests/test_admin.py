@@ -0,0 +1,78 @@
+import admin_routes
+from catalog import catalog
+
+
+def test_catalog_refresh_picks_up_changes(client, fake, admin):
+    etag = client.get("/scholarship-types").headers["ETag"]
+    next(iter(fake.rows("scholarship_types").values()))["name"] = "Renombrado"
+
+    assert client.get("/scholarship-types").headers["ETag"] == etag  # sigue en caché
+    assert client.post("/admin/catalog/refresh", headers=admin).status_code == 200
+
+    response = client.get("/scholarship-types")
+    assert response.headers["ETag"] != etag
+    assert "Renombrado" in {row["name"] for row in response.json()["data"]}
+
+
+def test_catalog_refresh_reports_failure(client, admin, monkeypatch):
+    async def failing_load(name):
+        raise RuntimeError("Supabase caído")
+
+    monkeypatch.setattr(catalog, "_load", failing_load)
+    response = client.post("/admin/catalog/refresh", headers=admin)
+    assert response.status_code == 503
+
+
+def test_catalog_refresh_requires_super_admin(client, campus_admin):
+    assert client.post("/admin/catalog/refresh", headers=campus_admin).status_code == 403
+
+
+def test_stats_are_scoped_to_campus(client, fake, admin, campus_admin):
+    own = fake.profile("campus0@example.com")["campus"]
+    other = fake.scholarships_of(own, same=False)[0]["university_center_id"]
+
+    assert client.get("/stats", headers=admin).status_code == 200
+    assert client.get("/stats", headers=campus_admin).status_code == 200
+    assert client.get("/stats", headers=campus_admin, params={"university_center_id": other}).status_code == 403
+
+
+def test_users_export_query_error_is_not_a_200(client, admin, monkeypatch):
+    async def failing_chunks(build_query, chunk_size):
+        raise RuntimeError("Supabase caído")
+        yield
+
+    monkeypatch.setattr(admin_routes, "iter_keyset_chunks", failing_chunks)
+    response = client.get("/admin/users", headers=admin, params={"format": "csv"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Error al listar usuarios"
+
+
+def test_users_export_streams_every_profile(client, fake, admin):
+    response = client.get("/admin/users", headers=admin, params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == len(fake.rows("profiles"))
+
+
+def test_scholarship_application_counts_cover_every_scholarship(client, fake, admin, campus_admin):
+    expected = {}
+    for row in fake.rows("applications").values():
+        expected[row["scholarship_id"]] = expected.get(row["scholarship_id"], 0) + 1
+
+    counts = {}
+    offset = 0
+    while True:
+        body = client.get("/stats/scholarships", headers=admin, params={"limit": 7, "offset": offset}).json()
+        counts.update((row["scholarship_id"], row["applications"]) for row in body["data"])
+        offset += 7
+        if offset >= body["total"]:
+            break
+    assert counts == expected
+
+    scholarship_id = next(iter(expected))
+    body = client.get("/stats/scholarships", headers=admin, params={"scholarship_id": scholarship_id}).json()
+    assert [row["applications"] for row in body["data"]] == [expected[scholarship_id]]
+
+    own = fake.profile("campus0@example.com")["campus"]
+    rows = client.get("/stats/scholarships", headers=campus_admin).json()["data"]
+    assert {row["university_center_id"] for row in rows} == {own}
+    assert client.get("/stats/scholarships", headers=admin, params={"scholarship_id": "x"}).status_code == 400
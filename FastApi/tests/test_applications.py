@@ -0,0 +1,44 @@
+import uuid
+
+
+def _open_scholarship(fake) -> dict:
+    return next(row for row in fake.rows("scholarships").values() if row["status"] == "Abierta")
+
+
+def test_submit_is_idempotent(client, fake):
+    headers = fake.headers("student6@example.com")
+    scholarship = _open_scholarship(fake)
+
+    first = client.post("/applications", headers=headers, json={"scholarship_id": scholarship["id"]})
+    again = client.post("/applications", headers=headers, json={"scholarship_id": scholarship["id"]})
+    assert first.status_code == 201
+    assert again.status_code == 200
+    assert again.json()["data"]["id"] == first.json()["data"]["id"]
+
+    mine = client.get("/applications/me", headers=headers).json()["data"]
+    assert [row["scholarship_id"] for row in mine].count(scholarship["id"]) == 1
+
+
+def test_submit_to_missing_or_closed_scholarship(client, fake, student):
+    response = client.post("/applications", headers=student, json={"scholarship_id": str(uuid.uuid4())})
+    assert response.status_code == 404
+
+    closed = next(row for row in fake.rows("scholarships").values() if row["status"] == "Cerrada")
+    response = client.post("/applications", headers=student, json={"scholarship_id": closed["id"]})
+    assert response.status_code == 409
+
+
+def test_scholarship_applications_respect_campus(client, fake, campus_admin, student):
+    own = fake.profile("campus0@example.com")["campus"]
+    mine = fake.scholarships_of(own)[0]
+    other = fake.scholarships_of(own, same=False)[0]
+    path = "/admin/scholarships/{}/applications"
+
+    response = client.get(path.format(mine["id"]), headers=campus_admin)
+    assert response.status_code == 200
+    expected = [row for row in fake.rows("applications").values() if row["scholarship_id"] == mine["id"]]
+    assert response.json()["total"] == len(expected)
+
+    assert client.get(path.format(other["id"]), headers=campus_admin).status_code == 403
+    assert client.get(path.format(mine["id"]), headers=student).status_code == 403
+    assert client.get(path.format(str(uuid.uuid4())), headers=campus_admin).status_code == 404
@@ -0,0 +1,91 @@
+import base64
+import json
+import time
+import uuid
+
+import jwt
+
+import auth_utils
+from fake_supabase import DEFAULT_JWT_SECRET, PASSWORD
+
+
+def test_missing_token_is_rejected(client):
+    response = client.get("/admin/users")
+    assert response.status_code == 401
+
+
+def test_invalid_and_expired_tokens_are_rejected(client, fake):
+    user_id = fake.profile("admin@example.com")["id"]
+    expired = jwt.encode(
+        {"sub": user_id, "aud": "authenticated", "exp": int(time.time()) - 3600},
+        DEFAULT_JWT_SECRET, algorithm="HS256"
+    )
+    forged = jwt.encode(
+        {"sub": user_id, "aud": "authenticated", "exp": int(time.time()) + 3600},
+        "otro-secreto-de-al-menos-32-bytes-de-largo", algorithm="HS256"
+    )
+    for token in ("basura", expired, forged):
+        response = client.get("/admin/users", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401
+
+
+def test_roles_are_enforced(client, admin, campus_admin, student):
+    assert client.get("/admin/users", headers=admin).status_code == 200
+    assert client.get("/admin/users", headers=campus_admin).status_code == 403
+    assert client.get("/admin/users", headers=student).status_code == 403
+
+
+def test_role_change_invalidates_cached_profile(client, fake, admin):
+    headers = fake.headers("student1@example.com")
+    user_id = fake.profile("student1@example.com")["id"]
+    assert client.get("/admin/users", headers=headers).status_code == 403  # perfil ya en caché
+
+    response = client.put(f"/admin/users/{user_id}", headers=admin, json={"role": "admin"})
+    assert response.status_code == 200
+    assert client.get("/admin/users", headers=headers).status_code == 200
+
+
+def test_deleted_user_loses_access(client, fake, admin):
+    headers = fake.headers("student2@example.com")
+    user_id = fake.profile("student2@example.com")["id"]
+    assert client.get("/applications/me", headers=headers).status_code == 200
+
+    assert client.delete(f"/admin/users/{user_id}", headers=admin).status_code == 200
+    assert client.get("/applications/me", headers=headers).status_code == 401
+
+
+def test_login_returns_a_session_usable_by_the_api(client):
+    response = client.post("/login", json={"email": "student3@example.com", "password": PASSWORD})
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+    assert client.get("/applications/me", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+
+def test_wrong_password_is_rejected(client):
+    response = client.post("/login", json={"email": "student3@example.com", "password": "incorrecta"})
+    assert response.status_code == 401
+
+
+def _unsigned_token(header: dict) -> str:
+    segments = [header, {"sub": str(uuid.uuid4()), "aud": "authenticated", "exp": int(time.time()) + 3600}]
+    encoded = [base64.urlsafe_b64encode(json.dumps(part).encode()).decode().rstrip("=") for part in segments]
+    return ".".join(encoded + ["c2lnbmF0dXJl"])
+
+
+def test_unknown_kids_do_not_refetch_jwks_every_request(client, monkeypatch):
+    fetches = []
+
+    class FakeJWKSClient:
+        def get_signing_keys(self, refresh=False):
+            fetches.append(refresh)
+            return []
+
+    monkeypatch.setattr(auth_utils, "_jwks_client", FakeJWKSClient())
+    monkeypatch.setattr(auth_utils, "_jwks_refreshed_at", float("-inf"))
+    monkeypatch.setattr(auth_utils, "_jwks_refresh", None)
+
+    for _ in range(20):
+        token = _unsigned_token({"alg": "RS256", "typ": "JWT", "kid": str(uuid.uuid4())})
+        response = client.get("/applications/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401
+    assert len(fetches) == 1
@@ -0,0 +1,37 @@
+import csv
+import io
+
+import export_routes
+
+
+def test_export_streams_every_row(client, fake, admin):
+    response = client.get("/export/scholarships", headers=admin, params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text.lstrip("\ufeff"))))
+    assert {row["id"] for row in rows} == set(fake.rows("scholarships"))
+
+
+def test_export_rejects_invalid_filters(client, admin):
+    for path, param in (
+        ("/export/scholarships", "university_center_id"),
+        ("/export/scholarships", "scholarship_type_id"),
+        ("/export/applications", "scholarship_id"),
+    ):
+        response = client.get(path, headers=admin, params={param: "no-es-uuid"})
+        assert response.status_code == 400
+
+
+def test_export_query_error_is_not_a_200(client, admin, monkeypatch):
+    async def failing_chunks(build_query, chunk_size):
+        raise RuntimeError("Supabase caído")
+        yield
+
+    monkeypatch.setattr(export_routes, "iter_keyset_chunks", failing_chunks)
+    assert client.get("/export/scholarships", headers=admin).status_code == 500
+    assert client.get("/export/applications", headers=admin).status_code == 500
+
+
+def test_empty_export_still_has_header(client, admin):
+    response = client.get("/export/applications", headers=admin, params={"status": "inexistente"})
+    assert response.status_code == 200
+    assert response.text.lstrip("\ufeff").startswith("id,scholarship_id")
@@ -0,0 +1,22 @@
+from metrics import MetricsRegistry
+
+
+def test_snapshots_from_several_workers_add_up():
+    workers = [MetricsRegistry() for _ in range(3)]
+    for i, worker in enumerate(workers):
+        for _ in range(i + 1):
+            worker.observe("http_request_duration_seconds", 0.02, method="GET", route="/scholarships")
+
+    combined = MetricsRegistry()
+    for worker in workers:
+        combined.merge(worker.snapshot())
+
+    output = combined.render()
+    assert 'http_request_duration_seconds_count{method="GET",route="/scholarships"} 6' in output
+
+
+def test_metrics_endpoint_renders_request_histograms(client):
+    client.get("/scholarships")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "http_request_duration_seconds_bucket" in response.text
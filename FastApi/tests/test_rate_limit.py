@@ -0,0 +1,48 @@
+from starlette.requests import Request
+
+import rate_limit
+from fake_supabase import PASSWORD
+
+
+def _request(forwarded_for: str = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "headers": headers, "client": ("10.0.0.1", 1234)})
+
+
+def test_per_email_limit(client):
+    credentials = {"email": "student4@example.com", "password": PASSWORD}
+    statuses = [client.post("/login", json=credentials).status_code for _ in range(6)]
+    assert statuses == [200] * 5 + [429]
+
+
+def test_spoofed_forwarded_for_does_not_bypass_ip_limit(client):
+    statuses = [
+        client.post(
+            "/login",
+            json={"email": f"nadie{i}@example.com", "password": "x"},
+            headers={"X-Forwarded-For": f"203.0.113.{i}"},
+        ).status_code
+        for i in range(21)
+    ]
+    assert statuses[:20] == [401] * 20
+    assert statuses[20] == 429
+
+
+def test_failed_logins_back_off(client):
+    credentials = {"email": "student5@example.com", "password": "incorrecta"}
+    statuses = [client.post("/login", json=credentials).status_code for _ in range(4)]
+    assert statuses == [401] * 4
+
+    response = client.post("/login", json={"email": "student5@example.com", "password": PASSWORD})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_client_ip_ignores_forwarded_for_by_default():
+    assert rate_limit.client_ip(_request("198.51.100.7")) == "10.0.0.1"
+
+
+def test_trusted_forwarded_for_uses_the_proxy_hop(monkeypatch):
+    monkeypatch.setattr(rate_limit, "TRUST_FORWARDED_FOR", True)
+    # El primer valor lo escribió el cliente; el último, el proxy
+    assert rate_limit.client_ip(_request("1.2.3.4, 198.51.100.7")) == "198.51.100.7"
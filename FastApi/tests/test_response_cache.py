@@ -0,0 +1,97 @@
+import asyncio
+
+from response_cache import MemoryBackend, ResponseCache
+
+
+def test_tag_index_is_bounded_by_maxsize():
+    async def scenario():
+        backend = MemoryBackend(maxsize=10)
+        for i in range(1000):
+            await backend.set(f"k{i}", {"value": i}, ttl=60, tags=[f"t{i}"])
+        assert len(list(backend._entries.items())) == 10
+
+        await backend.invalidate_tags(["t999", "t0"])
+        assert await backend.get("k999") is None
+        assert await backend.get("k998") == {"value": 998}
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_misses_share_one_fetch():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "body"
+
+    async def scenario():
+        cache = ResponseCache(MemoryBackend())
+        results = await asyncio.gather(*(cache.get_or_fetch("k", fetch, ["t"]) for _ in range(5)))
+        assert results == ["body"] * 5
+
+    asyncio.run(scenario())
+    assert calls == 1
+
+
+def test_fetch_started_before_invalidation_is_not_shared_or_stored():
+    async def scenario():
+        cache = ResponseCache(MemoryBackend())
+        release = asyncio.Event()
+
+        async def old_fetch():
+            await release.wait()
+            return "viejo"
+
+        async def new_fetch():
+            return "nuevo"
+
+        before = asyncio.ensure_future(cache.get_or_fetch("k", old_fetch, ["t"]))
+        await asyncio.sleep(0)
+        await cache.invalidate(["t"])
+
+        # Una petición posterior a la escritura no se une a la consulta anterior
+        assert await cache.get_or_fetch("k", new_fetch, ["t"]) == "nuevo"
+        release.set()
+        assert await before == "viejo"
+        assert await cache.get_or_fetch("k", old_fetch, ["t"]) == "nuevo"
+
+    asyncio.run(scenario())
+
+
+def test_stale_entry_is_served_while_revalidating():
+    async def scenario():
+        cache = ResponseCache(MemoryBackend(), ttl=0, stale_ttl=60)
+        assert await cache.get_or_fetch("k", lambda: asyncio.sleep(0, "v1"), []) == "v1"
+        assert await cache.get_or_fetch("k", lambda: asyncio.sleep(0, "v2"), []) == "v1"
+        await asyncio.gather(*cache.pending_tasks())
+        assert (await cache.backend.get("k"))["value"] == "v2"
+
+    asyncio.run(scenario())
+
+
+def test_redis_backends_share_one_client(monkeypatch):
+    import database
+    import provisioning
+    import rate_limit
+    import response_cache
+
+    class FakeRedis:
+        closed = False
+
+        def register_script(self, script):
+            return script
+
+        async def aclose(self):
+            self.closed = True
+
+    client = FakeRedis()
+    monkeypatch.setattr(database, "_redis", client)
+
+    assert response_cache.RedisBackend()._redis is client
+    assert rate_limit.RedisBackend()._redis is client
+    assert provisioning.RedisJobStore()._redis is client
+
+    asyncio.run(database.close_clients())
+    assert client.closed
@@ -0,0 +1,155 @@
+from conftest import SCHOLARSHIPS
+
+
+def _scholarship(fake, campus: str = None) -> dict:
+    rows = fake.scholarships_of(campus) if campus else list(fake.rows("scholarships").values())
+    return rows[0]
+
+
+def test_offset_pagination_reports_total(client):
+    response = client.get("/scholarships", params={"limit": 25, "offset": 50})
+    body = response.json()
+    assert response.status_code == 200
+    assert body["total"] == SCHOLARSHIPS
+    assert body["count"] == SCHOLARSHIPS - 50
+    assert "search_vector" not in body["data"][0]
+
+
+def test_cursor_pagination_walks_every_row_once(client, fake):
+    seen = []
+    params = {"pagination": "cursor", "limit": 7, "count": "none"}
+    while True:
+        body = client.get("/scholarships", params=params).json()
+        seen.extend(row["id"] for row in body["data"])
+        if body["next_cursor"] is None:
+            break
+        params = {"cursor": body["next_cursor"], "limit": 7, "count": "none"}
+
+    assert len(seen) == len(set(seen)) == SCHOLARSHIPS
+    assert set(seen) == set(fake.rows("scholarships"))
+
+
+def test_cursor_order_is_newest_first(client):
+    rows = client.get("/scholarships", params={"pagination": "cursor", "limit": 20}).json()["data"]
+    keys = [(row["created_at"], row["id"]) for row in rows]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_invalid_cursor_is_rejected(client):
+    for cursor in ("basura", "W251bGwsIngiXQ"):  # el segundo decodifica a [null,"x"]
+        response = client.get("/scholarships", params={"cursor": cursor})
+        assert response.status_code == 400
+
+
+def test_fields_projection(client):
+    body = client.get("/scholarships", params={"fields": "id,title", "limit": 3}).json()
+    assert all(set(row) == {"id", "title"} for row in body["data"])
+
+    response = client.get("/scholarships", params={"fields": "id,search_vector"})
+    assert response.status_code == 400
+
+
+def test_listing_sees_created_scholarship(client, fake, admin):
+    campus = fake.profile("campus0@example.com")["campus"]
+    params = {"university_center_id": campus, "limit": 1000}
+    before = client.get("/scholarships", params=params).json()["total"]
+
+    template = _scholarship(fake, campus)
+    response = client.post("/scholarships", headers=admin, json={
+        "title": "Beca nueva",
+        "description": "Creada en la prueba",
+        "university_center_id": campus,
+        "scholarship_type_id": template["scholarship_type_id"],
+        "application_start_date": "2026-01-01T00:00:00+00:00",
+        "application_end_date": "2026-12-31T00:00:00+00:00",
+    })
+    assert response.status_code == 200
+    created = response.json()["data"][0]
+    assert "search_vector" not in created
+
+    body = client.get("/scholarships", params=params).json()
+    assert body["total"] == before + 1
+    assert created["id"] in {row["id"] for row in body["data"]}
+
+
+def test_listing_and_batch_see_updated_title(client, fake, admin):
+    scholarship = _scholarship(fake)
+    params = {"university_center_id": scholarship["university_center_id"], "limit": 1000}
+    client.get("/scholarships", params=params)
+    client.post("/scholarships/batch", json={"ids": [scholarship["id"]]})
+
+    response = client.put(f"/scholarships/{scholarship['id']}", headers=admin, json={"title": "Título nuevo"})
+    assert response.status_code == 200
+    assert "search_vector" not in response.json()["data"][0]
+
+    rows = client.get("/scholarships", params=params).json()["data"]
+    assert next(row for row in rows if row["id"] == scholarship["id"])["title"] == "Título nuevo"
+    batch = client.post("/scholarships/batch", json={"ids": [scholarship["id"]]}).json()
+    assert batch["data"][0]["title"] == "Título nuevo"
+
+
+def test_campus_change_clears_old_listing(client, fake, admin):
+    scholarship = _scholarship(fake, fake.profile("campus0@example.com")["campus"])
+    old_campus = scholarship["university_center_id"]
+    new_campus = fake.profile("campus1@example.com")["campus"]
+    client.get("/scholarships", params={"university_center_id": old_campus, "limit": 1000})
+
+    response = client.put(f"/scholarships/{scholarship['id']}", headers=admin, json={"university_center_id": new_campus})
+    assert response.status_code == 200
+
+    rows = client.get("/scholarships", params={"university_center_id": old_campus, "limit": 1000}).json()["data"]
+    assert scholarship["id"] not in {row["id"] for row in rows}
+
+
+def test_listing_drops_deleted_scholarship(client, fake, admin):
+    scholarship = _scholarship(fake)
+    params = {"university_center_id": scholarship["university_center_id"], "limit": 1000}
+    client.get("/scholarships", params=params)
+
+    response = client.delete(f"/scholarships/{scholarship['id']}", headers=admin)
+    assert response.status_code == 200
+    assert "search_vector" not in response.json()["data"][0]
+
+    rows = client.get("/scholarships", params=params).json()["data"]
+    assert scholarship["id"] not in {row["id"] for row in rows}
+    batch = client.post("/scholarships/batch", json={"ids": [scholarship["id"]]}).json()
+    assert batch["missing"] == [scholarship["id"]]
+
+
+def test_batch_keeps_order_and_reports_missing(client, fake):
+    ids = [row["id"] for row in list(fake.rows("scholarships").values())[:3]]
+    unknown = "00000000-0000-0000-0000-000000000000"
+    body = client.post("/scholarships/batch", json={"ids": [ids[2], unknown, ids[0], ids[2]]}).json()
+    assert [row["id"] for row in body["data"]] == [ids[2], ids[0]]
+    assert body["missing"] == [unknown]
+
+    assert client.post("/scholarships/batch", json={"ids": ["no-es-uuid"]}).status_code == 400
+
+
+def test_ranked_search_total_survives_offset_past_the_end(client, fake):
+    title = next(iter(fake.rows("scholarships").values()))["title"]
+    params = {"search": title, "search_mode": "ranked", "limit": 10}
+    total = client.get("/scholarships", params=params).json()["total"]
+    assert total >= 1
+
+    body = client.get("/scholarships", params=params | {"offset": 500}).json()
+    assert body["data"] == []
+    assert body["total"] == total
+
+
+def test_ranked_search_receives_the_raw_term(client, fake):
+    scholarship = next(iter(fake.rows("scholarships").values()))
+    scholarship["title"] = "Beca 100% cubierta_total"
+
+    for term in ("100%", "cubierta_total"):
+        body = client.get("/scholarships", params={"search": term, "search_mode": "ranked"}).json()
+        assert scholarship["id"] in {row["id"] for row in body["data"]}
+        # El rango usa el término tal cual: la beca que lo contiene queda primero
+        assert body["data"][0]["id"] == scholarship["id"]
+
+
+def test_batch_over_the_limit_is_a_validation_error(client):
+    ids = ["00000000-0000-0000-0000-000000000000"] * 501
+    response = client.post("/scholarships/batch", json={"ids": ids})
+    assert response.status_code == 422
+    assert "500" in response.json()["detail"][0]["msg"]
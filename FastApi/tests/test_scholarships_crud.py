@@ -0,0 +1,138 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+
+def _new_scholarship(fake, campus: str) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "title": "Beca de prueba",
+        "description": "Creada en la prueba",
+        "university_center_id": campus,
+        "scholarship_type_id": fake.scholarships_of(campus)[0]["scholarship_type_id"],
+        "application_start_date": (now - timedelta(days=30)).isoformat(),
+        "application_end_date": (now + timedelta(days=30)).isoformat(),
+    }
+
+
+def test_students_cannot_write(client, fake, student):
+    campus = fake.profile("campus0@example.com")["campus"]
+    assert client.post("/scholarships", headers=student, json=_new_scholarship(fake, campus)).status_code == 403
+
+
+def test_campus_admin_writes_only_own_campus(client, fake, campus_admin):
+    own = fake.profile("campus0@example.com")["campus"]
+    other = fake.scholarships_of(own, same=False)[0]
+
+    assert client.post("/scholarships", headers=campus_admin, json=_new_scholarship(fake, own)).status_code == 200
+    assert client.post(
+        "/scholarships", headers=campus_admin, json=_new_scholarship(fake, other["university_center_id"])
+    ).status_code == 403
+
+    assert client.put(f"/scholarships/{other['id']}", headers=campus_admin, json={"title": "x"}).status_code == 403
+    assert client.delete(f"/scholarships/{other['id']}", headers=campus_admin).status_code == 403
+    assert fake.rows("scholarships")[other["id"]]["title"] == other["title"]
+
+    mine = fake.scholarships_of(own)[0]
+    assert client.put(f"/scholarships/{mine['id']}", headers=campus_admin, json={"title": "x"}).status_code == 200
+    assert client.delete(f"/scholarships/{mine['id']}", headers=campus_admin).status_code == 200
+
+
+def test_campus_admin_cannot_move_scholarship_to_another_campus(client, fake, campus_admin):
+    own = fake.profile("campus0@example.com")["campus"]
+    mine = fake.scholarships_of(own)[0]
+    other_campus = fake.scholarships_of(own, same=False)[0]["university_center_id"]
+
+    response = client.put(f"/scholarships/{mine['id']}", headers=campus_admin, json={"university_center_id": other_campus})
+    assert response.status_code == 403
+    assert fake.rows("scholarships")[mine["id"]]["university_center_id"] == own
+
+
+def test_missing_scholarship_is_404(client, admin):
+    missing = str(uuid.uuid4())
+    assert client.put(f"/scholarships/{missing}", headers=admin, json={"title": "x"}).status_code == 404
+    assert client.delete(f"/scholarships/{missing}", headers=admin).status_code == 404
+
+
+def test_status_is_derived_from_dates(client, fake, admin):
+    scholarship = next(row for row in fake.rows("scholarships").values() if row["status"] == "Abierta")
+    response = client.put(f"/scholarships/{scholarship['id']}", headers=admin, json={"status": "Cerrada"})
+    assert response.status_code == 200
+    assert response.json()["data"][0]["status"] == "Abierta"
+
+    body = _new_scholarship(fake, scholarship["university_center_id"]) | {"status": "Cerrada"}
+    response = client.post("/scholarships", headers=admin, json=body)
+    assert response.status_code == 200
+    assert response.json()["data"][0]["status"] == "Abierta"
+
+
+def test_status_is_kept_for_scholarships_without_dates(client, fake, admin):
+    scholarship = next(iter(fake.rows("scholarships").values()))
+    scholarship.update(application_start_date=None, application_end_date=None, status="Abierta")
+
+    response = client.put(f"/scholarships/{scholarship['id']}", headers=admin, json={"status": "Cerrada"})
+    assert response.status_code == 200
+    assert fake.rows("scholarships")[scholarship["id"]]["status"] == "Cerrada"
+
+    response = client.put("/scholarships/bulk", headers=admin, json=[{"id": scholarship["id"], "status": "Abierta"}])
+    assert response.json()["results"][0]["status"] == "updated"
+    assert fake.rows("scholarships")[scholarship["id"]]["status"] == "Abierta"
+
+
+def test_bulk_update_reports_each_row(client, fake, campus_admin):
+    own = fake.profile("campus0@example.com")["campus"]
+    mine, untouched = fake.scholarships_of(own)[:2]
+    other = fake.scholarships_of(own, same=False)[0]
+    missing = str(uuid.uuid4())
+
+    response = client.put("/scholarships/bulk", headers=campus_admin, json=[
+        {"id": mine["id"], "title": "Actualizada"},
+        {"id": other["id"], "title": "Actualizada"},
+        {"id": missing, "title": "Actualizada"},
+        {"id": "no-es-uuid", "title": "Actualizada"},
+        {"id": untouched["id"]},
+    ])
+    assert response.status_code == 200
+    results = response.json()["results"]
+
+    assert results[0]["status"] == "updated"
+    assert results[1]["status"] == "error" and "campus" in results[1]["error"]
+    assert results[2] == {"index": 2, "id": missing, "status": "error", "error": "Beca no encontrada"}
+    assert results[3]["error"] == "Id de beca inválido"
+    assert results[4]["error"] == "No se enviaron datos"
+
+    rows = fake.rows("scholarships")
+    assert missing not in rows
+    assert rows[other["id"]]["title"] == other["title"]
+    # Solo se escriben las columnas enviadas
+    assert rows[mine["id"]]["title"] == "Actualizada"
+    assert rows[mine["id"]]["description"] == mine["description"]
+    assert rows[untouched["id"]] == untouched
+
+
+def test_bulk_update_invalidates_listing(client, fake, admin):
+    scholarship = next(iter(fake.rows("scholarships").values()))
+    params = {"university_center_id": scholarship["university_center_id"], "limit": 1000}
+    client.get("/scholarships", params=params)
+
+    client.put("/scholarships/bulk", headers=admin, json=[{"id": scholarship["id"], "title": "En lote"}])
+    rows = client.get("/scholarships", params=params).json()["data"]
+    assert next(row for row in rows if row["id"] == scholarship["id"])["title"] == "En lote"
+
+
+def test_bulk_delete_reports_each_id(client, fake, campus_admin):
+    own = fake.profile("campus0@example.com")["campus"]
+    mine = fake.scholarships_of(own)[0]
+    other = fake.scholarships_of(own, same=False)[0]
+
+    response = client.request("DELETE", "/scholarships/bulk", headers=campus_admin, json={
+        "ids": [mine["id"], other["id"], "no-es-uuid", str(uuid.uuid4())]
+    })
+    assert response.status_code == 200
+    results = response.json()["results"]
+
+    assert results[0]["status"] == "deleted"
+    assert "campus" in results[1]["error"]
+    assert results[2]["error"] == "Id de beca inválido"
+    assert results[3]["error"] == "Beca no encontrada"
+    assert mine["id"] not in fake.rows("scholarships")
+    assert other["id"] in fake.rows("scholarships")
@@ -0,0 +1,22 @@
+import os
+from uvicorn_worker import UvicornWorker
+
+# Mismo valor que usa main.py para las tareas de fondo del lifespan
+SHUTDOWN_DRAIN_TIMEOUT = float(os.environ.get("SHUTDOWN_DRAIN_TIMEOUT", "10"))
+
+
+class BecasWorker(UvicornWorker):
+    """
+    Worker de gunicorn para la API (ver gunicorn.conf.py).
+
+    El UvicornWorker base espera sin límite a las peticiones en curso al apagarse, así que
+    gunicorn lo mata al vencer graceful_timeout sin que corra el cierre del lifespan. Aquí
+    las peticiones tienen graceful_timeout - SHUTDOWN_DRAIN_TIMEOUT segundos y el resto queda
+    para drenar tareas de fondo y cerrar el pool de conexiones a Supabase.
+    """
+
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, "lifespan": "on"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = max(1, int(self.cfg.graceful_timeout - SHUTDOWN_DRAIN_TIMEOUT))
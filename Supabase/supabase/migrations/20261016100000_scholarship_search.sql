@@ -0,0 +1,82 @@
+-- Búsqueda de becas: texto completo en español + trigramas para coincidencias parciales y con errores
+
+create extension if not exists "pg_trgm" with schema "extensions";
+
+alter table "public"."scholarships"
+  add column "search_vector" tsvector
+  generated always as (
+    setweight(to_tsvector('spanish'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('spanish'::regconfig, coalesce(description, '')), 'B')
+  ) stored;
+
+CREATE INDEX scholarships_search_vector_idx ON public.scholarships USING gin (search_vector);
+
+-- gin_trgm_ops también sirve a ILIKE '%term%', así que el modo de búsqueda "ilike" deja de ser un seq scan
+CREATE INDEX scholarships_title_trgm_idx ON public.scholarships USING gin (title extensions.gin_trgm_ops);
+
+CREATE INDEX scholarships_description_trgm_idx ON public.scholarships USING gin (description extensions.gin_trgm_ops);
+
+
+-- Búsqueda ordenada por relevancia (usada por GET /scholarships?search_mode=ranked).
+-- search_term llega ya saneado por sanitize_search_term (% y _ escapados para ILIKE).
+CREATE OR REPLACE FUNCTION public.search_scholarships(
+  search_term text,
+  p_status text DEFAULT NULL,
+  p_university_center_id uuid DEFAULT NULL,
+  p_scholarship_type_id uuid DEFAULT NULL,
+  p_limit integer DEFAULT 100,
+  p_offset integer DEFAULT 0
+)
+ RETURNS TABLE (
+  id uuid,
+  university_center_id uuid,
+  scholarship_type_id uuid,
+  title text,
+  description text,
+  requirements jsonb,
+  application_start_date timestamp with time zone,
+  application_end_date timestamp with time zone,
+  status text,
+  created_at timestamp with time zone,
+  rank real,
+  total_count bigint
+ )
+ LANGUAGE sql
+ STABLE
+ SET search_path TO 'public', 'extensions'
+AS $function$
+  WITH q AS (
+    SELECT websearch_to_tsquery('spanish'::regconfig, search_term) AS query
+  )
+  SELECT
+    s.id,
+    s.university_center_id,
+    s.scholarship_type_id,
+    s.title,
+    s.description,
+    s.requirements,
+    s.application_start_date,
+    s.application_end_date,
+    s.status,
+    s.created_at,
+    (ts_rank_cd(s.search_vector, q.query) + similarity(s.title, search_term))::real AS rank,
+    count(*) OVER () AS total_count
+  FROM public.scholarships s, q
+  WHERE (s.search_vector @@ q.query
+         OR s.title % search_term
+         OR s.title ILIKE '%' || search_term || '%'
+         OR s.description ILIKE '%' || search_term || '%')
+    AND (p_status IS NULL OR s.status = p_status)
+    AND (p_university_center_id IS NULL OR s.university_center_id = p_university_center_id)
+    AND (p_scholarship_type_id IS NULL OR s.scholarship_type_id = p_scholarship_type_id)
+  ORDER BY rank DESC, s.created_at DESC, s.id DESC
+  LIMIT least(greatest(p_limit, 1), 1000)
+  OFFSET greatest(p_offset, 0)
+$function$
+;
+
+grant execute on function "public"."search_scholarships"(text, text, uuid, uuid, integer, integer) to "anon";
+
+grant execute on function "public"."search_scholarships"(text, text, uuid, uuid, integer, integer) to "authenticated";
+
+grant execute on function "public"."search_scholarships"(text, text, uuid, uuid, integer, integer) to "service_role";
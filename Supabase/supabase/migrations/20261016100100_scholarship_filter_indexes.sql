@@ -0,0 +1,23 @@
+-- Índices para las combinaciones de filtros y orden que usa la API
+-- (GET /scholarships, paginación por cursor y verificación de campus en el CRUD)
+
+-- Paginación por cursor sin filtros: ORDER BY created_at DESC, id DESC
+CREATE INDEX scholarships_created_at_id_idx ON public.scholarships USING btree (created_at DESC, id DESC);
+
+-- Filtro por campus (listados y verify_campus_ownership), con el orden del cursor
+CREATE INDEX scholarships_center_created_at_idx ON public.scholarships USING btree (university_center_id, created_at DESC, id DESC);
+
+-- Filtro por campus + estado
+CREATE INDEX scholarships_center_status_created_at_idx ON public.scholarships USING btree (university_center_id, status, created_at DESC, id DESC);
+
+-- Filtro por estado
+CREATE INDEX scholarships_status_created_at_idx ON public.scholarships USING btree (status, created_at DESC, id DESC);
+
+-- Filtro por tipo de beca (también respalda la FK scholarship_type_id)
+CREATE INDEX scholarships_type_created_at_idx ON public.scholarships USING btree (scholarship_type_id, created_at DESC, id DESC);
+
+-- Becas abiertas por campus ordenadas por fecha de cierre (próximos vencimientos)
+CREATE INDEX scholarships_open_center_end_date_idx ON public.scholarships USING btree (university_center_id, application_end_date) WHERE (status = ANY (ARRAY['Abierta'::text, 'active'::text]));
+
+-- Solicitudes por beca (la llave única existente empieza por student_id y no sirve aquí)
+CREATE INDEX applications_scholarship_id_submitted_at_idx ON public.applications USING btree (scholarship_id, submitted_at DESC);
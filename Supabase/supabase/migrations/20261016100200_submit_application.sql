@@ -0,0 +1,67 @@
+-- Envío de solicitudes en una sola sentencia: valida la ventana de la convocatoria,
+-- inserta apoyándose en la llave única (student_id, scholarship_id) y es idempotente.
+--
+-- result:
+--   'created'   -> se insertó la solicitud
+--   'exists'    -> el estudiante ya había aplicado (se devuelve la solicitud existente)
+--   'closed'    -> la beca existe pero está fuera de application_start_date/application_end_date
+--   'not_found' -> la beca no existe
+
+CREATE OR REPLACE FUNCTION public.submit_application(p_student_id uuid, p_scholarship_id uuid)
+ RETURNS TABLE (
+  result text,
+  id uuid,
+  student_id uuid,
+  scholarship_id uuid,
+  status text,
+  submitted_at timestamp with time zone
+ )
+ LANGUAGE sql
+ VOLATILE
+ SET search_path TO 'public'
+AS $function$
+  WITH target AS (
+    SELECT s.id,
+           (now() >= coalesce(s.application_start_date, '-infinity'::timestamptz)
+            AND now() <= coalesce(s.application_end_date, 'infinity'::timestamptz)) AS is_open
+    FROM public.scholarships s
+    WHERE s.id = p_scholarship_id
+  ),
+  inserted AS (
+    INSERT INTO public.applications (student_id, scholarship_id)
+    SELECT p_student_id, t.id FROM target t WHERE t.is_open
+    ON CONFLICT (student_id, scholarship_id) DO NOTHING
+    RETURNING applications.id, applications.student_id, applications.scholarship_id,
+              applications.status, applications.submitted_at
+  ),
+  previous AS (
+    SELECT a.id, a.student_id, a.scholarship_id, a.status, a.submitted_at
+    FROM public.applications a
+    WHERE a.student_id = p_student_id AND a.scholarship_id = p_scholarship_id
+  )
+  SELECT 'created', i.id, i.student_id, i.scholarship_id, i.status, i.submitted_at
+  FROM inserted i
+  UNION ALL
+  SELECT 'exists', p.id, p.student_id, p.scholarship_id, p.status, p.submitted_at
+  FROM previous p
+  WHERE NOT EXISTS (SELECT 1 FROM inserted)
+  UNION ALL
+  -- Sin fila insertada ni previa: beca inexistente, cerrada, o un envío concurrente
+  -- del mismo estudiante ganó la carrera (la llave única descartó este)
+  SELECT CASE
+           WHEN NOT EXISTS (SELECT 1 FROM target) THEN 'not_found'
+           WHEN (SELECT t.is_open FROM target t) THEN 'exists'
+           ELSE 'closed'
+         END,
+         NULL, p_student_id, p_scholarship_id, NULL, NULL
+  WHERE NOT EXISTS (SELECT 1 FROM inserted) AND NOT EXISTS (SELECT 1 FROM previous)
+$function$
+;
+
+revoke execute on function "public"."submit_application"(uuid, uuid) from "public";
+
+revoke execute on function "public"."submit_application"(uuid, uuid) from "anon";
+
+revoke execute on function "public"."submit_application"(uuid, uuid) from "authenticated";
+
+grant execute on function "public"."submit_application"(uuid, uuid) to "service_role";
@@ -0,0 +1,133 @@
+-- Estadísticas del panel de administración (GET /stats) precalculadas en vistas materializadas.
+-- La API solo lee filas ya agregadas (decenas o cientos), así que la respuesta no depende
+-- de cuántas becas o solicitudes existan. Se refrescan con refresh_dashboard_stats():
+-- cada 5 minutos con pg_cron (si está habilitado) o con POST /admin/stats/refresh.
+--
+-- Cada vista tiene un índice único (requisito de REFRESH ... CONCURRENTLY, que no bloquea
+-- las lecturas mientras se recalcula).
+
+-- Becas por campus, tipo y estado
+CREATE MATERIALIZED VIEW public.stats_scholarships_summary AS
+  SELECT s.university_center_id,
+         s.scholarship_type_id,
+         s.status,
+         count(*)::integer AS scholarships
+  FROM public.scholarships s
+  GROUP BY s.university_center_id, s.scholarship_type_id, s.status;
+
+CREATE UNIQUE INDEX stats_scholarships_summary_key ON public.stats_scholarships_summary
+  USING btree (university_center_id, scholarship_type_id, status) NULLS NOT DISTINCT;
+
+-- Solicitudes por campus (de la beca) y estado de la solicitud
+CREATE MATERIALIZED VIEW public.stats_applications_summary AS
+  SELECT s.university_center_id,
+         a.status,
+         count(*)::integer AS applications
+  FROM public.applications a
+  JOIN public.scholarships s ON s.id = a.scholarship_id
+  GROUP BY s.university_center_id, a.status;
+
+CREATE UNIQUE INDEX stats_applications_summary_key ON public.stats_applications_summary
+  USING btree (university_center_id, status) NULLS NOT DISTINCT;
+
+-- Solicitudes por beca
+CREATE MATERIALIZED VIEW public.stats_applications_by_scholarship AS
+  SELECT s.id AS scholarship_id,
+         s.university_center_id,
+         s.title,
+         count(*)::integer AS applications,
+         max(a.submitted_at) AS last_submitted_at
+  FROM public.applications a
+  JOIN public.scholarships s ON s.id = a.scholarship_id
+  GROUP BY s.id, s.university_center_id, s.title;
+
+CREATE UNIQUE INDEX stats_applications_by_scholarship_key ON public.stats_applications_by_scholarship
+  USING btree (scholarship_id);
+
+-- Ranking de becas con más solicitudes (global y por campus)
+CREATE INDEX stats_applications_by_scholarship_ranking_idx ON public.stats_applications_by_scholarship
+  USING btree (applications DESC);
+
+CREATE INDEX stats_applications_by_scholarship_center_ranking_idx ON public.stats_applications_by_scholarship
+  USING btree (university_center_id, applications DESC);
+
+-- Solicitudes por día (hora del centro de México) y campus
+CREATE MATERIALIZED VIEW public.stats_applications_daily AS
+  SELECT (a.submitted_at AT TIME ZONE 'America/Mexico_City')::date AS day,
+         s.university_center_id,
+         count(*)::integer AS applications
+  FROM public.applications a
+  JOIN public.scholarships s ON s.id = a.scholarship_id
+  WHERE a.submitted_at IS NOT NULL
+  GROUP BY 1, s.university_center_id;
+
+CREATE UNIQUE INDEX stats_applications_daily_key ON public.stats_applications_daily
+  USING btree (day, university_center_id) NULLS NOT DISTINCT;
+
+-- Momento del último refresco, para mostrar qué tan recientes son los números
+CREATE TABLE public.stats_refresh_log (
+  id boolean PRIMARY KEY DEFAULT true CHECK (id),
+  refreshed_at timestamp with time zone NOT NULL DEFAULT now()
+);
+
+INSERT INTO public.stats_refresh_log (id, refreshed_at) VALUES (true, now());
+
+ALTER TABLE public.stats_refresh_log ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION public.refresh_dashboard_stats()
+ RETURNS timestamp with time zone
+ LANGUAGE plpgsql
+ SECURITY DEFINER
+ SET search_path TO 'public'
+AS $function$
+DECLARE
+  refreshed timestamp with time zone := now();
+BEGIN
+  REFRESH MATERIALIZED VIEW CONCURRENTLY public.stats_scholarships_summary;
+  REFRESH MATERIALIZED VIEW CONCURRENTLY public.stats_applications_summary;
+  REFRESH MATERIALIZED VIEW CONCURRENTLY public.stats_applications_by_scholarship;
+  REFRESH MATERIALIZED VIEW CONCURRENTLY public.stats_applications_daily;
+
+  UPDATE public.stats_refresh_log SET refreshed_at = refreshed WHERE id;
+  RETURN refreshed;
+END;
+$function$
+;
+
+-- Las vistas materializadas no tienen RLS: solo el backend (service_role) las lee
+revoke all on table "public"."stats_scholarships_summary" from "anon", "authenticated";
+
+revoke all on table "public"."stats_applications_summary" from "anon", "authenticated";
+
+revoke all on table "public"."stats_applications_by_scholarship" from "anon", "authenticated";
+
+revoke all on table "public"."stats_applications_daily" from "anon", "authenticated";
+
+revoke all on table "public"."stats_refresh_log" from "anon", "authenticated";
+
+grant select on table "public"."stats_scholarships_summary" to "service_role";
+
+grant select on table "public"."stats_applications_summary" to "service_role";
+
+grant select on table "public"."stats_applications_by_scholarship" to "service_role";
+
+grant select on table "public"."stats_applications_daily" to "service_role";
+
+grant select on table "public"."stats_refresh_log" to "service_role";
+
+revoke execute on function "public"."refresh_dashboard_stats"() from "public";
+
+revoke execute on function "public"."refresh_dashboard_stats"() from "anon";
+
+revoke execute on function "public"."refresh_dashboard_stats"() from "authenticated";
+
+grant execute on function "public"."refresh_dashboard_stats"() to "service_role";
+
+-- Refresco programado si pg_cron está habilitado (Database > Extensions en Supabase)
+DO $cron$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    PERFORM cron.schedule('refresh-dashboard-stats', '*/5 * * * *', 'SELECT public.refresh_dashboard_stats()');
+  END IF;
+END
+$cron$;
@@ -0,0 +1,130 @@
+-- El estado de una beca ('Abierta'/'Cerrada') se deriva de application_start_date y
+-- application_end_date, con la misma ventana que valida submit_application.
+--
+-- * Al escribir (INSERT o UPDATE de fechas/estado) un trigger calcula el estado, así que
+--   una beca nunca se guarda con un estado que contradiga sus fechas.
+-- * Cuando el reloj cruza una fecha de apertura o cierre, sync_scholarship_status() actualiza
+--   en una sola sentencia (por lotes) solo las becas cuyo estado cambió. Corre cada minuto con
+--   pg_cron (si está habilitado) y/o desde la API (STATUS_SYNC_INTERVAL o
+--   POST /admin/scholarships/sync-status).
+--
+-- Así los filtros por estado (status = 'Abierta') siguen siendo una igualdad servida por los
+-- índices de 20261016100100_scholarship_filter_indexes.sql, sin lógica de fechas por petición.
+-- Las becas sin ninguna fecha conservan el estado que se les asigne a mano.
+
+CREATE OR REPLACE FUNCTION public.scholarship_status_at(
+  p_start timestamp with time zone,
+  p_end timestamp with time zone,
+  p_at timestamp with time zone
+)
+ RETURNS text
+ LANGUAGE sql
+ IMMUTABLE
+AS $function$
+  SELECT CASE
+           WHEN p_start IS NULL AND p_end IS NULL THEN NULL
+           WHEN p_at >= coalesce(p_start, '-infinity'::timestamptz)
+                AND p_at <= coalesce(p_end, 'infinity'::timestamptz) THEN 'Abierta'
+           ELSE 'Cerrada'
+         END
+$function$
+;
+
+CREATE OR REPLACE FUNCTION public.set_scholarship_status()
+ RETURNS trigger
+ LANGUAGE plpgsql
+ SET search_path TO 'public'
+AS $function$
+BEGIN
+  NEW.status := coalesce(
+    public.scholarship_status_at(NEW.application_start_date, NEW.application_end_date, now()),
+    NEW.status
+  );
+  RETURN NEW;
+END;
+$function$
+;
+
+CREATE TRIGGER scholarships_set_status
+  BEFORE INSERT OR UPDATE OF application_start_date, application_end_date, status
+  ON public.scholarships
+  FOR EACH ROW EXECUTE FUNCTION public.set_scholarship_status();
+
+-- Becas no abiertas ordenadas por fecha de cierre: las candidatas a abrir son las que aún no
+-- cierran, un rango pequeño aunque el histórico de becas cerradas crezca
+CREATE INDEX scholarships_not_open_end_date_idx ON public.scholarships USING btree (application_end_date)
+  WHERE (status IS DISTINCT FROM 'Abierta'::text AND (application_start_date IS NOT NULL OR application_end_date IS NOT NULL));
+
+-- Becas abiertas por fecha de cierre: las candidatas a cerrar son las que ya vencieron
+CREATE INDEX scholarships_open_end_date_idx ON public.scholarships USING btree (application_end_date)
+  WHERE (status = ANY (ARRAY['Abierta'::text, 'active'::text]));
+
+-- Devuelve las becas que cambiaron (hasta p_batch_size por llamada) para que la API invalide
+-- sus listados en caché. Si devuelve p_batch_size filas puede quedar trabajo: se vuelve a llamar.
+CREATE OR REPLACE FUNCTION public.sync_scholarship_status(p_batch_size integer DEFAULT 1000)
+ RETURNS TABLE (
+  id uuid,
+  university_center_id uuid,
+  scholarship_type_id uuid,
+  status text
+ )
+ LANGUAGE sql
+ VOLATILE
+ SECURITY DEFINER
+ SET search_path TO 'public'
+AS $function$
+  WITH to_open AS (
+    -- No abiertas cuya ventana incluye ahora (rango del índice: las que aún no cierran)
+    SELECT s.id, 'Abierta'::text AS new_status
+    FROM public.scholarships s
+    WHERE s.status IS DISTINCT FROM 'Abierta'
+      AND (s.application_start_date IS NOT NULL OR s.application_end_date IS NOT NULL)
+      AND (s.application_end_date >= now() OR s.application_end_date IS NULL)
+      AND coalesce(s.application_start_date, '-infinity'::timestamptz) <= now()
+    LIMIT p_batch_size
+    FOR UPDATE SKIP LOCKED
+  ),
+  to_close AS (
+    -- Abiertas (o con el valor heredado 'active') fuera de su ventana
+    SELECT s.id, 'Cerrada'::text AS new_status
+    FROM public.scholarships s
+    WHERE s.status = ANY (ARRAY['Abierta'::text, 'active'::text])
+      AND (s.application_end_date < now() OR s.application_start_date > now())
+    LIMIT p_batch_size
+    FOR UPDATE SKIP LOCKED
+  ),
+  due AS (
+    SELECT * FROM to_open
+    UNION ALL
+    SELECT * FROM to_close
+  )
+  UPDATE public.scholarships s
+  SET status = due.new_status
+  FROM due
+  WHERE s.id = due.id
+  RETURNING s.id, s.university_center_id, s.scholarship_type_id, s.status
+$function$
+;
+
+-- Normaliza las filas existentes (incluido el valor heredado 'active') con el mismo cálculo
+UPDATE public.scholarships
+SET status = public.scholarship_status_at(application_start_date, application_end_date, now())
+WHERE (application_start_date IS NOT NULL OR application_end_date IS NOT NULL)
+  AND status IS DISTINCT FROM public.scholarship_status_at(application_start_date, application_end_date, now());
+
+revoke execute on function "public"."sync_scholarship_status"(integer) from "public";
+
+revoke execute on function "public"."sync_scholarship_status"(integer) from "anon";
+
+revoke execute on function "public"."sync_scholarship_status"(integer) from "authenticated";
+
+grant execute on function "public"."sync_scholarship_status"(integer) to "service_role";
+
+-- Sincronización programada si pg_cron está habilitado (Database > Extensions en Supabase)
+DO $cron$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    PERFORM cron.schedule('sync-scholarship-status', '* * * * *', 'SELECT count(*) FROM public.sync_scholarship_status(5000)');
+  END IF;
+END
+$cron$;
@@ -0,0 +1,60 @@
+-- search_scholarships recibe el término tal como lo escribió el usuario (solo recortado).
+-- Antes llegaba escapado para ILIKE (\%, \_, \\), y esos escapes llegaban también a
+-- websearch_to_tsquery y similarity(), lo que empeoraba el ranking de términos con % _ o \.
+-- Ahora el escape para ILIKE se hace aquí, solo en las dos condiciones ILIKE.
+
+CREATE OR REPLACE FUNCTION public.search_scholarships(
+  search_term text,
+  p_status text DEFAULT NULL,
+  p_university_center_id uuid DEFAULT NULL,
+  p_scholarship_type_id uuid DEFAULT NULL,
+  p_limit integer DEFAULT 100,
+  p_offset integer DEFAULT 0
+)
+ RETURNS TABLE (
+  id uuid,
+  university_center_id uuid,
+  scholarship_type_id uuid,
+  title text,
+  description text,
+  requirements jsonb,
+  application_start_date timestamp with time zone,
+  application_end_date timestamp with time zone,
+  status text,
+  created_at timestamp with time zone,
+  rank real,
+  total_count bigint
+ )
+ LANGUAGE sql
+ STABLE
+ SET search_path TO 'public', 'extensions'
+AS $function$
+  WITH q AS (
+    SELECT websearch_to_tsquery('spanish'::regconfig, search_term) AS query
+  )
+  SELECT
+    s.id,
+    s.university_center_id,
+    s.scholarship_type_id,
+    s.title,
+    s.description,
+    s.requirements,
+    s.application_start_date,
+    s.application_end_date,
+    s.status,
+    s.created_at,
+    (ts_rank_cd(s.search_vector, q.query) + similarity(s.title, search_term))::real AS rank,
+    count(*) OVER () AS total_count
+  FROM public.scholarships s, q
+  WHERE (s.search_vector @@ q.query
+         OR s.title % search_term
+         OR s.title ILIKE '%' || replace(replace(replace(search_term, '\', '\\'), '%', '\%'), '_', '\_') || '%'
+         OR s.description ILIKE '%' || replace(replace(replace(search_term, '\', '\\'), '%', '\%'), '_', '\_') || '%')
+    AND (p_status IS NULL OR s.status = p_status)
+    AND (p_university_center_id IS NULL OR s.university_center_id = p_university_center_id)
+    AND (p_scholarship_type_id IS NULL OR s.scholarship_type_id = p_scholarship_type_id)
+  ORDER BY rank DESC, s.created_at DESC, s.id DESC
+  LIMIT least(greatest(p_limit, 1), 1000)
+  OFFSET greatest(p_offset, 0)
+$function$
+;